@@ -0,0 +1,297 @@
+"""Доставка логов действий в Discord-канал
+
+На каждый канал логов — своя очередь и одна задача-отправитель, поэтому
+порядок событий сохраняется. События, пришедшие за ACTION_LOGS_SEND_WINDOW_MS,
+упаковываются в одно сообщение: подряд идущие события одного типа
+становятся полями общего embed, в сообщении до 10 embed'ов.
+При 429 отправитель ждёт Retry-After и повторяет то же сообщение.
+"""
+import asyncio
+import os
+
+import discord
+
+from core.timeutils import msk_now
+
+EVENT_COLORS = {
+    'voice_join': 0x00ff00,
+    'voice_leave': 0xff0000,
+    'voice_move': 0xffa500,
+    'message_edit': 0xffa500,
+    'message_delete': 0xff0000,
+    'channel_create': 0x00ff00,
+    'channel_delete': 0xff0000,
+    'channel_update': 0xffa500,
+    'role_grant': 0x00ff00,
+    'role_revoke': 0xff0000,
+    'role_create': 0x00ff00,
+    'role_delete': 0xff0000,
+    'member_join': 0x00ff00,
+    'member_leave': 0xff0000,
+    'member_update': 0xffa500,
+    'member_ban': 0xff0000,
+    'member_unban': 0x00ff00,
+    'member_kick': 0xff0000,
+    'member_timeout': 0xffa500,
+}
+
+EVENT_TITLES = {
+    'voice_join': '🎙️ ПОДКЛЮЧЕНИЕ К ГОЛОСОВОМУ КАНАЛУ',
+    'voice_leave': '🎙️ ОТКЛЮЧЕНИЕ ОТ ГОЛОСОВОГО КАНАЛА',
+    'voice_move': '🎙️ ПЕРЕМЕЩЕНИЕ В ГОЛОСОВОМ КАНАЛЕ',
+    'message_edit': '✏️ РЕДАКТИРОВАНИЕ СООБЩЕНИЯ',
+    'message_delete': '🗑️ УДАЛЕНИЕ СООБЩЕНИЯ',
+    'channel_create': '📝 СОЗДАНИЕ КАНАЛА',
+    'channel_delete': '📝 УДАЛЕНИЕ КАНАЛА',
+    'channel_update': '📝 ИЗМЕНЕНИЕ КАНАЛА',
+    'role_grant': '🎭 ВЫДАЧА РОЛИ',
+    'role_revoke': '🎭 СНЯТИЕ РОЛИ',
+    'role_create': '🎭 СОЗДАНИЕ РОЛИ',
+    'role_delete': '🎭 УДАЛЕНИЕ РОЛИ',
+    'member_join': '👤 ПРИСОЕДИНЕНИЕ К СЕРВЕРУ',
+    'member_leave': '👤 ПОКИДАНИЕ СЕРВЕРА',
+    'member_update': '👤 ИЗМЕНЕНИЕ ПРОФИЛЯ',
+    'member_ban': '🔨 БАН УЧАСТНИКА',
+    'member_unban': '🔓 РАЗБАН УЧАСТНИКА',
+    'member_kick': '👢 КИК УЧАСТНИКА',
+    'member_timeout': '⏰ ТАЙМ-АУТ УЧАСТНИКА',
+}
+
+# Лимиты Discord на одно сообщение
+MAX_EMBEDS = 10
+MAX_FIELDS = 25
+MAX_MESSAGE_CHARS = 6000
+FIELD_VALUE_LIMIT = 1024
+
+
+def make_entry(event_type: str, user_id: str, target_id: str = None,
+               details: str = None, before: str = None, after: str = None) -> dict:
+    return {
+        'event_type': event_type,
+        'user_id': user_id,
+        'target_id': target_id,
+        'details': details,
+        'before': before,
+        'after': after,
+        'time': msk_now(),
+    }
+
+
+def build_single_embed(entry: dict) -> discord.Embed:
+    """Одно событие — прежний формат с отдельными полями"""
+    user_id = entry['user_id']
+    embed = discord.Embed(
+        title=EVENT_TITLES.get(entry['event_type'], entry['event_type']),
+        color=EVENT_COLORS.get(entry['event_type'], 0x7289da),
+        timestamp=entry['time']
+    )
+
+    embed.add_field(name="👤 Пользователь", value=f"<@{user_id}>", inline=True)
+
+    if entry['target_id']:
+        embed.add_field(name="🎯 Модератор", value=f"<@{entry['target_id']}>", inline=True)
+
+    if entry['before']:
+        embed.add_field(name="📝 Было", value=entry['before'][:1000], inline=False)
+
+    if entry['after']:
+        embed.add_field(name="📝 Стало", value=entry['after'][:1000], inline=False)
+
+    if entry['details']:
+        embed.add_field(name="📋 Детали", value=entry['details'][:1000], inline=False)
+
+    embed.set_footer(text=f"ID: {user_id}")
+    return embed
+
+
+def _field(entry: dict) -> tuple:
+    """Событие одним полем для сводного embed"""
+    name = f"🕒 {entry['time'].strftime('%H:%M:%S')} МСК"
+
+    line = f"👤 <@{entry['user_id']}>"
+    if entry['target_id']:
+        line += f" · 🎯 <@{entry['target_id']}>"
+    lines = [line]
+    if entry['before']:
+        lines.append(f"📝 Было: {entry['before'][:300]}")
+    if entry['after']:
+        lines.append(f"📝 Стало: {entry['after'][:300]}")
+    if entry['details']:
+        lines.append(f"📋 {entry['details'][:300]}")
+
+    value = "\n".join(lines)
+    if len(value) > FIELD_VALUE_LIMIT:
+        value = value[:FIELD_VALUE_LIMIT - 1] + "…"
+    return name, value
+
+
+def pack_entries(entries: list) -> tuple:
+    """Упаковать события в одно сообщение
+
+    Возвращает (список embed'ов, сколько событий вошло). Подряд идущие
+    события одного типа попадают в один embed; соблюдаются лимиты
+    на число embed'ов, полей и суммарную длину текста сообщения.
+    """
+    if len(entries) == 1:
+        return [build_single_embed(entries[0])], 1
+
+    embeds = []
+    used = 0
+    chars = 0
+    current = None
+    current_type = None
+
+    for entry in entries:
+        name, value = _field(entry)
+        event_type = entry['event_type']
+        new_embed = current is None or event_type != current_type or len(current.fields) >= MAX_FIELDS
+
+        cost = len(name) + len(value)
+        if new_embed:
+            title = EVENT_TITLES.get(event_type, event_type)
+            cost += len(title)
+            if len(embeds) >= MAX_EMBEDS:
+                break
+        if chars + cost > MAX_MESSAGE_CHARS:
+            break
+
+        if new_embed:
+            current = discord.Embed(
+                title=title,
+                color=EVENT_COLORS.get(event_type, 0x7289da),
+                timestamp=entry['time']
+            )
+            current_type = event_type
+            embeds.append(current)
+
+        current.add_field(name=name, value=value, inline=False)
+        chars += cost
+        used += 1
+
+    return embeds, used
+
+
+class ActionLogDelivery:
+
+    def __init__(self, window_ms: int = None, max_pending: int = None, max_retries: int = 5):
+        self.window = (window_ms or int(os.getenv('ACTION_LOGS_SEND_WINDOW_MS', '1500'))) / 1000
+        self.max_pending = max_pending or int(os.getenv('ACTION_LOGS_SEND_MAX_PENDING', '2000'))
+        self.max_retries = max_retries
+
+        self._channels = {}
+        self._queues = {}
+        self._pending = {}
+        self._tasks = {}
+
+        self.events = 0
+        self.delivered_events = 0
+        self.messages_sent = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def enqueue(self, channel, entry: dict):
+        """Поставить событие в очередь канала, не дожидаясь отправки"""
+        channel_id = channel.id
+        self._channels[channel_id] = channel
+
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue(maxsize=self.max_pending)
+            self._pending[channel_id] = []
+
+        task = self._tasks.get(channel_id)
+        if task is None or task.done():
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+
+        try:
+            queue.put_nowait(entry)
+            self.events += 1
+        except asyncio.QueueFull:
+            # Запись уже сохранена в БД; в канал её не шлём, чтобы не копить отставание
+            self.dropped += 1
+
+    async def _send(self, channel, embeds: list) -> bool:
+        for _ in range(self.max_retries):
+            try:
+                await channel.send(embeds=embeds)
+                self.messages_sent += 1
+                return True
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    self.failed += 1
+                    print(f"❌ [ACTION_LOGS] Ошибка отправки лога в #{channel}: {e}")
+                    return False
+                self.rate_limited += 1
+                retry_after = 1.0
+                if e.response is not None:
+                    retry_after = float(e.response.headers.get('Retry-After', retry_after))
+                await asyncio.sleep(retry_after)
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ [ACTION_LOGS] Ошибка отправки лога в #{channel}: {e}")
+                return False
+
+        self.failed += 1
+        print(f"❌ [ACTION_LOGS] Лимит запросов для #{channel} не снят за {self.max_retries} попыток")
+        return False
+
+    async def _send_pending(self, channel_id: int):
+        """Отправить одно сообщение из начала очереди канала"""
+        pending = self._pending[channel_id]
+        embeds, used = pack_entries(pending)
+        if await self._send(self._channels[channel_id], embeds):
+            self.delivered_events += used
+        del pending[:used]
+
+    def _drain(self, channel_id: int):
+        queue = self._queues[channel_id]
+        pending = self._pending[channel_id]
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+
+    async def _run(self, channel_id: int):
+        queue = self._queues[channel_id]
+        pending = self._pending[channel_id]
+        while True:
+            if not pending:
+                pending.append(await queue.get())
+                # Окно накопления: события рейда уйдут одним сообщением
+                await asyncio.sleep(self.window)
+            self._drain(channel_id)
+            await self._send_pending(channel_id)
+
+    async def stop(self, timeout: float = 10):
+        """Остановить отправителей и попытаться отправить остаток"""
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+        async def flush_all():
+            for channel_id in self._queues:
+                self._drain(channel_id)
+                while self._pending[channel_id]:
+                    await self._send_pending(channel_id)
+
+        try:
+            await asyncio.wait_for(flush_all(), timeout)
+        except Exception as e:
+            left = sum(len(p) for p in self._pending.values())
+            print(f"⚠️ [ACTION_LOGS] Не отправлено в канал при остановке: {left} ({e})")
+
+    def get_stats(self) -> dict:
+        return {
+            'events': self.events,
+            'delivered_events': self.delivered_events,
+            'messages_sent': self.messages_sent,
+            'saved_calls': self.delivered_events - self.messages_sent,
+            'pending': sum(len(p) for p in self._pending.values()) + sum(q.qsize() for q in self._queues.values()),
+            'rate_limited': self.rate_limited,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
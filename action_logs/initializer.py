@@ -2,6 +2,7 @@
 import logging
 import discord
 from core.database import db
+from core.panels import panel_registry
 from action_logs.views import ActionLogsPanelView
 from action_logs.settings_view import ActionLogsSettingsView
 from action_logs.manager import action_logs_manager
@@ -57,27 +58,23 @@ class ActionLogsInitializer:
             logger.error(f"❌ Ошибка ID канала логов {self.public_channel_id}: {e}")
             return
         
-        found = False
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.components:
-                await msg.edit(view=ActionLogsPanelView())
-                found = True
-                print(f"📋 [ACTION_LOGS] Обновлена панель в #{channel.name}")
-                break
-        
-        if not found:
-            embed = discord.Embed(
-                title="📋 **ЛОГИ ДЕЙСТВИЙ**",
-                description="Просмотр и поиск записей о действиях на сервере\n\n"
-                            "**Доступные функции:**\n"
-                            "└ 📋 Последние логи — последние 30 записей\n"
-                            "└ 🔍 Поиск по пользователю — все действия конкретного пользователя\n"
-                            "└ 🎯 Поиск по событию — все записи определённого типа\n"
-                            "└ 📊 Статистика — общая информация по логам",
-                color=0x7289da
-            )
-            await channel.send(embed=embed, view=ActionLogsPanelView())
-            print(f"📋 [ACTION_LOGS] Создана панель в #{channel.name}")
+        embed = discord.Embed(
+            title="📋 **ЛОГИ ДЕЙСТВИЙ**",
+            description="Просмотр и поиск записей о действиях на сервере\n\n"
+                        "**Доступные функции:**\n"
+                        "└ 📋 Последние логи — последние 30 записей\n"
+                        "└ 🔍 Поиск по пользователю — все действия конкретного пользователя\n"
+                        "└ 🎯 Поиск по событию — все записи определённого типа\n"
+                        "└ 🔎 Поиск по тексту — фразы и префиксы в содержимом логов\n"
+                        "└ 📊 Статистика — общая информация по логам",
+            color=0x7289da
+        )
+        await panel_registry.publish(
+            self.bot, 'action_logs', 'public', channel,
+            embed=embed, view=ActionLogsPanelView(),
+            match=lambda msg: bool(msg.components)
+        )
+        print(f"📋 [ACTION_LOGS] Панель в #{channel.name} актуальна")
     
     async def _init_settings_channel(self):
         try:
@@ -91,19 +88,19 @@ class ActionLogsInitializer:
             logger.error(f"❌ Ошибка ID канала настроек {self.settings_channel_id}: {e}")
             return
         
-        # Очищаем старые сообщения
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user:
-                await msg.delete()
-        
         from action_logs.settings_view import ActionLogsSettingsView
         embed = discord.Embed(
             title="⚙️ **НАСТРОЙКА ЛОГОВ ДЕЙСТВИЙ**",
             description="Настройка системы логирования",
             color=0x00ff00
         )
-        await channel.send(embed=embed, view=ActionLogsSettingsView())
-        print(f"📋 [ACTION_LOGS] Создана панель настроек в #{channel.name}")
+        await panel_registry.publish(self.bot, 'action_logs', 'settings', channel,
+                                     embed=embed, view=ActionLogsSettingsView(), replace=True)
+        print(f"📋 [ACTION_LOGS] Панель настроек в #{channel.name} актуальна")
+    
+    async def stop(self):
+        await action_logs_manager.stop()
+        print("📋 [ACTION_LOGS] Очередь логов записана")
 
 
 initializer = None
@@ -1,13 +1,57 @@
 """Менеджер логов действий"""
-from datetime import datetime
+import base64
+import re
 from core.database import db
+from core.async_database import adb
 from core.config import CONFIG
+from action_logs.writer import ActionLogWriter
+from action_logs.delivery import ActionLogDelivery, make_entry
+
+
+def build_fts_query(text: str) -> str:
+    """Строка поиска модератора → выражение FTS5
+
+    "несколько слов" — точная фраза, слово* — поиск по префиксу,
+    остальные слова — обязательные термы. Спецсимволы FTS5 отбрасываются,
+    поэтому ввод пользователя не может сломать синтаксис запроса.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+        tokens = re.findall(r'\w+', phrase or word)
+        if not tokens:
+            continue
+        term = '"' + ' '.join(tokens) + '"'
+        if word and word.endswith('*'):
+            term += '*'
+        terms.append(term)
+    return ' '.join(terms)
+
+
+def encode_cursor(direction: str, log_id: int) -> str:
+    """Непрозрачный курсор страницы: направление ('before'/'after') + id границы"""
+    return base64.urlsafe_b64encode(f"{direction}:{log_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Курсор → (before_id, after_id); битый курсор означает первую страницу"""
+    try:
+        direction, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        log_id = int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        return None, None
+    if direction == 'before':
+        return log_id, None
+    if direction == 'after':
+        return None, log_id
+    return None, None
 
 
 class ActionLogsManager:
     
     def __init__(self):
         self.bot = None
+        self.writer = ActionLogWriter()
+        self.delivery = ActionLogDelivery()
     
     def set_bot(self, bot):
         self.bot = bot
@@ -37,13 +81,13 @@ class ActionLogsManager:
         if not self.is_event_enabled(event_type):
             return
         
-        db.save_action_log(guild_id, event_type, user_id, target_id, details, before, after)
+        await self.writer.put(guild_id, event_type, user_id, target_id, details, before, after)
         await self._send_to_channel(guild_id, event_type, user_id, target_id, details, before, after)
     
     async def _send_to_channel(self, guild_id: str, event_type: str, user_id: str,
                                 target_id: str = None, details: str = None,
                                 before: str = None, after: str = None):
-        """Отправить лог в канал"""
+        """Поставить лог в очередь отправки в канал"""
         settings = self.get_settings()
         channel_id = settings.get('action_logs_channel')
         
@@ -58,77 +102,70 @@ class ActionLogsManager:
         if not channel:
             return
         
-        colors = {
-            'voice_join': 0x00ff00,
-            'voice_leave': 0xff0000,
-            'voice_move': 0xffa500,
-            'message_edit': 0xffa500,
-            'message_delete': 0xff0000,
-            'channel_create': 0x00ff00,
-            'channel_delete': 0xff0000,
-            'channel_update': 0xffa500,
-            'role_grant': 0x00ff00,
-            'role_revoke': 0xff0000,
-            'role_create': 0x00ff00,
-            'role_delete': 0xff0000,
-            'member_join': 0x00ff00,
-            'member_leave': 0xff0000,
-            'member_update': 0xffa500,
-            'member_ban': 0xff0000,
-            'member_unban': 0x00ff00,
-            'member_kick': 0xff0000,
-            'member_timeout': 0xffa500,
-        }
-        
-        event_names = {
-            'voice_join': '🎙️ ПОДКЛЮЧЕНИЕ К ГОЛОСОВОМУ КАНАЛУ',
-            'voice_leave': '🎙️ ОТКЛЮЧЕНИЕ ОТ ГОЛОСОВОГО КАНАЛА',
-            'voice_move': '🎙️ ПЕРЕМЕЩЕНИЕ В ГОЛОСОВОМ КАНАЛЕ',
-            'message_edit': '✏️ РЕДАКТИРОВАНИЕ СООБЩЕНИЯ',
-            'message_delete': '🗑️ УДАЛЕНИЕ СООБЩЕНИЯ',
-            'channel_create': '📝 СОЗДАНИЕ КАНАЛА',
-            'channel_delete': '📝 УДАЛЕНИЕ КАНАЛА',
-            'channel_update': '📝 ИЗМЕНЕНИЕ КАНАЛА',
-            'role_grant': '🎭 ВЫДАЧА РОЛИ',
-            'role_revoke': '🎭 СНЯТИЕ РОЛИ',
-            'role_create': '🎭 СОЗДАНИЕ РОЛИ',
-            'role_delete': '🎭 УДАЛЕНИЕ РОЛИ',
-            'member_join': '👤 ПРИСОЕДИНЕНИЕ К СЕРВЕРУ',
-            'member_leave': '👤 ПОКИДАНИЕ СЕРВЕРА',
-            'member_update': '👤 ИЗМЕНЕНИЕ ПРОФИЛЯ',
-            'member_ban': '🔨 БАН УЧАСТНИКА',
-            'member_unban': '🔓 РАЗБАН УЧАСТНИКА',
-            'member_kick': '👢 КИК УЧАСТНИКА',
-            'member_timeout': '⏰ ТАЙМ-АУТ УЧАСТНИКА',
-        }
-        
-        embed = discord.Embed(
-            title=event_names.get(event_type, event_type),
-            color=colors.get(event_type, 0x7289da),
-            timestamp=datetime.now()
-        )
-        
-        embed.add_field(name="👤 Пользователь", value=f"<@{user_id}>", inline=True)
-        
-        if target_id:
-            embed.add_field(name="🎯 Модератор", value=f"<@{target_id}>", inline=True)
-        
-        if before:
-            embed.add_field(name="📝 Было", value=before[:1000], inline=False)
-        
-        if after:
-            embed.add_field(name="📝 Стало", value=after[:1000], inline=False)
-        
-        if details:
-            embed.add_field(name="📋 Детали", value=details[:1000], inline=False)
+        self.delivery.enqueue(channel, make_entry(event_type, user_id, target_id, details, before, after))
+    
+    async def flush(self):
+        """Дописать в БД логи из очереди (перед чтением или остановкой)"""
+        await self.writer.flush()
+    
+    async def stop(self):
+        await self.writer.stop()
+        await self.delivery.stop()
+    
+    def get_writer_stats(self) -> dict:
+        return self.writer.get_stats()
+    
+    def get_delivery_stats(self) -> dict:
+        return self.delivery.get_stats()
+    
+    async def get_logs_page(self, guild_id: str, limit: int = 20, cursor: str = None,
+                            user_id: str = None, event_type: str = None, days: int = None) -> tuple:
+        """Страница логов по курсору → (logs, prev_cursor, next_cursor)
+
+        prev_cursor ведёт к более новым записям, next_cursor — к более старым;
+        None, если в этом направлении записей больше нет.
+        """
+        before_id, after_id = decode_cursor(cursor) if cursor else (None, None)
+        await self.flush()
+        # Одна лишняя строка показывает, есть ли страница дальше
+        logs = await adb.get_action_logs(limit + 1, 0, user_id, event_type, guild_id, days,
+                                         before_id=before_id, after_id=after_id)
         
-        embed.set_footer(text=f"ID: {user_id}")
+        if after_id is not None:
+            has_newer = len(logs) > limit
+            logs = logs[-limit:] if has_newer else logs
+            has_older = True
+        else:
+            has_older = len(logs) > limit
+            logs = logs[:limit]
+            has_newer = before_id is not None
         
-        await channel.send(embed=embed)
+        if not logs:
+            return [], None, None
+        prev_cursor = encode_cursor('after', logs[0]['id']) if has_newer else None
+        next_cursor = encode_cursor('before', logs[-1]['id']) if has_older else None
+        return logs, prev_cursor, next_cursor
     
     def get_logs(self, guild_id: str, limit: int = 100, offset: int = 0,
-                 user_id: str = None, event_type: str = None, days: int = None) -> list:
-        return db.get_action_logs(limit, offset, user_id, event_type, guild_id, days)
+                 user_id: str = None, event_type: str = None, days: int = None,
+                 before_id: int = None, after_id: int = None) -> list:
+        return db.get_action_logs(limit, offset, user_id, event_type, guild_id, days, before_id, after_id)
+    
+    async def search_logs(self, guild_id: str, text: str, limit: int = 10,
+                          user_id: str = None, event_type: str = None, days: int = None,
+                          max_id: int = None, cursor: tuple = None) -> list:
+        """Полнотекстовый поиск по снимку max_id; cursor — (score, id) последней строки прошлой страницы"""
+        match = build_fts_query(text)
+        if not match:
+            return []
+        after_score, after_id = cursor if cursor else (None, None)
+        return await adb.search_action_logs(match, guild_id, user_id, event_type, days, limit,
+                                            max_id, after_score, after_id)
+    
+    async def search_snapshot(self) -> int:
+        """Записать очередь и вернуть MAX(id) — границу выдачи нового поиска"""
+        await self.flush()
+        return await adb.get_action_logs_max_id()
     
     def get_event_types(self, guild_id: str) -> list:
         return db.get_unique_action_log_events(guild_id)
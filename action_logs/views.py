@@ -18,12 +18,6 @@ class ActionLogsPanelView(PermanentView):
         custom_id="logs_recent"
     )
     async def recent_logs(self, interaction: discord.Interaction, button: discord.ui.Button):
-        logs = action_logs_manager.get_logs(str(interaction.guild.id), limit=30)
-        
-        if not logs:
-            await interaction.response.send_message("📭 Нет записей в логах", ephemeral=True)
-            return
-        
         event_names = {
             'voice_join': '🎙️ Вошёл в войс',
             'voice_leave': '🎙️ Вышел из войса',
@@ -45,22 +39,18 @@ class ActionLogsPanelView(PermanentView):
             'member_timeout': '⏰ Тайм-аут',
         }
         
-        embed = discord.Embed(
+        view = LogsPageView(
+            guild_id=str(interaction.guild.id),
             title="📋 ПОСЛЕДНИЕ ДЕЙСТВИЯ НА СЕРВЕРЕ",
-            color=0x7289da,
-            timestamp=datetime.now()
+            event_names=event_names
         )
+        embed = await view.load_page()
         
-        for log in logs[:20]:
-            time_str = log['timestamp'][:16] if log['timestamp'] else "?"
-            event_icon = event_names.get(log['event_type'], log['event_type'])
-            embed.add_field(
-                name=f"[{time_str}] {event_icon}",
-                value=f"👤 <@{log['user_id']}>\n📝 {log['details'][:80] if log['details'] else '-'}",
-                inline=False
-            )
+        if embed is None:
+            await interaction.response.send_message("📭 Нет записей в логах", ephemeral=True)
+            return
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
     
     @discord.ui.button(
         label="🔍 ПОИСК ПО ПОЛЬЗОВАТЕЛЮ",
@@ -72,6 +62,16 @@ class ActionLogsPanelView(PermanentView):
     async def search_by_user(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(SearchByUserModal())
     
+    @discord.ui.button(
+        label="🔎 ПОИСК ПО ТЕКСТУ",
+        style=discord.ButtonStyle.secondary,
+        emoji="🔎",
+        row=2,
+        custom_id="logs_search_text"
+    )
+    async def search_by_text(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(SearchTextModal())
+    
     @discord.ui.button(
         label="🎯 ПОИСК ПО СОБЫТИЮ",
         style=discord.ButtonStyle.secondary,
@@ -102,6 +102,7 @@ class ActionLogsPanelView(PermanentView):
         custom_id="logs_stats"
     )
     async def show_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await action_logs_manager.flush()
         stats = action_logs_manager.get_stats(str(interaction.guild.id), days=30)
         
         event_names = {
@@ -141,9 +142,108 @@ class ActionLogsPanelView(PermanentView):
                 top_text += f"• {name}: {e['count']}\n"
             embed.add_field(name="🏆 Топ событий", value=top_text, inline=False)
         
+        writer = action_logs_manager.get_writer_stats()
+        embed.add_field(
+            name="🧾 Очередь записи",
+            value=f"В очереди: **{writer['depth']}** (макс. {writer['max_depth']}/{writer['max_queue']})\n"
+                  f"Записано: {writer['flushed_rows']} за {writer['flushes']} сброс(ов)\n"
+                  f"Сброс: {writer['last_flush_ms']} мс (ср. {writer['avg_flush_ms']}, макс. {writer['max_flush_ms']})",
+            inline=False
+        )
+        
+        delivery = action_logs_manager.get_delivery_stats()
+        embed.add_field(
+            name="📨 Отправка в канал",
+            value=f"Событий: **{delivery['delivered_events']}** в {delivery['messages_sent']} сообщ. "
+                  f"(сэкономлено запросов: **{delivery['saved_calls']}**)\n"
+                  f"Ожидают: {delivery['pending']} · 429: {delivery['rate_limited']} · "
+                  f"ошибок: {delivery['failed']} · пропущено: {delivery['dropped']}",
+            inline=False
+        )
+        
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
+class LogsPageView(discord.ui.View):
+    """Постраничный просмотр логов по непрозрачным курсорам менеджера"""
+    
+    PAGE_SIZE = 20
+    
+    def __init__(self, guild_id: str, title: str, event_names: dict, description: str = None,
+                 user_id: str = None, event_type: str = None, days: int = None,
+                 show_user: bool = True, show_event: bool = True):
+        super().__init__(timeout=300)
+        self.guild_id = guild_id
+        self.title = title
+        self.description = description
+        self.event_names = event_names
+        self.user_id = user_id
+        self.event_type = event_type
+        self.days = days
+        self.show_user = show_user
+        self.show_event = show_event
+        self.page = 1
+        self.prev_cursor = None
+        self.next_cursor = None
+    
+    async def load_page(self, cursor: str = None):
+        logs, prev_cursor, next_cursor = await action_logs_manager.get_logs_page(
+            self.guild_id, limit=self.PAGE_SIZE, cursor=cursor,
+            user_id=self.user_id, event_type=self.event_type, days=self.days
+        )
+        if not logs:
+            return None
+        
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+        self.newer_page.disabled = prev_cursor is None
+        self.older_page.disabled = next_cursor is None
+        
+        embed = discord.Embed(
+            title=self.title,
+            description=self.description,
+            color=0x7289da,
+            timestamp=datetime.now()
+        )
+        
+        for log in logs:
+            time_str = log['timestamp'][:16] if log['timestamp'] else "?"
+            name = f"[{time_str}]"
+            if self.show_event:
+                name += f" {self.event_names.get(log['event_type'], log['event_type'])}"
+            value = f"📝 {log['details'][:100] if log['details'] else '-'}"
+            if self.show_user:
+                value = f"👤 <@{log['user_id']}>\n" + value
+            embed.add_field(name=name, value=value, inline=False)
+        
+        embed.set_footer(text=f"Страница {self.page}")
+        return embed
+    
+    @discord.ui.button(label="◀ Новее", style=discord.ButtonStyle.secondary)
+    async def newer_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = await self.load_page(self.prev_cursor)
+        if embed is None:
+            # Более новых записей не осталось — показываем первую страницу
+            self.page = 1
+            embed = await self.load_page()
+        else:
+            self.page = max(1, self.page - 1)
+            embed.set_footer(text=f"Страница {self.page}")
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="Старше ▶", style=discord.ButtonStyle.primary)
+    async def older_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        embed = await self.load_page(self.next_cursor)
+        if embed is None:
+            # Старые записи успели удалить — остаёмся на текущей странице
+            self.older_page.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        self.page += 1
+        embed.set_footer(text=f"Страница {self.page}")
+        await interaction.response.edit_message(embed=embed, view=self)
+
+
 class SearchByUserModal(discord.ui.Modal, title="🔍 ПОИСК ПО ПОЛЬЗОВАТЕЛЮ"):
     user_id = discord.ui.TextInput(label="ID пользователя", placeholder="123456789012345678", max_length=20, required=True)
     days = discord.ui.TextInput(label="За сколько дней", placeholder="7", default="30", max_length=3, required=False)
@@ -153,12 +253,6 @@ class SearchByUserModal(discord.ui.Modal, title="🔍 ПОИСК ПО ПОЛЬЗ
             uid = self.user_id.value
             days = int(self.days.value) if self.days.value else 30
             
-            logs = action_logs_manager.get_logs(str(interaction.guild.id), limit=50, user_id=uid, days=days)
-            
-            if not logs:
-                await interaction.response.send_message(f"📭 Нет действий от пользователя <@{uid}> за {days} дней", ephemeral=True)
-                return
-            
             event_names = {
                 'voice_join': '🎙️ Вход в войс',
                 'voice_leave': '🎙️ Выход из войса',
@@ -171,31 +265,142 @@ class SearchByUserModal(discord.ui.Modal, title="🔍 ПОИСК ПО ПОЛЬЗ
                 'member_timeout': '⏰ Тайм-аут',
             }
             
-            embed = discord.Embed(
-                title=f"🔍 ДЕЙСТВИЯ ПОЛЬЗОВАТЕЛЯ",
+            view = LogsPageView(
+                guild_id=str(interaction.guild.id),
+                title="🔍 ДЕЙСТВИЯ ПОЛЬЗОВАТЕЛЯ",
                 description=f"<@{uid}> за последние {days} дней",
-                color=0x7289da,
-                timestamp=datetime.now()
+                event_names=event_names,
+                user_id=uid,
+                days=days,
+                show_user=False
             )
+            embed = await view.load_page()
             
-            for log in logs[:20]:
-                time_str = log['timestamp'][:16] if log['timestamp'] else "?"
-                event_name = event_names.get(log['event_type'], log['event_type'])
-                embed.add_field(
-                    name=f"[{time_str}] {event_name}",
-                    value=f"📝 {log['details'][:100] if log['details'] else '-'}",
-                    inline=False
-                )
-            
-            if len(logs) > 20:
-                embed.set_footer(text=f"Показано 20 из {len(logs)} записей")
+            if embed is None:
+                await interaction.response.send_message(f"📭 Нет действий от пользователя <@{uid}> за {days} дней", ephemeral=True)
+                return
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             
         except ValueError:
             await interaction.response.send_message("❌ Введите корректный ID пользователя", ephemeral=True)
 
 
+class SearchTextModal(discord.ui.Modal, title="🔎 ПОИСК ПО ТЕКСТУ ЛОГОВ"):
+    query = discord.ui.TextInput(
+        label="Что искать",
+        placeholder='"точная фраза" ник*',
+        max_length=200,
+        required=True
+    )
+    user_id = discord.ui.TextInput(label="ID пользователя (необязательно)", placeholder="123456789012345678", max_length=20, required=False)
+    event_type = discord.ui.TextInput(label="Тип события (необязательно)", placeholder="message_delete", max_length=50, required=False)
+    days = discord.ui.TextInput(label="За сколько дней (необязательно)", placeholder="30", max_length=3, required=False)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            days = int(self.days.value) if self.days.value else None
+        except ValueError:
+            await interaction.response.send_message("❌ Количество дней должно быть числом", ephemeral=True)
+            return
+        
+        view = SearchResultsView(
+            guild_id=str(interaction.guild.id),
+            text=self.query.value,
+            user_id=self.user_id.value.strip() or None,
+            event_type=self.event_type.value.strip() or None,
+            days=days
+        )
+        embed = await view.load_page()
+        if embed is None:
+            await interaction.response.send_message(f"📭 По запросу `{self.query.value}` ничего не найдено", ephemeral=True)
+            return
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
+
+class SearchResultsView(discord.ui.View):
+    """Результаты полнотекстового поиска с постраничным переходом по курсору"""
+    
+    PAGE_SIZE = 10
+    
+    def __init__(self, guild_id: str, text: str, user_id: str = None,
+                 event_type: str = None, days: int = None):
+        super().__init__(timeout=300)
+        self.guild_id = guild_id
+        self.text = text
+        self.user_id = user_id
+        self.event_type = event_type
+        self.days = days
+        # Логи, записанные после начала поиска, не сдвигают страницы
+        self.max_id = None
+        # Курсоры начала каждой открытой страницы: [None, (score, id), ...]
+        self.cursors = [None]
+        self.next_cursor = None
+    
+    async def load_page(self):
+        if self.max_id is None:
+            self.max_id = await action_logs_manager.search_snapshot()
+        logs = await action_logs_manager.search_logs(
+            self.guild_id, self.text, limit=self.PAGE_SIZE + 1,
+            user_id=self.user_id, event_type=self.event_type, days=self.days,
+            max_id=self.max_id, cursor=self.cursors[-1]
+        )
+        if not logs:
+            return None
+        
+        has_next = len(logs) > self.PAGE_SIZE
+        logs = logs[:self.PAGE_SIZE]
+        self.next_cursor = (logs[-1]['score'], logs[-1]['id']) if has_next else None
+        self.prev_page.disabled = len(self.cursors) <= 1
+        self.next_page.disabled = not has_next
+        
+        embed = discord.Embed(
+            title="🔎 РЕЗУЛЬТАТЫ ПОИСКА",
+            description=f"Запрос: `{self.text[:100]}`",
+            color=0x7289da,
+            timestamp=datetime.now()
+        )
+        for log in logs:
+            time_str = log['timestamp'][:16] if log['timestamp'] else "?"
+            snippet = log['snippet'] or '-'
+            embed.add_field(
+                name=f"[{time_str}] {log['event_type']} · #{log['id']}",
+                value=f"👤 <@{log['user_id']}>\n📝 {snippet[:300]}",
+                inline=False
+            )
+        embed.set_footer(text=f"Страница {len(self.cursors)}")
+        return embed
+    
+    @discord.ui.button(label="◀ Назад", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        embed = await self.load_page()
+        await self._show(interaction, embed)
+    
+    @discord.ui.button(label="Далее ▶", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        moved = self.next_cursor is not None
+        if moved:
+            self.cursors.append(self.next_cursor)
+        embed = await self.load_page()
+        if embed is None and moved:
+            # Записи между нажатиями могли удалить — остаёмся на текущей странице
+            self.cursors.pop()
+            embed = await self.load_page()
+        await self._show(interaction, embed)
+    
+    async def _show(self, interaction: discord.Interaction, embed):
+        if embed is None:
+            # Удалены все найденные записи — пустое сообщение Discord не примет
+            self.stop()
+            await interaction.response.edit_message(
+                content=f"📭 По запросу `{self.text[:100]}` больше ничего не найдено", embed=None, view=None
+            )
+            return
+        await interaction.response.edit_message(embed=embed, view=self)
+
+
 class SelectEventView(discord.ui.View):
     def __init__(self, events):
         super().__init__(timeout=60)
@@ -231,30 +436,20 @@ class SelectEventView(discord.ui.View):
         
         async def select_callback(interaction: discord.Interaction):
             event_type = select.values[0]
-            logs = action_logs_manager.get_logs(str(interaction.guild.id), limit=50, event_type=event_type)
-            
-            if not logs:
-                await interaction.response.send_message(f"📭 Нет записей с событием '{event_type}'", ephemeral=True)
-                return
-            
-            embed = discord.Embed(
+            view = LogsPageView(
+                guild_id=str(interaction.guild.id),
                 title=f"🎯 СОБЫТИЕ: {event_names.get(event_type, event_type)}",
-                color=0x7289da,
-                timestamp=datetime.now()
+                event_names=event_names,
+                event_type=event_type,
+                show_event=False
             )
+            embed = await view.load_page()
             
-            for log in logs[:20]:
-                time_str = log['timestamp'][:16] if log['timestamp'] else "?"
-                embed.add_field(
-                    name=f"[{time_str}]",
-                    value=f"👤 <@{log['user_id']}>\n📝 {log['details'][:100] if log['details'] else '-'}",
-                    inline=False
-                )
-            
-            if len(logs) > 20:
-                embed.set_footer(text=f"Показано 20 из {len(logs)} записей")
+            if embed is None:
+                await interaction.response.send_message(f"📭 Нет записей с событием '{event_type}'", ephemeral=True)
+                return
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
         
         select.callback = select_callback
         self.add_item(select)
@@ -0,0 +1,167 @@
+"""Отложенная пакетная запись логов действий в БД
+
+Логи копятся в ограниченной очереди и пишутся одной транзакцией
+(executemany) каждые ACTION_LOGS_FLUSH_MS миллисекунд или как только
+набирается ACTION_LOGS_BATCH_SIZE записей. Если очередь заполнена,
+log() ждёт освобождения места (backpressure), а не теряет записи.
+Если пакет не записался, его строки пишутся по одной: теряются только
+те, что не записались и так.
+"""
+import asyncio
+import os
+import time
+
+from core.async_database import adb
+from core.timeutils import msk_now, to_db_timestamp
+
+
+class ActionLogWriter:
+
+    def __init__(self, batch_size: int = None, flush_ms: int = None, max_queue: int = None):
+        self.batch_size = batch_size or int(os.getenv('ACTION_LOGS_BATCH_SIZE', '200'))
+        self.flush_interval = (flush_ms or int(os.getenv('ACTION_LOGS_FLUSH_MS', '500'))) / 1000
+        self.max_queue = max_queue or int(os.getenv('ACTION_LOGS_MAX_QUEUE', '5000'))
+
+        self._queue = None
+        self._wake = None
+        self._task = None
+        self._inflight = None
+        self._held = []
+
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.errors = 0
+        self.dropped_rows = 0
+        self.backpressure_waits = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._wake = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, guild_id: str, event_type: str, user_id: str,
+                  target_id: str = None, details: str = None,
+                  before: str = None, after: str = None):
+        """Поставить запись в очередь. Время фиксируется в момент события."""
+        self._ensure_started()
+
+        row = (guild_id, event_type, user_id, target_id, details, before, after,
+               to_db_timestamp(msk_now()))
+
+        if self._queue.full():
+            self.backpressure_waits += 1
+            self._wake.set()
+        await self._queue.put(row)
+
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if depth >= self.batch_size:
+            self._wake.set()
+
+    def _drain(self, limit: int) -> list:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: list):
+        started = time.perf_counter()
+        written = len(batch)
+        try:
+            await adb.save_action_logs_batch(batch)
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ [ACTION_LOGS] Ошибка записи пакета из {len(batch)} логов: {e}, пишу по одной")
+            written = await self._write_rows(batch)
+            if not written:
+                return
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.flushed_rows += written
+        self.last_flush_ms = elapsed
+        self._total_flush_ms += elapsed
+        if elapsed > self.max_flush_ms:
+            self.max_flush_ms = elapsed
+
+    async def _write_rows(self, batch: list) -> int:
+        """Запасной путь: записать строки пакета по одной, вернуть число записанных"""
+        written = 0
+        for row in batch:
+            try:
+                await adb.save_action_logs_batch([row])
+                written += 1
+            except Exception as e:
+                self.dropped_rows += 1
+                print(f"❌ [ACTION_LOGS] Лог {row[1]} от {row[2]} потерян: {e}")
+        return written
+
+    async def _run(self):
+        while True:
+            # Взятая из очереди запись не должна потеряться при отмене задачи
+            self._held = [await self._queue.get()]
+
+            if self._queue.qsize() + 1 < self.batch_size:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._held + self._drain(self.batch_size - 1)
+            self._held = []
+            if not batch:
+                # Очередь уже выгрузил flush()
+                continue
+            # Запись не прерывается отменой задачи — stop() дождётся её сам
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+
+    async def flush(self):
+        """Записать всё, что сейчас лежит в очереди"""
+        if self._queue is None:
+            return
+        if self._inflight is not None and not self._inflight.done():
+            await self._inflight
+        if self._held:
+            batch, self._held = self._held, []
+            await self._write(batch)
+        while not self._queue.empty():
+            await self._write(self._drain(self.batch_size))
+
+    async def stop(self):
+        """Остановить фоновую задачу и записать остаток очереди"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'max_queue': self.max_queue,
+            'flushes': self.flushes,
+            'flushed_rows': self.flushed_rows,
+            'errors': self.errors,
+            'dropped_rows': self.dropped_rows,
+            'backpressure_waits': self.backpressure_waits,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'avg_flush_ms': round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            'max_flush_ms': round(self.max_flush_ms, 2),
+        }
@@ -4,6 +4,24 @@ from datetime import datetime, timedelta
 from core.database import db
 from core.config import CONFIG, save_config, SUPER_ADMIN_ID
 from core.utils import format_mention, is_super_admin, is_admin
+from core.panels import panel_registry
+
+
+async def _move_panel(interaction, setting_key: str, module: str, panel_kind: str, channel, **kwargs):
+    """Сохранить новый канал панели и опубликовать её там через реестр
+
+    Запись о панели в прежнем канале забывается, иначе show_disabled
+    потом правит осиротевшее сообщение.
+    """
+    old_channel_id = CONFIG.get(setting_key)
+    CONFIG[setting_key] = str(channel.id)
+    db.set_setting(setting_key, str(channel.id), str(interaction.user.id))
+    save_config(str(interaction.user.id))
+
+    if old_channel_id and str(old_channel_id) != str(channel.id):
+        await panel_registry.forget(module, panel_kind, old_channel_id)
+    return await panel_registry.publish(interaction.client, module, panel_kind, channel, **kwargs)
+
 
 # ===== ОРИГИНАЛЬНЫЕ МОДАЛКИ (из CAPT, MCL и т.д.) =====
 
@@ -241,6 +259,8 @@ class AddEventModal(discord.ui.Modal, title="➕ ДОБАВИТЬ МЕРОПРИ
             
             # Генерируем расписание
             db.generate_schedule(days_ahead=14)
+            from event_scheduler.scheduler import reschedule_events
+            await reschedule_events()
             
             days_str = ', '.join([days_names[d] for d in weekdays])
             times_str = ', '.join(times)
@@ -321,6 +341,8 @@ class EditEventModal(discord.ui.Modal, title="✏️ РЕДАКТИРОВАТЬ
         
         db.log_event_action(self.event_id, "edited", str(interaction.user.id),
                            f"Новое: {self.event_name.value} {self.event_time.value}")
+        from event_scheduler.scheduler import reschedule_events
+        await reschedule_events()
         
         await interaction.response.send_message(f"✅ Мероприятие ID {self.event_id} обновлено", ephemeral=True)
 
@@ -1005,8 +1027,7 @@ class SetCaptSettingsChannelModal(discord.ui.Modal, title="⚙️ КАНАЛ Н
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from capt_registration.manager import capt_reg_manager
         from capt_registration.settings_view import CaptSettingsView
         
@@ -1028,24 +1049,15 @@ class SetCaptSettingsChannelModal(discord.ui.Modal, title="⚙️ КАНАЛ Н
                 )
                 return
             
-            # Сохраняем в CONFIG и БД
-            CONFIG['capt_settings_channel'] = self.channel_id.value
-            db.set_setting('capt_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Очищаем старые сообщения в канале
-            async for msg in channel.history(limit=10):
-                if msg.author == interaction.client.user:
-                    await msg.delete()
-            
-            # Отправляем новое сообщение с кнопками настроек
+            # Сохраняем канал и заменяем старые сообщения бота панелью настроек
             view = CaptSettingsView()
             embed = discord.Embed(
                 title="⚙️ **ПАНЕЛЬ УПРАВЛЕНИЯ CAPT**",
                 description="Настройка всех параметров системы регистрации на CAPT",
                 color=0xff0000
             )
-            await channel.send(embed=embed, view=view)
+            await _move_panel(interaction, 'capt_settings_channel', 'capt', 'settings', channel,
+                              embed=embed, view=view, replace=True, scan_limit=10)
             
             await interaction.response.send_message(
                 f"✅ Канал настроек CAPT создан: {channel.mention}",
@@ -1071,8 +1083,7 @@ class SetAdSettingsChannelModal(discord.ui.Modal, title="📢 КАНАЛ НАС
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from advertising.settings_view import AdSettingsView
         
         try:
@@ -1093,24 +1104,15 @@ class SetAdSettingsChannelModal(discord.ui.Modal, title="📢 КАНАЛ НАС
                 )
                 return
             
-            # Сохраняем в CONFIG и БД
-            CONFIG['ad_settings_channel'] = self.channel_id.value
-            db.set_setting('ad_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Очищаем старые сообщения в канале
-            async for msg in channel.history(limit=10):
-                if msg.author == interaction.client.user:
-                    await msg.delete()
-            
-            # Отправляем новое сообщение с кнопками настроек
+            # Сохраняем канал и заменяем старые сообщения бота панелью настроек
             view = AdSettingsView()
             embed = discord.Embed(
                 title="📢 **ПАНЕЛЬ УПРАВЛЕНИЯ АВТО-РЕКЛАМОЙ**",
                 description="Настройка параметров автоматической рекламы",
                 color=0x00ff00
             )
-            await channel.send(embed=embed, view=view)
+            await _move_panel(interaction, 'ad_settings_channel', 'advertising', 'settings', channel,
+                              embed=embed, view=view, replace=True, scan_limit=10)
             
             await interaction.response.send_message(
                 f"✅ Канал настроек авто-рекламы создан: {channel.mention}",
@@ -1135,8 +1137,7 @@ class SetEventsSettingsChannelModal(discord.ui.Modal, title="🔔 КАНАЛ Н
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from event_scheduler.settings_view import EventSchedulerSettingsView
         
         try:
@@ -1157,24 +1158,15 @@ class SetEventsSettingsChannelModal(discord.ui.Modal, title="🔔 КАНАЛ Н
                 )
                 return
             
-            # Сохраняем в CONFIG и БД
-            CONFIG['events_settings_channel'] = self.channel_id.value
-            db.set_setting('events_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Очищаем старые сообщения в канале
-            async for msg in channel.history(limit=10):
-                if msg.author == interaction.client.user:
-                    await msg.delete()
-            
-            # Отправляем новое сообщение с кнопками настроек
+            # Сохраняем канал и заменяем старые сообщения бота панелью настроек
             view = EventsSettingsView()
             embed = discord.Embed(
                 title="🔔 **ПАНЕЛЬ УПРАВЛЕНИЯ МЕРОПРИЯТИЯМИ**",
                 description="Управление автоматическими напоминаниями о мероприятиях",
                 color=0xffa500
             )
-            await channel.send(embed=embed, view=view)
+            await _move_panel(interaction, 'events_settings_channel', 'events', 'settings', channel,
+                              embed=embed, view=view, replace=True, scan_limit=10)
             
             await interaction.response.send_message(
                 f"✅ Канал настроек мероприятий создан: {channel.mention}",
@@ -1197,8 +1189,7 @@ class SetApplicationsSettingsChannelModal(discord.ui.Modal, title="📝 КАНА
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from applications.settings_view import ApplicationsCombinedPanel  # ← ИСПРАВЛЕНО
         
         try:
@@ -1228,36 +1219,21 @@ class SetApplicationsSettingsChannelModal(discord.ui.Modal, title="📝 КАНА
                 )
                 return
             
-            # Сохраняем в CONFIG и БД
-            CONFIG['applications_settings_channel'] = self.channel_id.value
-            db.set_setting('applications_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Ищем существующее сообщение с панелью управления
-            app_settings_exists = False
-            async for msg in channel.history(limit=50):
-                if msg.author == interaction.client.user and msg.embeds:
-                    if msg.embeds and "УПРАВЛЕНИЕ И МОДЕРАЦИЯ ЗАЯВОК" in msg.embeds[0].title:  # ← ИСПРАВЛЕНО
-                        await msg.edit(view=ApplicationsCombinedPanel())  # ← ИСПРАВЛЕНО
-                        app_settings_exists = True
-                        await interaction.response.send_message(
-                            f"✅ Панель управления заявками обновлена в {channel.mention}",
-                            ephemeral=True
-                        )
-                        break
-            
-            # Если сообщение не найдено - создаём новое
-            if not app_settings_exists:
-                embed = discord.Embed(
-                    title="📋 **УПРАВЛЕНИЕ И МОДЕРАЦИЯ ЗАЯВОК**",  # ← ИСПРАВЛЕНО
-                    description="Настройка системы и управление заявками",  # ← ИСПРАВЛЕНО
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=ApplicationsCombinedPanel())  # ← ИСПРАВЛЕНО
-                await interaction.response.send_message(
-                    f"✅ Канал настроек заявок создан: {channel.mention}",
-                    ephemeral=True
-                )
+            # Сохраняем канал; прежняя панель ищется по заголовку только при первом переносе
+            embed = discord.Embed(
+                title="📋 **УПРАВЛЕНИЕ И МОДЕРАЦИЯ ЗАЯВОК**",
+                description="Настройка системы и управление заявками",
+                color=0x00ff00
+            )
+            await _move_panel(
+                interaction, 'applications_settings_channel', 'applications', 'settings', channel,
+                embed=embed, view=ApplicationsCombinedPanel(),
+                match=lambda msg: bool(msg.embeds) and "УПРАВЛЕНИЕ И МОДЕРАЦИЯ ЗАЯВОК" in (msg.embeds[0].title or "")
+            )
+            await interaction.response.send_message(
+                f"✅ Канал настроек заявок создан: {channel.mention}",
+                ephemeral=True
+            )
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Ошибка: {e}", ephemeral=True)
@@ -1271,7 +1247,7 @@ class SetFamilyNameModal(discord.ui.Modal, title="🏷️ НАЗВАНИЕ СЕ
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
+        from core.config import CONFIG
         from core.database import db
         try:
             CONFIG['family_name'] = self.name.value
@@ -1298,8 +1274,7 @@ class SetAFKSettingsChannelModal(discord.ui.Modal, title="🛌 КАНАЛ НАС
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from afk.settings_view import AFKSettingsView
         
         try:
@@ -1328,34 +1303,21 @@ class SetAFKSettingsChannelModal(discord.ui.Modal, title="🛌 КАНАЛ НАС
                 )
                 return
             
-            CONFIG['afk_settings_channel'] = self.channel_id.value
-            db.set_setting('afk_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Ищем существующее сообщение с настройками AFK
-            message_exists = False
-            async for msg in channel.history(limit=50):
-                if msg.author == interaction.client.user and msg.embeds:
-                    if msg.embeds and "НАСТРОЙКИ AFK" in msg.embeds[0].title:
-                        await msg.edit(view=AFKSettingsView())
-                        message_exists = True
-                        await interaction.response.send_message(
-                            f"✅ Панель настроек AFK обновлена в {channel.mention}",
-                            ephemeral=True
-                        )
-                        break
-            
-            if not message_exists:
-                embed = discord.Embed(
-                    title="⚙️ **НАСТРОЙКИ AFK**",
-                    description="Настройка системы ухода в AFK",
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=AFKSettingsView())
-                await interaction.response.send_message(
-                    f"✅ Канал настроек AFK создан: {channel.mention}",
-                    ephemeral=True
-                )
+            # Сохраняем канал; прежняя панель ищется по заголовку только при первом переносе
+            embed = discord.Embed(
+                title="⚙️ **НАСТРОЙКИ AFK**",
+                description="Настройка системы ухода в AFK",
+                color=0x00ff00
+            )
+            await _move_panel(
+                interaction, 'afk_settings_channel', 'afk', 'settings', channel,
+                embed=embed, view=AFKSettingsView(),
+                match=lambda msg: bool(msg.embeds) and "НАСТРОЙКИ AFK" in (msg.embeds[0].title or "")
+            )
+            await interaction.response.send_message(
+                f"✅ Канал настроек AFK создан: {channel.mention}",
+                ephemeral=True
+            )
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Ошибка: {e}", ephemeral=True)
@@ -1373,8 +1335,7 @@ class SetTierSettingsChannelModal(discord.ui.Modal, title="🌟 КАНАЛ НА
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from tier.settings_view import TierSettingsView
         
         try:
@@ -1403,34 +1364,21 @@ class SetTierSettingsChannelModal(discord.ui.Modal, title="🌟 КАНАЛ НА
                 )
                 return
             
-            CONFIG['tier_settings_channel'] = self.channel_id.value
-            db.set_setting('tier_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Ищем существующее сообщение
-            message_exists = False
-            async for msg in channel.history(limit=50):
-                if msg.author == interaction.client.user and msg.embeds:
-                    if msg.embeds and "НАСТРОЙКИ TIER" in msg.embeds[0].title:
-                        await msg.edit(view=TierSettingsView())
-                        message_exists = True
-                        await interaction.response.send_message(
-                            f"✅ Панель настроек TIER обновлена в {channel.mention}",
-                            ephemeral=True
-                        )
-                        break
-            
-            if not message_exists:
-                embed = discord.Embed(
-                    title="⚙️ **НАСТРОЙКИ TIER**",
-                    description="Настройка системы повышения уровня",
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=TierSettingsView())
-                await interaction.response.send_message(
-                    f"✅ Канал настроек TIER создан: {channel.mention}",
-                    ephemeral=True
-                )
+            # Сохраняем канал; прежняя панель ищется по заголовку только при первом переносе
+            embed = discord.Embed(
+                title="⚙️ **НАСТРОЙКИ TIER**",
+                description="Настройка системы повышения уровня",
+                color=0x00ff00
+            )
+            await _move_panel(
+                interaction, 'tier_settings_channel', 'tier', 'settings', channel,
+                embed=embed, view=TierSettingsView(),
+                match=lambda msg: bool(msg.embeds) and "НАСТРОЙКИ TIER" in (msg.embeds[0].title or "")
+            )
+            await interaction.response.send_message(
+                f"✅ Канал настроек TIER создан: {channel.mention}",
+                ephemeral=True
+            )
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Ошибка: {e}", ephemeral=True)
@@ -1448,8 +1396,7 @@ class SetStatsSettingsChannelModal(discord.ui.Modal, title="📊 КАНАЛ НА
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from server_stats.settings_view import StatsSettingsView
         
         try:
@@ -1479,35 +1426,21 @@ class SetStatsSettingsChannelModal(discord.ui.Modal, title="📊 КАНАЛ НА
                 )
                 return
             
-            # Сохраняем в CONFIG и БД
-            CONFIG['stats_settings_channel'] = self.channel_id.value
-            db.set_setting('stats_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Ищем существующее сообщение
-            message_exists = False
-            async for msg in channel.history(limit=50):
-                if msg.author == interaction.client.user and msg.embeds:
-                    if msg.embeds and "НАСТРОЙКИ СТАТИСТИКИ" in msg.embeds[0].title:
-                        await msg.edit(view=StatsSettingsView())
-                        message_exists = True
-                        await interaction.response.send_message(
-                            f"✅ Панель настроек статистики обновлена в {channel.mention}",
-                            ephemeral=True
-                        )
-                        break
-            
-            if not message_exists:
-                embed = discord.Embed(
-                    title="📊 **НАСТРОЙКИ СТАТИСТИКИ**",
-                    description="Настройка системы статистики сервера",
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=StatsSettingsView())
-                await interaction.response.send_message(
-                    f"✅ Канал настроек статистики создан: {channel.mention}",
-                    ephemeral=True
-                )
+            # Сохраняем канал; прежняя панель ищется по заголовку только при первом переносе
+            embed = discord.Embed(
+                title="📊 **НАСТРОЙКИ СТАТИСТИКИ**",
+                description="Настройка системы статистики сервера",
+                color=0x00ff00
+            )
+            await _move_panel(
+                interaction, 'stats_settings_channel', 'stats', 'settings', channel,
+                embed=embed, view=StatsSettingsView(),
+                match=lambda msg: bool(msg.embeds) and "НАСТРОЙКИ СТАТИСТИКИ" in (msg.embeds[0].title or "")
+            )
+            await interaction.response.send_message(
+                f"✅ Канал настроек статистики создан: {channel.mention}",
+                ephemeral=True
+            )
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Ошибка: {e}", ephemeral=True)
@@ -1525,8 +1458,7 @@ class SetVacationSettingsChannelModal(discord.ui.Modal, title="🏖️ КАНА
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        from core.config import CONFIG, save_config
-        from core.database import db
+        from core.config import CONFIG
         from vacation.settings_view import VacationSettingsView
         
         try:
@@ -1554,34 +1486,21 @@ class SetVacationSettingsChannelModal(discord.ui.Modal, title="🏖️ КАНА
                 )
                 return
             
-            CONFIG['vacation_settings_channel'] = self.channel_id.value
-            db.set_setting('vacation_settings_channel', self.channel_id.value, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
-            # Ищем существующее сообщение
-            message_exists = False
-            async for msg in channel.history(limit=50):
-                if msg.author == interaction.client.user and msg.embeds:
-                    if msg.embeds and "НАСТРОЙКИ ОТПУСКОВ" in msg.embeds[0].title:
-                        await msg.edit(view=VacationSettingsView())
-                        message_exists = True
-                        await interaction.response.send_message(
-                            f"✅ Панель настроек отпусков обновлена в {channel.mention}",
-                            ephemeral=True
-                        )
-                        break
-            
-            if not message_exists:
-                embed = discord.Embed(
-                    title="⚙️ **НАСТРОЙКИ ОТПУСКОВ**",
-                    description="Настройка системы отпусков",
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=VacationSettingsView())
-                await interaction.response.send_message(
-                    f"✅ Канал настроек отпусков создан: {channel.mention}",
-                    ephemeral=True
-                )
+            # Сохраняем канал; прежняя панель ищется по заголовку только при первом переносе
+            embed = discord.Embed(
+                title="⚙️ **НАСТРОЙКИ ОТПУСКОВ**",
+                description="Настройка системы отпусков",
+                color=0x00ff00
+            )
+            await _move_panel(
+                interaction, 'vacation_settings_channel', 'vacation', 'settings', channel,
+                embed=embed, view=VacationSettingsView(),
+                match=lambda msg: bool(msg.embeds) and "НАСТРОЙКИ ОТПУСКОВ" in (msg.embeds[0].title or "")
+            )
+            await interaction.response.send_message(
+                f"✅ Канал настроек отпусков создан: {channel.mention}",
+                ephemeral=True
+            )
             
         except Exception as e:
             await interaction.response.send_message(f"❌ Ошибка: {e}", ephemeral=True)
@@ -1655,24 +1574,20 @@ class SetBirthdaySettingsChannelModal(discord.ui.Modal, title="⚙️ КАНАЛ
         from core.database import db
         from birthday.settings import BirthdaySettingsView
         
-        CONFIG['birthday_settings_channel'] = self.channel_id.value
-        db.set_setting('birthday_settings_channel', self.channel_id.value, str(interaction.user.id))
-        save_config(str(interaction.user.id))
-        
         guild = interaction.client.get_guild(int(CONFIG.get('server_id')))
-        if guild:
-            channel = guild.get_channel(int(self.channel_id.value))
-            if channel:
-                async for msg in channel.history(limit=10):
-                    if msg.author == interaction.client.user:
-                        await msg.delete()
-                
-                embed = discord.Embed(
-                    title="⚙️ **УПРАВЛЕНИЕ СИСТЕМОЙ ДНЕЙ РОЖДЕНИЯ**",
-                    description="Настройка и управление системой",
-                    color=0x00ff00
-                )
-                await channel.send(embed=embed, view=BirthdaySettingsView())
+        channel = guild.get_channel(int(self.channel_id.value)) if guild else None
+        if channel:
+            embed = discord.Embed(
+                title="⚙️ **УПРАВЛЕНИЕ СИСТЕМОЙ ДНЕЙ РОЖДЕНИЯ**",
+                description="Настройка и управление системой",
+                color=0x00ff00
+            )
+            await _move_panel(interaction, 'birthday_settings_channel', 'birthday', 'settings', channel,
+                              embed=embed, view=BirthdaySettingsView(), replace=True, scan_limit=10)
+        else:
+            CONFIG['birthday_settings_channel'] = self.channel_id.value
+            db.set_setting('birthday_settings_channel', self.channel_id.value, str(interaction.user.id))
+            save_config(str(interaction.user.id))
         
         await interaction.response.send_message(
             f"✅ Канал настроек дней рождения установлен: <#{self.channel_id.value}>",
@@ -1695,29 +1610,26 @@ class SetGlobalSettingsChannelModal(discord.ui.Modal, title="🎛️ КАНАЛ
             # Просто сохраняем ID
             channel_id = self.channel_id.value
             
-            CONFIG['global_settings_channel'] = channel_id
-            db.set_setting('global_settings_channel', channel_id, str(interaction.user.id))
-            save_config(str(interaction.user.id))
-            
             # Пытаемся получить канал и создать панель (если получится)
             guild = interaction.client.get_guild(int(CONFIG.get('server_id')))
-            if guild:
-                channel = guild.get_channel(int(channel_id))
-                if channel:
-                    async for msg in channel.history(limit=50):
-                        if msg.author == interaction.client.user:
-                            await msg.delete()
-                    
-                    embed = discord.Embed(
-                        title="🎛️ **ЦЕНТР УПРАВЛЕНИЯ МОДУЛЯМИ**",
-                        description="Включение/выключение систем бота.\n\n"
-                                    "🟢 **Включено** — система активна и работает\n"
-                                    "🔴 **Выключено** — система недоступна, все её каналы отключены\n\n"
-                                    "Настройки каналов каждой системы производятся после её включения "
-                                    "через отдельные панели управления.",
-                        color=0x7289da
-                    )
-                    await channel.send(embed=embed, view=ModulesControlPanel(interaction.client, module_manager))
+            channel = guild.get_channel(int(channel_id)) if guild else None
+            if not channel:
+                CONFIG['global_settings_channel'] = channel_id
+                db.set_setting('global_settings_channel', channel_id, str(interaction.user.id))
+                save_config(str(interaction.user.id))
+            else:
+                embed = discord.Embed(
+                    title="🎛️ **ЦЕНТР УПРАВЛЕНИЯ МОДУЛЯМИ**",
+                    description="Включение/выключение систем бота.\n\n"
+                                "🟢 **Включено** — система активна и работает\n"
+                                "🔴 **Выключено** — система недоступна, все её каналы отключены\n\n"
+                                "Настройки каналов каждой системы производятся после её включения "
+                                "через отдельные панели управления.",
+                    color=0x7289da
+                )
+                await _move_panel(interaction, 'global_settings_channel', 'core', 'global_settings', channel,
+                                  embed=embed, view=ModulesControlPanel(interaction.client, module_manager),
+                                  replace=True)
             
             await interaction.response.send_message(
                 f"✅ Канал управления модулями установлен: ID `{channel_id}`\n"
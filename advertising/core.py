@@ -1,5 +1,4 @@
 """Auto Advertising Core - Простая автоматическая рассылка"""
-import asyncio
 import logging
 import os
 import traceback
@@ -9,6 +8,7 @@ import discord
 import aiohttp
 from core.database import db
 from core.config import CONFIG
+from core.scheduler import scheduler
 import json
 
 logger = logging.getLogger(__name__)
@@ -24,7 +24,7 @@ class AutoAdvertiser:
         self.bot = bot
         self.running = True
         self.check_interval = 60
-        self.task = None
+        self.job = None
         self.last_sent_time = None
         self.super_admin_id = CONFIG.get('super_admin_id')
         
@@ -49,12 +49,13 @@ class AutoAdvertiser:
     async def start(self):
         logger.info("📢 Auto Advertiser запущен")
         await self.initialize_settings_channel(self.bot)
-        self.task = asyncio.create_task(self._run())
+        self.job = scheduler.every('auto_advertiser', self.check_interval, self._run, first_delay=0)
     
     async def stop(self):
         self.running = False
-        if self.task:
-            self.task.cancel()
+        if self.job:
+            self.job.cancel()
+            self.job = None
             logger.info("📢 Auto Advertiser остановлен")
     
     def get_ad_text(self):
@@ -98,15 +99,13 @@ class AutoAdvertiser:
         pass
     
     async def _run(self):
-        while self.running:
-            try:
-                await self.check_and_send()
-            except Exception as e:
-                error_msg = f"Ошибка в авто-рекламе: {e}\n{traceback.format_exc()}"
-                logger.error(error_msg)
-                print(f"❌ {error_msg}")
-                await self.notify_admin(f"❌ Ошибка: {e}")
-            await asyncio.sleep(self.check_interval)
+        try:
+            await self.check_and_send()
+        except Exception as e:
+            error_msg = f"Ошибка в авто-рекламе: {e}\n{traceback.format_exc()}"
+            logger.error(error_msg)
+            print(f"❌ {error_msg}")
+            await self.notify_admin(f"❌ Ошибка: {e}")
     
     async def check_and_send(self):
         now = datetime.now(MSK_TZ)
@@ -313,11 +312,6 @@ class AutoAdvertiser:
             logger.error(f"❌ Критическая ошибка инициализации канала настроек: {e}", exc_info=True)
             return False
 
-    async def stop(self):
-        self.running = False
-        if self.task:
-            self.task.cancel()
-
 advertiser = None
 
 async def setup(bot):
@@ -7,6 +7,7 @@ from datetime import datetime
 from afk.manager import afk_manager
 from afk.views import AFKPublicView
 from afk.settings_view import AFKSettingsView
+from core.scheduler import scheduler
 
 logger = logging.getLogger(__name__)
 MSK_TZ = pytz.timezone('Europe/Moscow')
@@ -39,71 +40,51 @@ class AFKInitializer:
         logger.info("✅ Инициализация системы AFK завершена")
     
     async def start_expiry_checker(self):
-        """Запустить фоновую задачу для проверки просроченных AFK"""
-        self.expiry_task = self.bot.loop.create_task(self._check_expired_afk())
+        """Зарегистрировать проверку просроченных AFK (каждые 60 секунд)"""
+        scheduler.every('afk_expiry', 60, self._check_expired_afk, first_delay=0)
         logger.info("✅ Запущен автоматический проверщик просроченного AFK")
     
     async def start_embed_updater(self):
-        """Запустить фоновую задачу для периодического обновления embed"""
-        self.embed_task = self.bot.loop.create_task(self._update_embed_periodically())
+        """Зарегистрировать периодическое обновление embed (каждые 30 секунд)"""
+        scheduler.every('afk_embed', 30, self._update_embed, first_delay=0)
         logger.info("✅ Запущен автоматический обновлятор AFK embed (каждые 30 секунд)")
     
-    async def _update_embed_periodically(self):
-        """Фоновая задача: обновлять embed каждые 30 секунд"""
-        await self.bot.wait_until_ready()
-        
-        while not self.bot.is_closed():
-            try:
-                settings = afk_manager.get_settings()
-                channel_id = settings.get('afk_channel')
-                
-                if channel_id:
-                    from afk.views import update_afk_embed
-                    await update_afk_embed(self.bot, channel_id)
-                    logger.debug("🔄 Embed AFK обновлён")
-                
-                await asyncio.sleep(30)
-                
-            except Exception as e:
-                logger.error(f"❌ Ошибка при обновлении embed: {e}")
-                await asyncio.sleep(30)
+    async def _update_embed(self):
+        """Обновить embed AFK"""
+        settings = afk_manager.get_settings()
+        channel_id = settings.get('afk_channel')
+        
+        if channel_id:
+            from afk.views import update_afk_embed
+            await update_afk_embed(self.bot, channel_id)
+            logger.debug("🔄 Embed AFK обновлён")
     
     async def _check_expired_afk(self):
-        """Фоновая задача: проверять каждые 60 секунд"""
-        await self.bot.wait_until_ready()
-        
-        while not self.bot.is_closed():
-            try:
-                expired = afk_manager.check_expired()
-                
-                if expired:
-                    logger.info(f"⏰ Найдено просроченных AFK: {len(expired)}")
-                    
-                    settings = afk_manager.get_settings()
-                    channel_id = settings.get('afk_channel')
-                    if channel_id:
-                        from afk.views import update_afk_embed
-                        await update_afk_embed(self.bot, channel_id)
-                    
-                    log_channel_id = settings.get('afk_log_channel')
-                    if log_channel_id:
-                        log_channel = self.bot.get_channel(int(log_channel_id))
-                        if log_channel:
-                            for user_id, user_name in expired:
-                                embed = discord.Embed(
-                                    title="⏰ AFK ИСТЕКЛО",
-                                    description=f"Пользователь **{user_name}** (<@{user_id}>) автоматически вышел из AFK",
-                                    color=0xffa500,
-                                    timestamp=datetime.now(MSK_TZ)
-                                )
-                                await log_channel.send(embed=embed)
-                                await asyncio.sleep(0.5)
-                
-                await asyncio.sleep(60)
-                
-            except Exception as e:
-                logger.error(f"❌ Ошибка в проверке AFK: {e}")
-                await asyncio.sleep(60)
+        """Снять просроченные AFK и сообщить в лог"""
+        expired = afk_manager.check_expired()
+        
+        if expired:
+            logger.info(f"⏰ Найдено просроченных AFK: {len(expired)}")
+            
+            settings = afk_manager.get_settings()
+            channel_id = settings.get('afk_channel')
+            if channel_id:
+                from afk.views import update_afk_embed
+                await update_afk_embed(self.bot, channel_id)
+            
+            log_channel_id = settings.get('afk_log_channel')
+            if log_channel_id:
+                log_channel = self.bot.get_channel(int(log_channel_id))
+                if log_channel:
+                    for user_id, user_name in expired:
+                        embed = discord.Embed(
+                            title="⏰ AFK ИСТЕКЛО",
+                            description=f"Пользователь **{user_name}** (<@{user_id}>) автоматически вышел из AFK",
+                            color=0xffa500,
+                            timestamp=datetime.now(MSK_TZ)
+                        )
+                        await log_channel.send(embed=embed)
+                        await asyncio.sleep(0.5)
     
     async def _init_afk_channel(self, settings):
         channel_id = settings.get('afk_channel')
@@ -116,28 +97,10 @@ class AFKInitializer:
             logger.error(f"❌ Канал AFK {channel_id} не найден")
             return
         
-        # === УДАЛЯЕМ СТАРОЕ СООБЩЕНИЕ БОТА ===
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                await msg.delete()
-                break
-        
-        from afk.views import AFKPublicView, update_afk_embed
-        
-        max_hours = int(settings.get('afk_max_hours', 24))
-        
-        embed = discord.Embed(
-            title="🛌 **СИСТЕМА AFK**",
-            description="✨ **Никого нет в AFK**\n\nНажмите кнопку ниже, чтобы уйти в AFK",
-            color=0x2b2d31,
-            timestamp=datetime.now(MSK_TZ)
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/emojis/1302858797087854592.png?size=96")
-        embed.set_footer(text="• Статус: Активен •", icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None)
-        
-        await channel.send(embed=embed, view=AFKPublicView(self.bot, channel_id, max_hours))
-        await update_afk_embed(self.bot, channel_id)
-        print(f"✅ Создана панель AFK в #{channel.name}")
+        # Панель из реестра редактируется на месте, без удаления и повторной отправки
+        from afk.views import publish_afk_panel
+        await publish_afk_panel(self.bot, channel)
+        print(f"✅ Панель AFK в #{channel.name} актуальна")
     
     async def _init_settings_channel(self):
         """Инициализация канала настроек AFK"""
@@ -175,11 +138,9 @@ class AFKInitializer:
         """Остановить систему AFK"""
         print("🛌 [AFK] Остановка системы AFK...")
         
-        # Останавливаем фоновые задачи
-        if hasattr(self, 'expiry_task') and self.expiry_task:
-            self.expiry_task.cancel()
-        if hasattr(self, 'embed_task') and self.embed_task:
-            self.embed_task.cancel()
+        # Снимаем фоновые задачи с планировщика
+        scheduler.cancel('afk_expiry')
+        scheduler.cancel('afk_embed')
         
         # Отключаем канал AFK
         settings = afk_manager.get_settings()
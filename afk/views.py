@@ -6,63 +6,29 @@ from datetime import datetime
 from afk.base import PermanentView
 from afk.modals import AFKModal
 from afk.manager import afk_manager
+from core.panels import panel_registry
 
 logger = logging.getLogger(__name__)
 MSK_TZ = pytz.timezone('Europe/Moscow')
 
 
-async def update_afk_embed(bot, channel_id: str):
-    """Обновить красивый embed со списком AFK пользователей (с полями)"""
-    channel = bot.get_channel(int(channel_id))
-    if not channel:
-        logger.error(f"❌ Канал {channel_id} не найден для обновления embed")
-        return
-    
+# Время в embed меняется при каждой отрисовке и само по себе не повод для правки
+AFK_VOLATILE = ('timestamp', 'footer')
+
+
+def _is_afk_message(msg) -> bool:
+    """Старая панель AFK: по кнопкам, иначе по заголовку embed"""
+    for component in msg.components:
+        for button in getattr(component, 'children', []):
+            if getattr(button, 'custom_id', None) in ["afk_go", "afk_back"]:
+                return True
+    return bool(msg.embeds) and "СИСТЕМА AFK" in (msg.embeds[0].title or "")
+
+
+def build_afk_embed(bot) -> discord.Embed:
+    """Красивый embed со списком AFK пользователей (с полями)"""
     users = afk_manager.get_all_afk_users()
     
-    # Ищем существующее сообщение с кнопками AFK
-    target_message = None
-    async for msg in channel.history(limit=50):
-        if msg.author == bot.user:
-            if msg.components and len(msg.components) > 0:
-                for component in msg.components:
-                    for button in component.children:
-                        if button.custom_id in ["afk_go", "afk_back"]:
-                            target_message = msg
-                            logger.info(f"✅ Найдено сообщение AFK в #{channel.name} (ID: {msg.id})")
-                            break
-                    if target_message:
-                        break
-            if target_message:
-                break
-    
-    # Если сообщение не найдено, пробуем найти по embed заголовку
-    if not target_message:
-        async for msg in channel.history(limit=50):
-            if msg.author == bot.user and msg.embeds:
-                if msg.embeds and "СИСТЕМА AFK" in msg.embeds[0].title:
-                    target_message = msg
-                    logger.info(f"✅ Найдено сообщение AFK по embed в #{channel.name} (ID: {msg.id})")
-                    break
-    
-    # Если всё равно не нашли - создаём новое сообщение
-    if not target_message:
-        logger.warning(f"⚠️ Не найдено сообщение AFK в канале {channel.name}, создаём новое")
-        settings = afk_manager.get_settings()
-        max_hours = int(settings.get('afk_max_hours', 24))
-        
-        embed = discord.Embed(
-            title="🛌 **СИСТЕМА AFK**",
-            description="✨ **Никого нет в AFK**\n\nНажмите кнопку ниже, чтобы уйти в AFK",
-            color=0x2b2d31,
-            timestamp=datetime.now(MSK_TZ)
-        )
-        embed.set_thumbnail(url="https://cdn.discordapp.com/emojis/1302858797087854592.png?size=96")
-        embed.set_footer(text="• Статус: Активен •", icon_url=bot.user.avatar.url if bot.user.avatar else None)
-        target_message = await channel.send(embed=embed, view=AFKPublicView(bot, channel_id, max_hours))
-        logger.info(f"✅ Создано новое сообщение AFK в #{channel.name}")
-    
-    # Обновляем embed
     if not users:
         embed = discord.Embed(
             title="🛌 **СИСТЕМА AFK**",
@@ -135,7 +101,40 @@ async def update_afk_embed(bot, channel_id: str):
         embed.set_thumbnail(url="https://cdn.discordapp.com/emojis/1302858797087854592.png?size=96")
         embed.set_footer(text=f"• Обновлено: {datetime.now(MSK_TZ).strftime('%H:%M:%S')} •", icon_url=bot.user.avatar.url if bot.user.avatar else None)
     
-    await target_message.edit(embed=embed)
+    return embed
+
+
+async def publish_afk_panel(bot, channel, embed: discord.Embed = None) -> discord.Message:
+    """Показать панель AFK с кнопками (при старте или если сообщение пропало)"""
+    settings = afk_manager.get_settings()
+    max_hours = int(settings.get('afk_max_hours', 24))
+    return await panel_registry.publish(
+        bot, 'afk', 'public', channel,
+        embed=embed or build_afk_embed(bot),
+        view=AFKPublicView(bot, str(channel.id), max_hours),
+        match=_is_afk_message, volatile=AFK_VOLATILE
+    )
+
+
+async def update_afk_embed(bot, channel_id: str):
+    """Обновить embed AFK; без изменений в списке сообщение не редактируется"""
+    channel = bot.get_channel(int(channel_id))
+    if not channel:
+        logger.error(f"❌ Канал {channel_id} не найден для обновления embed")
+        return
+    
+    embed = build_afk_embed(bot)
+    
+    message_id = await panel_registry.get_message_id('afk', 'public', channel.id)
+    if message_id:
+        try:
+            await panel_registry.edit_if_changed('afk', channel.get_partial_message(message_id),
+                                                 embed=embed, volatile=AFK_VOLATILE)
+            return
+        except discord.NotFound:
+            logger.warning(f"⚠️ Сообщение AFK в #{channel.name} удалено, создаём заново")
+    
+    await publish_afk_panel(bot, channel, embed)
 
 
 class AFKPublicView(PermanentView):
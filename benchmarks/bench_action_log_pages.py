@@ -0,0 +1,48 @@
+"""Страницы логов действий: LIMIT/OFFSET против курсора before_id
+
+BENCH_ROWS задаёт размер таблицы (по умолчанию 500 000, 90% в одном сервере).
+"""
+import os
+
+import common
+
+common.setup()
+
+from core.database import db  # noqa: E402
+
+ROWS = int(os.getenv('BENCH_ROWS', '500000'))
+PAGE = 20
+RUNS = 20
+
+
+def fill():
+    conn = db.get_connection()
+    # Триггеры FTS здесь не нужны и только замедляют наполнение
+    conn.execute('DROP TRIGGER IF EXISTS server_action_logs_fts_ai')
+    conn.executemany(
+        'INSERT INTO server_action_logs (guild_id, event_type, user_id, details, timestamp) VALUES (?, ?, ?, ?, ?)',
+        (('1' if i % 10 else '2', 'MESSAGE_DELETE', str(i % 500), f'сообщение {i}', '2026-01-01 00:00:00')
+         for i in range(ROWS))
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+
+
+def main():
+    fill()
+    deep = (ROWS * 9 // 10) // PAGE // 2
+    for page in (1, deep):
+        with common.Timer() as t:
+            for _ in range(RUNS):
+                rows = db.get_action_logs(limit=PAGE, offset=(page - 1) * PAGE, guild_id='1')
+        common.report(f'OFFSET, page {page}', f'{t.ms / RUNS:.3f} ms')
+        before_id = rows[0]['id'] + 1
+        with common.Timer() as t:
+            for _ in range(RUNS):
+                keyset = db.get_action_logs(limit=PAGE, guild_id='1', before_id=before_id)
+        assert [r['id'] for r in keyset] == [r['id'] for r in rows]
+        common.report(f'keyset before_id, page {page}', f'{t.ms / RUNS:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Соединение на каждый вызов против постоянного соединения из пула"""
+import sqlite3
+
+import common
+
+common.setup()
+
+from core.database import db  # noqa: E402
+
+OPS = 3000
+
+
+def per_call(sql: str, params: tuple, write: bool):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        conn.execute(sql, params)
+        if write:
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def pooled(sql: str, params: tuple, write: bool):
+    conn = db.get_connection()
+    conn.execute(sql, params)
+    if write:
+        conn.commit()
+
+
+def main():
+    conn = db.get_connection()
+    conn.execute('CREATE TABLE IF NOT EXISTS bench_kv (k INTEGER PRIMARY KEY, v TEXT)')
+    conn.executemany('INSERT OR REPLACE INTO bench_kv VALUES (?, ?)', [(i, 'x') for i in range(1000)])
+    conn.commit()
+
+    read = ('SELECT v FROM bench_kv WHERE k = ?', False)
+    write = ('UPDATE bench_kv SET v = ? WHERE k = ?', True)
+    for label, func in (('per-call connect', per_call), ('pooled', pooled)):
+        with common.Timer() as t:
+            for i in range(OPS):
+                func(read[0], (i % 1000,), read[1])
+        common.report(f'{label}, read', f'{t.ms * 1000 / OPS:.1f} us/op')
+        with common.Timer() as t:
+            for i in range(OPS):
+                func(write[0], (str(i), i % 1000), write[1])
+        common.report(f'{label}, write', f'{t.ms * 1000 / OPS:.1f} us/op')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Ежедневный бонус: прежние 4 обращения к БД против claim_daily_bonus
+
+Прежний поток (чтение last_daily, чтение серии, начисление, отметка)
+воспроизведён здесь SQL-запросами, потому что методы удалены из Database.
+"""
+import asyncio
+
+import common
+
+common.setup()
+
+from core.async_database import adb  # noqa: E402
+from core.database import db  # noqa: E402
+
+USERS = 2000
+
+
+def _old_last_claim(user_id):
+    return db.get_connection().execute('SELECT last_daily FROM user_balance WHERE user_id = ?', (user_id,)).fetchone()
+
+
+def _old_streak(user_id):
+    return db.get_connection().execute('SELECT daily_streak FROM user_balance WHERE user_id = ?', (user_id,)).fetchone()
+
+
+def _old_mark(user_id, streak):
+    conn = db.get_connection()
+    conn.execute('UPDATE user_balance SET last_daily = CURRENT_TIMESTAMP, daily_streak = ? WHERE user_id = ?',
+                 (streak, user_id))
+    conn.commit()
+
+
+async def old_claim(user_id: str):
+    last = await adb.run(_old_last_claim, user_id, read=True)
+    if last and last[0]:
+        return False
+    await adb.run(_old_streak, user_id, read=True)
+    await adb.add_user_balance(user_id, 10, "Ежедневный бонус (день 1)", source='daily')
+    await adb.run(_old_mark, user_id, 1)
+    return True
+
+
+async def new_claim(user_id: str):
+    claimed, _, _, _ = await adb.claim_daily_bonus(user_id, 10, 5, 7)
+    return claimed
+
+
+async def bench(name: str, claim, prefix: str):
+    with common.Timer() as t:
+        for i in range(200):
+            await claim(f'{prefix}s{i}')
+    common.report(f'{name}: sequential, per claim', f'{t.ms * 1000 / 200:.0f} us')
+
+    with common.Timer() as t:
+        await asyncio.gather(*(claim(f'{prefix}c{i}') for i in range(USERS)))
+    common.report(f'{name}: {USERS} users concurrently', f'{t.ms:.0f} ms')
+
+    results = await asyncio.gather(*(claim(f'{prefix}double') for _ in range(10)))
+    common.report(f'{name}: 10 simultaneous clicks, bonuses', str(sum(results)))
+
+
+async def main():
+    await bench('old', old_claim, 'o')
+    await bench('new', new_claim, 'n')
+    adb.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""Дневной счётчик audit_log: date(timestamp) = ? против диапазона МСК-суток
+
+BENCH_ROWS задаёт размер таблицы (по умолчанию 1 000 000).
+"""
+import os
+from datetime import timedelta
+
+import common
+
+common.setup()
+
+from core.database import db  # noqa: E402
+from core.timeutils import msk_day_bounds_utc, msk_today  # noqa: E402
+
+ROWS = int(os.getenv('BENCH_ROWS', '1000000'))
+RUNS = 20
+
+
+def fill():
+    from datetime import datetime
+    start = datetime(2024, 1, 1)
+    step = timedelta(seconds=300)
+    conn = db.get_connection()
+    conn.executemany(
+        'INSERT INTO audit_log (user_id, action, timestamp) VALUES (?, ?, ?)',
+        ((str(i % 500), 'MEMBER_JOIN' if i % 3 else 'MESSAGE', (start + step * i).strftime('%Y-%m-%d %H:%M:%S'))
+         for i in range(ROWS))
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    return (start + step * (ROWS // 2)).date()
+
+
+def main():
+    day = fill()
+    conn = db.get_connection()
+    start, end = msk_day_bounds_utc(day)
+    queries = (
+        ('date(timestamp) = ?',
+         'SELECT COUNT(*) FROM audit_log WHERE action = "MEMBER_JOIN" AND date(timestamp) = ?', (day.isoformat(),)),
+        ('range >= start AND < end',
+         'SELECT COUNT(*) FROM audit_log WHERE action = "MEMBER_JOIN" AND timestamp >= ? AND timestamp < ?', (start, end)),
+    )
+    common.report('rows / day', f'{ROWS} / {day} (today {msk_today()})')
+    for label, sql, params in queries:
+        count = conn.execute(sql, params).fetchone()[0]
+        with common.Timer() as t:
+            for _ in range(RUNS):
+                conn.execute(sql, params).fetchone()
+        common.report(f'{label} ({count} rows)', f'{t.ms / RUNS:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Задержка event loop при записи логов: db.* в цикле событий против adb.*
+
+Пробная задача просыпается каждые 5 мс и меряет, насколько позже
+запланированного она получила управление, пока идут WRITES записей.
+"""
+import asyncio
+import statistics
+import time
+
+import common
+
+common.setup()
+
+from core.async_database import adb  # noqa: E402
+from core.database import db  # noqa: E402
+
+WRITES = 1500
+PROBE = 0.005
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE)
+        lags.append((time.perf_counter() - started - PROBE) * 1000)
+
+
+async def sync_writes():
+    for i in range(WRITES):
+        db.save_action_log('1', 'MESSAGE_DELETE', str(i % 50), details=f'сообщение {i}')
+        if i % 10 == 0:
+            await asyncio.sleep(0)
+
+
+async def async_writes():
+    await asyncio.gather(*(
+        adb.save_action_log('1', 'MESSAGE_DELETE', str(i % 50), details=f'сообщение {i}')
+        for i in range(WRITES)
+    ))
+
+
+async def measure(name: str, writer):
+    lags, stop = [], asyncio.Event()
+    task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+    await writer()
+    stop.set()
+    await task
+    lags.sort()
+    common.report(f'{name}: loop lag p50 / p99 / max',
+                  f'{statistics.median(lags):.1f} / {lags[int(len(lags) * 0.99) - 1]:.1f} / {lags[-1]:.1f} ms')
+
+
+async def main():
+    await measure('sync  db.save_action_log', sync_writes)
+    await measure('async adb.save_action_log', async_writes)
+    adb.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""Старт на существующей БД: полная перепроверка схемы против только новых миграций
+
+Раньше init_db при каждом запуске выполнял весь CREATE TABLE / PRAGMA
+table_info — это миграция 001 целиком.
+"""
+import common
+
+common.setup()
+
+from core import migrations  # noqa: E402
+from core.database import db  # noqa: E402
+
+RUNS = 50
+
+
+def full_recheck():
+    conn = db.get_connection()
+    with conn:
+        migrations._base_schema(conn.cursor())
+
+
+def main():
+    for label, func in (('old: full re-check (migration 001)', full_recheck),
+                        ('new: pending migrations only', lambda: migrations.run_migrations(db))):
+        with common.Timer() as t:
+            for _ in range(RUNS):
+                func()
+        common.report(label, f'{t.ms / RUNS:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Проверка дневного лимита войса: SUM по economy_transactions против voice_earnings
+
+BENCH_ROWS — размер истории операций (по умолчанию 1 000 000).
+"""
+import os
+
+import common
+
+common.setup()
+
+from core.database import db  # noqa: E402
+from core.timeutils import msk_today  # noqa: E402
+
+ROWS = int(os.getenv('BENCH_ROWS', '1000000'))
+USERS = 200
+
+
+def fill():
+    conn = db.get_connection()
+    conn.executemany(
+        'INSERT INTO economy_transactions (user_id, amount, reason, action, timestamp) VALUES (?, ?, ?, ?, ?)',
+        ((str(i % USERS), 5, '1 мин в голосовом канале' if i % 2 else 'Покупка', 'earn',
+          f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} 12:00:00') for i in range(ROWS))
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+
+
+def main():
+    fill()
+    day = msk_today().isoformat()
+    conn = db.get_connection()
+    old_sql = ('SELECT COALESCE(SUM(amount), 0) FROM economy_transactions '
+               "WHERE user_id = ? AND date(timestamp) = ? AND reason LIKE '%голосовом%'")
+    with common.Timer() as t:
+        for i in range(USERS):
+            conn.execute(old_sql, (str(i), day)).fetchone()
+    common.report(f'old date()+LIKE, {ROWS} rows', f'{t.ms * 1000 / USERS:.0f} us/check')
+    with common.Timer() as t:
+        for i in range(USERS):
+            db.get_daily_voice_earned(str(i), day)
+    common.report(f'ledger PK, {ROWS} rows', f'{t.ms * 1000 / USERS:.0f} us/check')
+
+    granted = sum(db.voice_accrual_tick([('cap', 30, 'тест')], 100).get('cap', (0, None))[0] for _ in range(20))
+    common.report('20 accruals of 30 against a 100 cap', f'granted {granted}')
+
+
+if __name__ == '__main__':
+    main()
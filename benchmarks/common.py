@@ -0,0 +1,36 @@
+"""Общая подготовка бенчмарков
+
+Каждый скрипт запускается из корня репозитория:
+    python benchmarks/bench_daily_bonus.py
+
+setup() переходит во временный каталог до импорта core, поэтому
+бенчмарк работает со своей bot_data.db и не трогает рабочую базу.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup() -> str:
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.mkdtemp(prefix='bot_bench_')
+    os.chdir(workdir)
+    return workdir
+
+
+class Timer:
+    """with Timer() as t: ... → t.ms"""
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._started) * 1000
+
+
+def report(label: str, value: str):
+    print(f"{label:<48} {value}")
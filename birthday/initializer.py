@@ -1,12 +1,13 @@
 """Инициализация каналов системы дней рождения"""
-import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 import discord
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG
-from birthday.views import BirthdayPublicView, update_birthday_embed
+from core.scheduler import scheduler
+from birthday.views import update_birthday_embed
 from birthday.settings import BirthdaySettingsView
 from birthday.manager import birthday_manager
 
@@ -69,23 +70,9 @@ class BirthdayInitializer:
             logger.error(f"❌ Ошибка ID канала {self.channel_id}: {e}")
             return
 
-        # Ищем существующий embed с кнопками
-        found = False
-        async for msg in channel.history(limit=100):
-            if msg.author == self.bot.user and msg.embeds:
-                if msg.embeds and "ДНИ РОЖДЕНИЯ" in msg.embeds[0].title:
-                    # Обновляем embed и ПРИНУДИТЕЛЬНО ПРИВЯЗЫВАЕМ view
-                    await update_birthday_embed(self.bot, self.channel_id)
-                    # Дополнительно обновляем view у сообщения
-                    await msg.edit(view=BirthdayPublicView())
-                    found = True
-                    print(f"🎂 [Birthday] Найден существующий embed, кнопки перепривязаны")
-                    break
-
-        # Если не нашли — создаём новый embed с кнопками
-        if not found:
-            await update_birthday_embed(self.bot, self.channel_id)
-            print(f"🎂 [Birthday] Создан новый embed в #{channel.name}")
+        # Embed обновляется на месте, кнопки перепривязываются к известному сообщению
+        await update_birthday_embed(self.bot, self.channel_id)
+        print(f"🎂 [Birthday] Embed в #{channel.name} актуален")
 
     async def _init_settings_channel(self):
         """Канал настроек — ищем панель, обновляем или создаём"""
@@ -103,49 +90,23 @@ class BirthdayInitializer:
             logger.error(f"❌ Ошибка ID канала настроек {self.settings_channel_id}: {e}")
             return
 
-        # Ищем существующую панель управления
-        found = False
-        async for msg in channel.history(limit=100):
-            if msg.author == self.bot.user and msg.embeds:
-                if msg.embeds and "УПРАВЛЕНИЕ СИСТЕМОЙ" in msg.embeds[0].title:
-                    await msg.edit(view=BirthdaySettingsView())
-                    found = True
-                    print(f"🎂 [Birthday] Найдена существующая панель, обновлена")
-                    break
-
-        # Если не нашли — создаём новую
-        if not found:
-            embed = discord.Embed(
-                title="⚙️ **УПРАВЛЕНИЕ СИСТЕМОЙ ДНЕЙ РОЖДЕНИЯ**",
-                description="Настройка и управление системой",
-                color=0x00ff00
-            )
-            await channel.send(embed=embed, view=BirthdaySettingsView())
-            print(f"🎂 [Birthday] Создана новая панель управления в #{channel.name}")
+        embed = discord.Embed(
+            title="⚙️ **УПРАВЛЕНИЕ СИСТЕМОЙ ДНЕЙ РОЖДЕНИЯ**",
+            description="Настройка и управление системой",
+            color=0x00ff00
+        )
+        await panel_registry.publish(
+            self.bot, 'birthday', 'settings', channel, embed=embed, view=BirthdaySettingsView(),
+            match=lambda msg: bool(msg.embeds) and "УПРАВЛЕНИЕ СИСТЕМОЙ" in (msg.embeds[0].title or ""),
+            scan_limit=100
+        )
+        print(f"🎂 [Birthday] Панель управления в #{channel.name} актуальна")
 
     async def start_birthday_checker(self):
-        """Запустить проверку дней рождений в 00:00"""
-        self.bot.loop.create_task(self._birthday_checker())
+        """Зарегистрировать проверку дней рождений в 00:00 МСК"""
+        scheduler.midnight('birthday_greetings', self._send_birthday_greetings)
         logger.info("✅ Запущен проверщик дней рождения (каждый день в 00:00)")
 
-    async def _birthday_checker(self):
-        """Проверка дней рождений в 00:00"""
-        await self.bot.wait_until_ready()
-
-        while not self.bot.is_closed():
-            now = datetime.now(MSK_TZ)
-            tomorrow = now + timedelta(days=1)
-            next_midnight = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
-            next_midnight = MSK_TZ.localize(next_midnight)
-            seconds_to_wait = (next_midnight - now).total_seconds()
-
-            await asyncio.sleep(seconds_to_wait)
-
-            try:
-                await self._send_birthday_greetings()
-            except Exception as e:
-                logger.error(f"❌ Ошибка отправки поздравлений: {e}")
-
     async def _send_birthday_greetings(self):
         """Отправить поздравления именинникам"""
         enabled = db.get_setting('birthday_enabled')
@@ -221,8 +182,7 @@ class BirthdayInitializer:
         """Остановить систему дней рождения"""
         print("🎂 [BIRTHDAY] Остановка системы дней рождения...")
         
-        if hasattr(self, 'task') and self.task:
-            self.task.cancel()
+        scheduler.cancel('birthday_greetings')
         
         if self.channel_id:
             try:
@@ -2,6 +2,7 @@
 import discord
 from datetime import datetime
 from core.database import db
+from core.panels import panel_registry
 from birthday.manager import birthday_manager
 from birthday.base import PermanentView
 
@@ -156,12 +157,8 @@ async def update_birthday_embed(bot, channel_id: str):
     
     embed.set_footer(text="Нажмите кнопку, чтобы указать свой день рождения")
     
-    # Ищем сообщение и обновляем embed И view
-    async for msg in channel.history(limit=50):
-        if msg.author == bot.user and msg.embeds:
-            if msg.embeds and "ДНИ РОЖДЕНИЯ" in msg.embeds[0].title:
-                await msg.edit(embed=embed, view=BirthdayPublicView())
-                return
-    
-    # Если не нашли — создаём новое
-    await channel.send(embed=embed, view=BirthdayPublicView())
\ No newline at end of file
+    # Обновляем embed И view известного сообщения (или находим/создаём его)
+    await panel_registry.publish(
+        bot, 'birthday', 'public', channel, embed=embed, view=BirthdayPublicView(),
+        match=lambda msg: bool(msg.embeds) and "ДНИ РОЖДЕНИЯ" in (msg.embeds[0].title or "")
+    )
\ No newline at end of file
@@ -17,8 +17,10 @@ from dotenv import load_dotenv
 import os
 
 from core.database import db
+from core.async_database import adb
 from core.config import CONFIG, load_config
 from core.utils import format_mention, is_admin
+from core.panels import panel_registry
 from tier.manager import tier_manager
 from vacation.manager import vacation_manager
 
@@ -110,6 +112,10 @@ async def on_ready():
     except Exception as e:
         print(f"❌ Ошибка создания панели настроек: {e}")
 
+    # Ночная архивация старых строк растущих таблиц
+    from core.retention import retention_manager
+    retention_manager.start()
+
     await bot.change_presence(activity=discord.Activity(
         type=discord.ActivityType.watching,
         name=f"{CONFIG.get('family_name', 'Семья')} | !info"
@@ -289,6 +295,18 @@ async def on_message_delete(message: discord.Message):
         await log_message_delete(message)
 
 
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    # Удалённую вручную панель edit_if_changed должен заметить на следующей перерисовке
+    panel_registry.forget_rendered(payload.message_id)
+
+
+@bot.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    for message_id in payload.message_ids:
+        panel_registry.forget_rendered(message_id)
+
+
 # ========== ЛОГИ ДЕЙСТВИЙ (КАНАЛЫ) ==========
 @bot.event
 async def on_guild_channel_create(channel: discord.abc.GuildChannel):
@@ -384,7 +402,20 @@ async def main():
         else:
             print("⏭️ [EVENT_SCHEDULER] Модуль выключен, планировщик не запущен")
         
-        await bot.start(BOT_TOKEN)
+        try:
+            await bot.start(BOT_TOKEN)
+        finally:
+            # Дописываем очередь логов, дожидаемся фоновых операций с БД и закрываем пул соединений
+            from action_logs.manager import action_logs_manager
+            await action_logs_manager.stop()
+            from economy.manager import economy_manager
+            await economy_manager.stop()
+            from core.retention import retention_manager
+            await retention_manager.stop()
+            from core.scheduler import scheduler
+            await scheduler.stop()
+            adb.close()
+            db.close()
 
 if __name__ == '__main__':
     try:
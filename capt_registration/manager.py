@@ -3,6 +3,7 @@ import discord
 import logging
 from datetime import datetime
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG, save_config
 
 logger = logging.getLogger(__name__)
@@ -121,43 +122,14 @@ class CaptRegistrationManager:
         pub_view = PublicView()
         pub_view.set_registration_active(active)
         
-        # 🔥 Ищем существующие сообщения, НЕ УДАЛЯЕМ
-        main_msg = None
-        reserve_msg = None
-        
-        async for msg in main_channel.history(limit=50):
-            if msg.author == bot.user and msg.embeds:
-                main_msg = msg
-                break
-        
-        async for msg in reserve_channel.history(limit=50):
-            if msg.author == bot.user and msg.embeds:
-                reserve_msg = msg
-                break
-        
-        if main_msg and reserve_msg:
-            # Обновляем существующие
-            await main_msg.edit(embed=embed, view=mod_view)
-            await reserve_msg.edit(embed=embed, view=pub_view)
-            print(f"🎯 [CAPT] Обновлены существующие сообщения, active={active}")
-            
-            self.main_message_id = str(main_msg.id)
-            self.reserve_message_id = str(reserve_msg.id)
-        else:
-            # Создаём новые только если старых нет
-            # Но сначала удаляем ВСЕ старые сообщения бота (на всякий случай)
-            async for msg in main_channel.history(limit=50):
-                if msg.author == bot.user:
-                    await msg.delete()
-            async for msg in reserve_channel.history(limit=50):
-                if msg.author == bot.user:
-                    await msg.delete()
-            
-            main_msg = await main_channel.send(embed=embed, view=mod_view)
-            reserve_msg = await reserve_channel.send(embed=embed, view=pub_view)
-            self.main_message_id = str(main_msg.id)
-            self.reserve_message_id = str(reserve_msg.id)
-            print(f"🎯 [CAPT] Созданы новые сообщения, active={active}")
+        # 🔥 Сообщения известны реестру панелей — редактируем на месте, историю смотрим только если их нет
+        main_msg = await panel_registry.publish(bot, 'capt', 'main', main_channel, embed=embed, view=mod_view,
+                                                match=lambda msg: bool(msg.embeds), volatile=('timestamp',))
+        reserve_msg = await panel_registry.publish(bot, 'capt', 'reserve', reserve_channel, embed=embed, view=pub_view,
+                                                   match=lambda msg: bool(msg.embeds), volatile=('timestamp',))
+        self.main_message_id = str(main_msg.id)
+        self.reserve_message_id = str(reserve_msg.id)
+        print(f"🎯 [CAPT] Сообщения регистрации актуальны, active={active}")
         
         if session:
             db.capt_update_session_messages(session['id'], self.main_message_id, self.reserve_message_id)
@@ -209,13 +181,11 @@ class CaptRegistrationManager:
                 
                 main_list, reserve_list = self.get_lists()
                 
-                for reg in main_list:
-                    _, uid, _ = reg
-                    await economy_manager.award_capt(int(uid), is_main=True)
-                
-                for reg in reserve_list:
-                    _, uid, _ = reg
-                    await economy_manager.award_capt(int(uid), is_main=False)
+                # Все участники — одной транзакцией
+                await economy_manager.award_capt_session(
+                    [int(uid) for _, uid, _ in main_list],
+                    [int(uid) for _, uid, _ in reserve_list]
+                )
                 
                 print(f"💰 [CAPT] Начислены баллы: основной={len(main_list)}, резерв={len(reserve_list)}")
             else:
@@ -349,7 +319,7 @@ class CaptRegistrationManager:
             try:
                 channel = self.bot.get_channel(int(self.main_channel_id))
                 if channel:
-                    msg = await channel.fetch_message(int(self.main_message_id))
+                    msg = channel.get_partial_message(int(self.main_message_id))
                     
                     if session_active and self.session_info:
                         embed = create_registration_embed(main_list, reserve_list, self.session_info)
@@ -358,7 +328,7 @@ class CaptRegistrationManager:
                     
                     view = ModerationView()
                     view.update_buttons(session_active)  # ← ключевой момент!
-                    await msg.edit(embed=embed, view=view)
+                    await panel_registry.edit_if_changed('capt', msg, embed=embed, view=view, volatile=('timestamp',))
                     
             except Exception as e:
                 print(f"❌ [CAPT] Ошибка обновления main канала: {e}")
@@ -367,7 +337,7 @@ class CaptRegistrationManager:
             try:
                 channel = self.bot.get_channel(int(self.reserve_channel_id))
                 if channel:
-                    msg = await channel.fetch_message(int(self.reserve_message_id))
+                    msg = channel.get_partial_message(int(self.reserve_message_id))
                     
                     if session_active and self.session_info:
                         embed = create_registration_embed(main_list, reserve_list, self.session_info)
@@ -376,7 +346,7 @@ class CaptRegistrationManager:
                     
                     view = PublicView()
                     view.set_registration_active(session_active)  # ← ключевой момент!
-                    await msg.edit(embed=embed, view=view)
+                    await panel_registry.edit_if_changed('capt', msg, embed=embed, view=view, volatile=('timestamp',))
                     
             except Exception as e:
                 print(f"❌ [CAPT] Ошибка обновления reserve канала: {e}")
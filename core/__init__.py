@@ -1,10 +1,11 @@
 from core.database import db
+from core.async_database import adb
 from core.config import CONFIG, load_config, save_config, SUPER_ADMIN_ID
 from core.utils import format_mention, get_server_name, has_access, is_admin, is_super_admin
 from core.menus import BaseMenuView
 
 __all__ = [
-    'db', 'CONFIG', 'load_config', 'save_config', 'SUPER_ADMIN_ID',
+    'db', 'adb', 'CONFIG', 'load_config', 'save_config', 'SUPER_ADMIN_ID',
     'format_mention', 'get_server_name', 'has_access', 'is_admin', 'is_super_admin',
     'BaseMenuView'
 ]
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Асинхронный фасад над core.database.Database
+
+Все методы db.* доступны как awaitable через adb.*:
+    rows = await adb.get_action_logs(limit=30, guild_id=gid)
+
+Пишущие методы выполняются в одном выделенном потоке (single writer),
+читающие — в небольшом пуле потоков, поэтому ожидание блокировки SQLite
+или медленный запрос не останавливает event loop бота.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import db
+
+# Префиксы методов Database, которые только читают данные
+READ_PREFIXES = ('get_', 'is_', 'search_', 'user_exists', 'load_', 'capt_get_', 'mcl_get_')
+
+
+class AsyncDatabase:
+    def __init__(self, database, readers: int = None):
+        self._db = database
+        self._readers = readers or int(os.getenv('DB_READER_THREADS', '4'))
+        self._writer = None
+        self._reader_pool = None
+        self._methods = {}
+
+    def _is_read(self, name: str) -> bool:
+        return name.startswith(READ_PREFIXES)
+
+    def _executor(self, read: bool) -> ThreadPoolExecutor:
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+            self._reader_pool = ThreadPoolExecutor(max_workers=self._readers, thread_name_prefix='db-reader')
+        return self._reader_pool if read else self._writer
+
+    async def run(self, func, *args, read: bool = False, **kwargs):
+        """Выполнить произвольную функцию с доступом к БД вне event loop"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor(read), call)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+
+        target = getattr(self._db, name)
+        if not callable(target):
+            return target
+
+        read = self._is_read(name)
+
+        @functools.wraps(target)
+        async def method(*args, **kwargs):
+            return await self.run(target, *args, read=read, **kwargs)
+
+        self._methods[name] = method
+        return method
+
+    def close(self):
+        """Дождаться завершения поставленных операций и остановить потоки"""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._reader_pool.shutdown(wait=True)
+            self._writer = None
+            self._reader_pool = None
+
+
+adb = AsyncDatabase(db)
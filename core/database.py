@@ -1,748 +1,103 @@
 """Модуль работы с SQLite базой данных"""
+import os
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 import pytz
+from core.timeutils import msk_day_bounds_utc, msk_day_of, msk_now, msk_today, to_db_timestamp
+
+
+class ConnectionPool:
+    """Пул долгоживущих соединений SQLite (одно соединение на поток)
+
+    Соединение открывается при первом обращении из потока и живёт до close().
+    Каждое соединение работает в WAL-режиме с synchronous=NORMAL.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = -16000,
+                 mmap_size: int = 64 * 1024 * 1024, busy_timeout: int = 15000):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size={int(self.cache_size)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Соединение текущего потока (создаётся при первом вызове)"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            conn = self._connect()
+            with self._lock:
+                self._connections.append(conn)
+                local.conn = conn
+                local.generation = self._generation
+        return local.conn
+
+    def open(self):
+        """Открыть соединение для текущего потока заранее"""
+        self.acquire()
+
+    def close(self):
+        """Закрыть все соединения пула (потоки переподключатся при следующем обращении)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
 
 class Database:
     def __init__(self):
         self.db_path = 'bot_data.db'
+        self.pool = ConnectionPool(
+            self.db_path,
+            cache_size=int(os.getenv('DB_CACHE_SIZE', '-16000')),
+            mmap_size=int(os.getenv('DB_MMAP_SIZE', str(64 * 1024 * 1024))),
+            busy_timeout=int(os.getenv('DB_BUSY_TIMEOUT', '15000')),
+        )
+        self.open()
         self.init_db()
     
     def get_connection(self):
-        return sqlite3.connect(self.db_path, timeout=15)
+        return self.pool.acquire()
+    
+    def open(self):
+        self.pool.open()
+    
+    def close(self):
+        self.pool.close()
+    
+    def backup_to(self, path: str):
+        """Консистентная копия базы (с учётом WAL) через backup API"""
+        target = sqlite3.connect(path)
+        try:
+            self.get_connection().backup(target)
+        finally:
+            target.close()
     
     def init_db(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Существующие таблицы
-
-            # Таблица для хранения состояния модулей
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS module_settings (
-                    module_key TEXT PRIMARY KEY,
-                    enabled TEXT DEFAULT '0'
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    discord_id TEXT PRIMARY KEY,
-                    username TEXT,
-                    added_by TEXT NOT NULL,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_used TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1,
-                    note TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS admins (
-                    discord_id TEXT PRIMARY KEY,
-                    added_by TEXT NOT NULL,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_super BOOLEAN DEFAULT 0
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_by TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    details TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS command_stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    command TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    success BOOLEAN,
-                    recipients INTEGER,
-                    details TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Таблицы для системы мероприятий
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    weekday INTEGER NOT NULL,
-                    event_time TEXT NOT NULL,
-                    enabled BOOLEAN DEFAULT 1,
-                    created_by TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(name, weekday, event_time)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS event_takes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_id INTEGER NOT NULL,
-                    user_id TEXT NOT NULL,
-                    user_name TEXT NOT NULL,
-                    group_code TEXT NOT NULL,
-                    meeting_place TEXT NOT NULL,
-                    taken_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    event_date DATE NOT NULL,
-                    is_cancelled BOOLEAN DEFAULT 0,
-                    FOREIGN KEY (event_id) REFERENCES events (id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS event_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_id INTEGER NOT NULL,
-                    action TEXT NOT NULL,
-                    user_id TEXT,
-                    details TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (event_id) REFERENCES events (id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS event_schedule (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_id INTEGER NOT NULL,
-                    scheduled_date DATE NOT NULL,
-                    reminder_sent BOOLEAN DEFAULT 0,
-                    taken_by TEXT,
-                    group_code TEXT,
-                    meeting_place TEXT,
-                    FOREIGN KEY (event_id) REFERENCES events (id),
-                    UNIQUE(event_id, scheduled_date)
-                )
-            ''')
-            
-            # Таблицы для авто-рекламы
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS auto_ad (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message_text TEXT NOT NULL,
-                    image_url TEXT,
-                    channel_id TEXT NOT NULL,
-                    interval_minutes INTEGER DEFAULT 65,
-                    sleep_start TEXT DEFAULT '02:00',
-                    sleep_end TEXT DEFAULT '06:30',
-                    last_sent TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_by TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS auto_ad_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    success BOOLEAN,
-                    error TEXT
-                )
-            ''')
-            
-            # Таблицы для системы регистрации на CAPT
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS capt_registrations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL UNIQUE,
-                    user_name TEXT NOT NULL,
-                    list_type TEXT NOT NULL CHECK(list_type IN ('main', 'reserve')),
-                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS capt_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    is_active BOOLEAN DEFAULT 0,
-                    started_by TEXT,
-                    started_at TIMESTAMP,
-                    ended_by TEXT,
-                    ended_at TIMESTAMP,
-                    main_message_id TEXT,
-                    reserve_message_id TEXT,
-                    main_channel_id TEXT,
-                    reserve_channel_id TEXT
-                )
-            ''')
-
-            # Миграция: добавляем колонки для event_name, event_time, additional_info
-            try:
-                cursor.execute('ALTER TABLE capt_sessions ADD COLUMN event_name TEXT')
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute('ALTER TABLE capt_sessions ADD COLUMN event_time TEXT')
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute('ALTER TABLE capt_sessions ADD COLUMN additional_info TEXT')
-            except sqlite3.OperationalError:
-                pass
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ЗАЯВОК =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS applications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    user_name TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    reviewed_by TEXT,
-                    reviewed_at TIMESTAMP,
-                    reject_reason TEXT,
-                    answers TEXT
-                )
-            ''')
-
-            # ===== МИГРАЦИЯ: УДАЛЕНИЕ СТАРЫХ КОЛОНОК ИЗ applications =====
-            try:
-                # Проверяем, есть ли старые колонки
-                cursor.execute("PRAGMA table_info(applications)")
-                columns = [col[1] for col in cursor.fetchall()]
-                
-                old_columns = ['nickname', 'static', 'previous_families', 'prime_time', 'hours_per_day']
-                existing_old = [col for col in old_columns if col in columns]
-                
-                if existing_old:
-                    print(f"🔧 Миграция: удаляю старые колонки {existing_old} из таблицы applications...")
-                    
-                    # Создаём новую таблицу без старых колонок
-                    cursor.execute('''
-                        CREATE TABLE applications_new (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            user_id TEXT NOT NULL,
-                            user_name TEXT NOT NULL,
-                            status TEXT DEFAULT 'pending',
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            reviewed_by TEXT,
-                            reviewed_at TIMESTAMP,
-                            reject_reason TEXT,
-                            answers TEXT
-                        )
-                    ''')
-                    
-                    # Копируем данные
-                    cursor.execute('''
-                        INSERT INTO applications_new (id, user_id, user_name, status, created_at, reviewed_by, reviewed_at, reject_reason, answers)
-                        SELECT id, user_id, user_name, status, created_at, reviewed_by, reviewed_at, reject_reason, answers
-                        FROM applications
-                    ''')
-                    
-                    # Удаляем старую таблицу
-                    cursor.execute('DROP TABLE applications')
-                    
-                    # Переименовываем новую
-                    cursor.execute('ALTER TABLE applications_new RENAME TO applications')
-                    
-                    conn.commit()
-                    print("✅ Таблица applications успешно обновлена (старые колонки удалены)")
-            except Exception as e:
-                print(f"⚠️ Ошибка миграции: {e}")
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS application_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-
-            # Добавляем настройки по умолчанию для системы заявок
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('applications_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('applications_log_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('applications_recruit_role', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('applications_member_role', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('applications_settings_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
-                        ('submit_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
-                        ('applications_create_profiles', 'true'))
-
-            # ===== ТАБЛИЦА ДЛЯ ХРАНЕНИЯ СООБЩЕНИЙ С ЗАЯВКАМИ =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS application_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    application_id INTEGER NOT NULL,
-                    channel_id TEXT NOT NULL,
-                    message_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE,
-                    UNIQUE(application_id)
-                )
-            ''')
-
-            # ===== ТАБЛИЦА ДЛЯ НАСТРОЙКИ ПОЛЕЙ ЗАЯВКИ =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS application_fields (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    field_name TEXT NOT NULL,
-                    field_description TEXT,
-                    placeholder TEXT,
-                    required BOOLEAN DEFAULT 1,
-                    field_order INTEGER DEFAULT 0,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ AFK =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS afk_users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL UNIQUE,
-                    user_name TEXT NOT NULL,
-                    reason TEXT NOT NULL,
-                    hours INTEGER NOT NULL,
-                    until_time TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS afk_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-
-            # Добавляем настройки по умолчанию
-            cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
-                        ('afk_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
-                        ('afk_max_hours', '24'))
-            cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
-                        ('afk_settings_channel', 'null'))
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ TIER =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tier_applications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    user_name TEXT NOT NULL,
-                    nickname TEXT NOT NULL,
-                    arena_link TEXT NOT NULL,
-                    screenshots TEXT NOT NULL,
-                    additional TEXT,
-                    target_tier TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    reviewed_by TEXT,
-                    reviewed_at TIMESTAMP,
-                    reject_reason TEXT
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tier_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tier_requirements (
-                    tier TEXT PRIMARY KEY,
-                    requirements TEXT
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tier_application_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    application_id INTEGER NOT NULL,
-                    channel_id TEXT NOT NULL,
-                    message_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    FOREIGN KEY (application_id) REFERENCES tier_applications (id) ON DELETE CASCADE,
-                    UNIQUE(application_id)
-                )
-            ''')
-
-            # Таблица для ролей, выдаваемых при принятии заявки
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS application_reward_roles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    role_id TEXT NOT NULL,
-                    added_by TEXT,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Добавляем настройки по умолчанию
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier_submit_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier_applications_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier_log_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier_info_channel', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier_checker_role', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier3_role', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier2_role', 'null'))
-            cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
-                        ('tier1_role', 'null'))
-
-            # Настройки по умолчанию
-            cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
-                        ('tier3', '1. Активность в семье\n2. Участие в мероприятиях\n3. Положительная репутация'))
-            cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
-                        ('tier2', '1. Выполнение требований Tier 3\n2. Регулярные отчёты\n3. Помощь новичкам'))
-            cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
-                        ('tier1', '1. Выполнение требований Tier 2\n2. Лидерские качества\n3. Вклад в развитие семьи'))
-            cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
-                        ('tier_delete_profile', 'false'))
-            cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
-                        ('tier_create_profile', 'false'))
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ СТАТИСТИКИ =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS daily_stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL UNIQUE,
-                    new_members INTEGER DEFAULT 0,
-                    left_members INTEGER DEFAULT 0,
-                    new_applications INTEGER DEFAULT 0,
-                    accepted_applications INTEGER DEFAULT 0,
-                    max_voice_online INTEGER DEFAULT 0,
-                    capt_registrations INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS stats_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-
-            # Добавляем настройки по умолчанию
-            cursor.execute('INSERT OR IGNORE INTO stats_settings (key, value) VALUES (?, ?)', 
-                        ('stats_backup_enabled', 'true'))
-            cursor.execute('INSERT OR IGNORE INTO stats_settings (key, value) VALUES (?, ?)', 
-                        ('stats_channel', 'null'))
-
-            # ===== Почасовая статистика =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS hourly_stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    hour INTEGER NOT NULL,
-                    messages INTEGER DEFAULT 0,
-                    voice_users INTEGER DEFAULT 0,
-                    UNIQUE(date, hour)
-                );
-            ''')
-
-            # ===== Статистика пользователей =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_activity (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    messages INTEGER DEFAULT 0,
-                    voice_minutes INTEGER DEFAULT 0,
-                    UNIQUE(user_id, date)
-                );
-            ''')
-
-            # ===== Бекапы сервера =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS server_backups (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    backup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    backup_data TEXT NOT NULL,
-                    backup_size INTEGER DEFAULT 0,
-                    created_by TEXT
-                );
-            ''')
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ОТПУСКОВ =====
-
-            # Таблица заявок на отпуск
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS vacation_applications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    user_name TEXT NOT NULL,
-                    days INTEGER NOT NULL,
-                    reason TEXT NOT NULL,
-                    saved_roles TEXT,
-                    guild_id TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    until_date DATE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    reviewed_by TEXT,
-                    reviewed_at TIMESTAMP,
-                    reject_reason TEXT
-                )
-            ''')
-
-            # Таблица настроек
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS vacation_settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT
-                )
-            ''')
-
-            # Таблица активных отпусков (куда переносятся одобренные заявки)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS vacation_active (
-                    user_id TEXT PRIMARY KEY,
-                    user_name TEXT NOT NULL,
-                    reason TEXT NOT NULL,
-                    until_date DATE NOT NULL,
-                    saved_roles TEXT NOT NULL,
-                    guild_id TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Таблица для хранения ID сообщений (для восстановления кнопок)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS vacation_application_messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    application_id INTEGER NOT NULL,
-                    channel_id TEXT NOT NULL,
-                    message_id TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    FOREIGN KEY (application_id) REFERENCES vacation_applications (id) ON DELETE CASCADE,
-                    UNIQUE(application_id)
-                )
-            ''')
-
-            # Настройки по умолчанию
-            cursor.execute('INSERT OR IGNORE INTO vacation_settings (key, value) VALUES (?, ?)', 
-                        ('vacation_max_days', '30'))
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ДНЕЙ РОЖДЕНИЯ =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS birthdays (
-                    user_id TEXT PRIMARY KEY,
-                    user_name TEXT NOT NULL,
-                    birthday_date TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ MCL =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mcl_registrations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL UNIQUE,
-                    user_name TEXT NOT NULL,
-                    list_type TEXT NOT NULL CHECK(list_type IN ('main', 'reserve')),
-                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT 1
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mcl_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    is_active BOOLEAN DEFAULT 0,
-                    started_by TEXT,
-                    started_at TIMESTAMP,
-                    ended_by TEXT,
-                    ended_at TIMESTAMP,
-                    main_message_id TEXT,
-                    reserve_message_id TEXT,
-                    main_channel_id TEXT,
-                    reserve_channel_id TEXT,
-                    event_name TEXT,
-                    event_time TEXT,
-                    additional_info TEXT
-                )
-            ''')
-
-            # Таблица для временных комнат
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS temp_voice_rooms (
-                    channel_id TEXT PRIMARY KEY,
-                    creator_id TEXT NOT NULL,
-                    creator_name TEXT NOT NULL,
-                    slots INTEGER DEFAULT 2,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Таблица для логов действий сервера
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS server_action_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id TEXT NOT NULL,
-                    event_type TEXT NOT NULL,
-                    user_id TEXT NOT NULL,
-                    target_id TEXT,
-                    details TEXT,
-                    before TEXT,
-                    after TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            # Индексы для ускорения поиска
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_user ON server_action_logs(user_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_event ON server_action_logs(event_type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_time ON server_action_logs(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_guild ON server_action_logs(guild_id)')
-
-            # Таблицы для мероприятий
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS event_sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    creator_id TEXT NOT NULL,
-                    template_id INTEGER,
-                    collect_time INTEGER DEFAULT 20,
-                    event_time TEXT,
-                    additional_info TEXT,
-                    channel_id TEXT,
-                    message_id TEXT,
-                    status TEXT DEFAULT 'active',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS event_participants (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id INTEGER NOT NULL,
-                    user_id TEXT NOT NULL,
-                    user_name TEXT NOT NULL,
-                    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (session_id) REFERENCES event_sessions(id) ON DELETE CASCADE,
-                    UNIQUE(session_id, user_id)
-                )
-            ''')
-
-            # ===== МИГРАЦИЯ ДЛЯ EVENT_SESSIONS =====
-            try:
-                cursor.execute('ALTER TABLE event_sessions ADD COLUMN event_name TEXT')
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute('ALTER TABLE event_sessions ADD COLUMN meeting_place TEXT')
-            except sqlite3.OperationalError:
-                pass
-
-            try:
-                cursor.execute('ALTER TABLE event_sessions ADD COLUMN template_id INTEGER')
-            except sqlite3.OperationalError:
-                pass
-
-            # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ИГР =====
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS active_games (
-                    game_id TEXT PRIMARY KEY,
-                    game_type TEXT NOT NULL,
-                    channel_id TEXT NOT NULL,
-                    player1_id TEXT NOT NULL,
-                    player2_id TEXT NOT NULL,
-                    game_data TEXT NOT NULL,
-                    current_turn TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS game_stats (
-                    user_id TEXT PRIMARY KEY,
-                    user_name TEXT NOT NULL,
-                    wins INTEGER DEFAULT 0,
-                    losses INTEGER DEFAULT 0,
-                    games_played INTEGER DEFAULT 0
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS game_settings (
-                    game_type TEXT PRIMARY KEY,
-                    enabled INTEGER DEFAULT 1
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_balance (
-                    user_id TEXT PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    total_earned INTEGER DEFAULT 0,
-                    total_spent INTEGER DEFAULT 0,
-                    daily_streak INTEGER DEFAULT 0,
-                    last_daily TIMESTAMP
-                );
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS economy_transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    amount INTEGER NOT NULL,
-                    reason TEXT,
-                    action TEXT CHECK(action IN ('earn', 'spend')),
-                    operator TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS shop_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    price INTEGER NOT NULL,
-                    emoji TEXT DEFAULT '🛒',
-                    limited_quantity INTEGER DEFAULT 0,
-                    sold_count INTEGER DEFAULT 0,
-                    is_active BOOLEAN DEFAULT 1,
-                    created_by TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_purchases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    item_id INTEGER NOT NULL,
-                    price INTEGER NOT NULL,
-                    purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (item_id) REFERENCES shop_items(id)
-                );
-            ''')
-
-            conn.commit()
+        from core.migrations import run_migrations
+        run_migrations(self)
 
         # ===== АВТОМАТИЧЕСКОЕ ДОБАВЛЕНИЕ СТАНДАРТНЫХ ПОЛЕЙ ЗАЯВКИ =====
         self.init_application_fields()
@@ -927,13 +282,18 @@ class Database:
     
     # ===== МЕТОДЫ ДЛЯ СИСТЕМЫ ОПОВЕЩЕНИЙ =====
     
+    @staticmethod
+    def _event_time(value: str) -> str:
+        """'9:30' → '09:30': время сравнивается строками и в datetime() SQLite"""
+        return datetime.strptime(value.strip(), '%H:%M').strftime('%H:%M')
+    
     def add_event(self, name: str, weekday: int, event_time: str, created_by: str) -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO events (name, weekday, event_time, created_by)
                 VALUES (?, ?, ?, ?)
-            ''', (name, weekday, event_time, created_by))
+            ''', (name, weekday, self._event_time(event_time), created_by))
             conn.commit()
             return cursor.lastrowid
     
@@ -942,6 +302,8 @@ class Database:
         updates = {k: v for k, v in kwargs.items() if k in allowed}
         if not updates:
             return False
+        if 'event_time' in updates:
+            updates['event_time'] = self._event_time(updates['event_time'])
         sets = ', '.join([f"{k} = ?" for k in updates.keys()])
         values = list(updates.values()) + [event_id]
         with self.get_connection() as conn:
@@ -1082,31 +444,43 @@ class Database:
                 'takes_today': takes_today
             }
     
-    def generate_schedule(self, days_ahead: int = 14):
-        from datetime import datetime, timedelta
-        import pytz
-        msk_tz = pytz.timezone('Europe/Moscow')
-        now = datetime.now(msk_tz)
+    def generate_schedule(self, days_ahead: int = 14, from_day: int = 0) -> int:
+        """Заполнить event_schedule на дни [today + from_day, today + days_ahead), вернуть число новых строк
+        
+        Один INSERT ... SELECT: рекурсивный CTE разворачивает даты окна, они
+        соединяются с включёнными мероприятиями по дню недели (strftime('%w')
+        считает с воскресенья, в events — с понедельника). Сегодняшние уже
+        прошедшие мероприятия пропускаются.
+        """
+        now = msk_now()
         today = now.date()
+        first = today + timedelta(days=from_day)
+        last = today + timedelta(days=days_ahead - 1)
+        if first > last:
+            return 0
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # events → event_scheduler не меняется, так как таблица events остаётся
-            events = self.get_events(enabled_only=True)
-            for event in events:
-                for day_offset in range(days_ahead):
-                    check_date = today + timedelta(days=day_offset)
-                    if check_date.weekday() == event['weekday']:
-                        event_time = datetime.strptime(event['event_time'], "%H:%M").time()
-                        event_datetime = msk_tz.localize(datetime.combine(check_date, event_time))
-                        if day_offset == 0 and event_datetime < now:
-                            continue
-                        cursor.execute('''
-                            INSERT OR IGNORE INTO event_schedule 
-                            (event_id, scheduled_date)
-                            VALUES (?, ?)
-                        ''', (event['id'], check_date.isoformat()))
+            # rowcount у запроса, начинающегося с WITH, всегда -1 — считаем по total_changes
+            before = conn.total_changes
+            cursor.execute('''
+                WITH RECURSIVE days(day) AS (
+                    SELECT ?
+                    UNION ALL
+                    SELECT date(day, '+1 day') FROM days WHERE day < ?
+                )
+                INSERT OR IGNORE INTO event_schedule (event_id, scheduled_date)
+                SELECT e.id, d.day
+                FROM days d
+                JOIN events e ON e.enabled = 1
+                    AND e.weekday = (CAST(strftime('%w', d.day) AS INTEGER) + 6) % 7
+                WHERE NOT (d.day = ? AND e.event_time < ?)
+            ''', (first.isoformat(), last.isoformat(), today.isoformat(), now.strftime('%H:%M:%S')))
             conn.commit()
-            return cursor.rowcount
+            return conn.total_changes - before
+    
+    def extend_schedule(self, days_ahead: int = 14) -> int:
+        """Дописать в расписание только последний день окна — для ежедневного запуска"""
+        return self.generate_schedule(days_ahead, from_day=days_ahead - 1)
     
     def get_today_events(self):
         from datetime import datetime
@@ -1128,16 +502,81 @@ class Database:
             rows = cursor.fetchall()
             return [dict(zip(columns, row)) for row in rows]
     
+    def get_event_occurrences(self, dates: list, event_id: int = None):
+        """Включённые мероприятия на даты dates ('YYYY-MM-DD') со статусом из event_schedule
+        
+        Одним запросом: даты разворачиваются в CTE и соединяются с events по дню недели.
+        """
+        if not dates:
+            return []
+        days = [(day, date.fromisoformat(day).weekday()) for day in dates]
+        values = ', '.join(['(?, ?)'] * len(days))
+        params = [value for pair in days for value in pair]
+        query = f'''
+            WITH days(day, weekday) AS (VALUES {values})
+            SELECT e.id, e.name, e.weekday, e.event_time, d.day AS scheduled_date,
+                s.id AS schedule_id, s.reminder_sent, s.taken_by
+            FROM days d
+            JOIN events e ON e.weekday = d.weekday AND e.enabled = 1
+            LEFT JOIN event_schedule s ON s.event_id = e.id AND s.scheduled_date = d.day
+        '''
+        if event_id is not None:
+            query += ' WHERE e.id = ?'
+            params.append(event_id)
+        query += ' ORDER BY d.day, e.event_time'
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+    
     def mark_reminder_sent(self, event_id: int, event_date: str):
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            # Строки расписания может не быть (мероприятие добавлено после generate_schedule)
             cursor.execute('''
-                UPDATE event_schedule 
-                SET reminder_sent = 1 
-                WHERE event_id = ? AND scheduled_date = ?
+                INSERT INTO event_schedule (event_id, scheduled_date, reminder_sent)
+                VALUES (?, ?, 1)
+                ON CONFLICT(event_id, scheduled_date) DO UPDATE SET reminder_sent = 1
             ''', (event_id, event_date))
             conn.commit()
     
+    def get_due_event_timeouts(self, now: datetime):
+        """Напоминания, по которым наступил таймаут (за 10 минут до начала), а мероприятие не взято
+        
+        now — aware МСК. Смотрятся только сегодняшние и завтрашние строки: более
+        старые отпадают по дате через частичный индекс и не сканируются.
+        """
+        moment = now.strftime('%Y-%m-%d %H:%M:%S')
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.event_id, s.scheduled_date, e.event_time, e.name
+                FROM event_schedule s
+                JOIN events e ON e.id = s.event_id
+                WHERE s.scheduled_date BETWEEN ? AND ?
+                  AND s.reminder_sent = 1 AND s.timeout_sent = 0 AND s.taken_by IS NULL
+                  AND datetime(s.scheduled_date || ' ' || e.event_time, '-10 minutes') <= ?
+                  AND datetime(s.scheduled_date || ' ' || e.event_time) > ?
+                ORDER BY s.scheduled_date, e.event_time
+            ''', (now.date().isoformat(), (now.date() + timedelta(days=1)).isoformat(), moment, moment))
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+    
+    def mark_timeouts_sent(self, occurrences: list):
+        """Отметить таймауты [(event_id, scheduled_date)] отправленными"""
+        if not occurrences:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE event_schedule SET timeout_sent = 1
+                WHERE event_id = ? AND scheduled_date = ?
+            ''', occurrences)
+            conn.commit()
+    
     def log_event_action(self, event_id: int, action: str, user_id: str = None, details: str = None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -2425,8 +1864,67 @@ class Database:
             ''', (module_key, enabled))
             conn.commit()
 
+    # ===== РЕЕСТР ПАНЕЛЕЙ =====
+
+    def get_panels(self) -> list:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT module, panel_kind, channel_id, message_id, content_hash, edited_at FROM panels')
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def save_panel(self, module: str, panel_kind: str, channel_id: str, message_id: str,
+                   content_hash: str, edited_at: str = None):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO panels (module, panel_kind, channel_id, message_id, content_hash, edited_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(module, panel_kind, channel_id) DO UPDATE SET
+                    message_id = excluded.message_id,
+                    content_hash = excluded.content_hash,
+                    edited_at = excluded.edited_at,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (module, panel_kind, channel_id, message_id, content_hash, edited_at))
+            conn.commit()
+
+    def delete_panel(self, module: str, panel_kind: str, channel_id: str):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'DELETE FROM panels WHERE module = ? AND panel_kind = ? AND channel_id = ?',
+                (module, panel_kind, channel_id)
+            )
+            conn.commit()
+
     # ===== ЭКОНОМИКА =====
 
+    @staticmethod
+    def _record_economy_transactions(cursor, rows: list):
+        """Записать операции [(user_id, amount, reason, action, operator, source)] и дневные итоги
+
+        Вызывается внутри транзакции изменения баланса — итоги по источникам
+        всегда согласованы с журналом операций.
+        """
+        cursor.executemany(
+            'INSERT INTO economy_transactions (user_id, amount, reason, action, operator, source) VALUES (?, ?, ?, ?, ?, ?)',
+            rows
+        )
+        day = msk_today().isoformat()
+        totals = {}
+        for _, amount, _, action, _, source in rows:
+            earn, spend, count = totals.get(source, (0, 0, 0))
+            if action == 'earn':
+                earn += amount
+            else:
+                spend += amount
+            totals[source] = (earn, spend, count + 1)
+        cursor.executemany('''
+            INSERT INTO economy_daily (day, source, earn, spend, tx_count) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day, source) DO UPDATE SET earn = earn + excluded.earn,
+                spend = spend + excluded.spend, tx_count = tx_count + excluded.tx_count
+        ''', [(day, source, earn, spend, count) for source, (earn, spend, count) in totals.items()])
+
     def init_user_balance(self, user_id: str):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -2440,28 +1938,53 @@ class Database:
             r = cursor.fetchone()
             return r[0] if r else None
 
-    def add_user_balance(self, user_id: str, amount: int, reason: str, awarded_by: str = None) -> int:
+    def add_user_balance(self, user_id: str, amount: int, reason: str, awarded_by: str = None, source: str = 'other') -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO user_balance (user_id, balance, total_earned) VALUES (?, ?, ?)
                 ON CONFLICT(user_id) DO UPDATE SET balance = balance + ?, total_earned = total_earned + ?
             ''', (user_id, amount, amount, amount, amount))
-            cursor.execute('INSERT INTO economy_transactions (user_id, amount, reason, action, operator) VALUES (?, ?, ?, "earn", ?)',
-                        (user_id, amount, reason, awarded_by))
+            self._record_economy_transactions(cursor, [(user_id, amount, reason, 'earn', awarded_by, source)])
             conn.commit()
             cursor.execute('SELECT balance FROM user_balance WHERE user_id = ?', (user_id,))
             return cursor.fetchone()[0]
 
-    def remove_user_balance(self, user_id: str, amount: int, reason: str, removed_by: str = None) -> int:
+    def award_many(self, awards: list, awarded_by: str = None, source: str = 'other') -> dict:
+        """Массовое начисление [(user_id, amount, reason)] одной транзакцией
+
+        Возвращает {user_id: новый баланс}.
+        """
+        awards = [(user_id, amount, reason) for user_id, amount, reason in awards if amount > 0]
+        if not awards:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO user_balance (user_id, balance, total_earned) VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance,
+                    total_earned = total_earned + excluded.total_earned
+            ''', [(user_id, amount, amount) for user_id, amount, _ in awards])
+            self._record_economy_transactions(
+                cursor, [(user_id, amount, reason, 'earn', awarded_by, source) for user_id, amount, reason in awards]
+            )
+            users = list({user_id for user_id, _, _ in awards})
+            balances = {}
+            for i in range(0, len(users), 500):
+                chunk = users[i:i + 500]
+                cursor.execute(f'SELECT user_id, balance FROM user_balance WHERE user_id IN ({",".join("?" * len(chunk))})', chunk)
+                balances.update(cursor.fetchall())
+            conn.commit()
+            return balances
+
+    def remove_user_balance(self, user_id: str, amount: int, reason: str, removed_by: str = None, source: str = 'other') -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE user_balance SET balance = balance - ?, total_spent = total_spent + ? WHERE user_id = ? AND balance >= ?',
                         (amount, amount, user_id, amount))
             if cursor.rowcount == 0:
                 return None
-            cursor.execute('INSERT INTO economy_transactions (user_id, amount, reason, action, operator) VALUES (?, ?, ?, "spend", ?)',
-                        (user_id, amount, reason, removed_by))
+            self._record_economy_transactions(cursor, [(user_id, amount, reason, 'spend', removed_by, source)])
             conn.commit()
             cursor.execute('SELECT balance FROM user_balance WHERE user_id = ?', (user_id,))
             return cursor.fetchone()[0]
@@ -2480,43 +2003,181 @@ class Database:
             r = cursor.fetchone()
             return r[0] if r else 0
 
-    def get_top_balance_users(self, limit: int = 10) -> list:
+    def get_all_balances(self) -> list:
+        """[(user_id, balance)] всех пользователей — для рейтинга в памяти"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT user_id, balance, total_earned FROM user_balance ORDER BY balance DESC LIMIT ?', (limit,))
+            cursor.execute('SELECT user_id, balance FROM user_balance')
             return cursor.fetchall()
 
+    def get_users_total_earned(self, user_ids: list) -> dict:
+        """{user_id: total_earned} для нескольких пользователей (поиск по ключу)"""
+        if not user_ids:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(user_ids))
+            cursor.execute(f'SELECT user_id, total_earned FROM user_balance WHERE user_id IN ({placeholders})',
+                           list(user_ids))
+            return dict(cursor.fetchall())
+
+    def get_economy_report(self, days: int = 7) -> dict:
+        """Итоги экономики по источникам из дневной свёртки
+
+        {'today': {source: {...}}, 'period': {source: {...}}, 'days': days},
+        где {...} = {'earn', 'spend', 'tx_count'}.
+        """
+        today = msk_today()
+        since = (today - timedelta(days=days - 1)).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT day, source, earn, spend, tx_count FROM economy_daily WHERE day >= ?', (since,))
+            report = {'today': {}, 'period': {}, 'days': days}
+            for day, source, earn, spend, count in cursor.fetchall():
+                for bucket in (('period', 'today') if day == today.isoformat() else ('period',)):
+                    totals = report[bucket].setdefault(source, {'earn': 0, 'spend': 0, 'tx_count': 0})
+                    totals['earn'] += earn
+                    totals['spend'] += spend
+                    totals['tx_count'] += count
+            return report
+
     def get_recent_economy_transactions(self, limit: int = 20) -> list:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT user_id, amount, reason, action, timestamp FROM economy_transactions ORDER BY timestamp DESC LIMIT ?', (limit,))
             return [{'user_id': r[0], 'amount': r[1], 'reason': r[2], 'action': r[3], 'timestamp': r[4]} for r in cursor.fetchall()]
 
-    def get_last_daily_claim(self, user_id: str) -> str:
+    def claim_daily_bonus(self, user_id: str, base: int, increment: int, streak_limit: int) -> tuple:
+        """Получение ежедневного бонуса одной транзакцией
+
+        Серия, начисление, запись операции и отметка last_daily — вместе,
+        поэтому повторное нажатие не даст второй бонус. Сутки — по МСК.
+        Возвращает (получен, серия, бонус, баланс).
+        """
+        today = msk_today()
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT last_daily FROM user_balance WHERE user_id = ?', (user_id,))
-            r = cursor.fetchone()
-            return r[0] if r else None
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('INSERT OR IGNORE INTO user_balance (user_id) VALUES (?)', (user_id,))
+            cursor.execute('SELECT last_daily, daily_streak, balance FROM user_balance WHERE user_id = ?', (user_id,))
+            last_daily, streak, balance = cursor.fetchone()
 
-    def get_daily_streak(self, user_id: str) -> int:
+            last_day = date.fromisoformat(msk_day_of(last_daily)) if last_daily else None
+            if last_day == today:
+                conn.rollback()
+                return False, streak or 0, 0, balance
+
+            if last_day and (today - last_day).days == 1:
+                streak = min((streak or 0) + 1, streak_limit)
+                bonus = base + (streak // 2) * increment
+            else:
+                streak = 1
+                bonus = base
+
+            cursor.execute('''
+                UPDATE user_balance SET balance = balance + ?, total_earned = total_earned + ?,
+                    last_daily = CURRENT_TIMESTAMP, daily_streak = ?
+                WHERE user_id = ?
+            ''', (bonus, bonus, streak, user_id))
+            self._record_economy_transactions(cursor, [(user_id, bonus, f"Ежедневный бонус (день {streak})", 'earn', None, 'daily')])
+            conn.commit()
+            return True, streak, bonus, balance + bonus
+
+    def get_daily_voice_earned(self, user_id: str, day: str = None) -> int:
+        """Сколько баллов за войс пользователь получил за МСК-день (по умолчанию — сегодня)"""
+        day = day or msk_today().isoformat()
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT daily_streak FROM user_balance WHERE user_id = ?', (user_id,))
+            cursor.execute('SELECT earned FROM voice_earnings WHERE user_id = ? AND day = ?', (user_id, day))
             r = cursor.fetchone()
             return r[0] if r else 0
 
-    def update_daily_claim(self, user_id: str, streak: int):
+    def voice_accrual_tick(self, credits: list, max_per_day: int, sessions: list = None,
+                           ended: list = None, day: str = None) -> dict:
+        """Один тик начисления за войс: все начисления и контрольные точки — одной транзакцией
+
+        credits — [(user_id, баллы, причина)], sessions — [(user_id, guild_id, channel_id,
+        joined_at, carry_seconds)] для сохранения, ended — user_id завершённых сессий.
+        Возвращает {user_id: (начислено, новый баланс)} только для тех, кому что-то начислено.
+        """
+        day = day or msk_today().isoformat()
+        wanted = {}
+        reasons = {}
+        for user_id, points, reason in credits:
+            if points > 0:
+                wanted[user_id] = wanted.get(user_id, 0) + points
+                reasons[user_id] = reason
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+
+            granted = {}
+            if wanted:
+                users = list(wanted)
+                earned = {}
+                for i in range(0, len(users), 500):
+                    chunk = users[i:i + 500]
+                    cursor.execute(
+                        f'SELECT user_id, earned FROM voice_earnings WHERE day = ? AND user_id IN ({",".join("?" * len(chunk))})',
+                        [day] + chunk
+                    )
+                    earned.update(cursor.fetchall())
+                for user_id, points in wanted.items():
+                    amount = max(0, min(points, max_per_day - earned.get(user_id, 0)))
+                    if amount:
+                        granted[user_id] = amount
+
+            if granted:
+                cursor.executemany('''
+                    INSERT INTO voice_earnings (user_id, day, earned) VALUES (?, ?, ?)
+                    ON CONFLICT(user_id, day) DO UPDATE SET earned = earned + excluded.earned
+                ''', [(user_id, day, amount) for user_id, amount in granted.items()])
+                cursor.executemany('''
+                    INSERT INTO user_balance (user_id, balance, total_earned) VALUES (?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance,
+                        total_earned = total_earned + excluded.total_earned
+                ''', [(user_id, amount, amount) for user_id, amount in granted.items()])
+                self._record_economy_transactions(
+                    cursor, [(user_id, amount, reasons[user_id], 'earn', None, 'voice') for user_id, amount in granted.items()]
+                )
+
+            if sessions:
+                cursor.executemany('''
+                    INSERT INTO voice_sessions (user_id, guild_id, channel_id, joined_at, carry_seconds, updated_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(user_id) DO UPDATE SET guild_id = excluded.guild_id, channel_id = excluded.channel_id,
+                        joined_at = excluded.joined_at, carry_seconds = excluded.carry_seconds, updated_at = CURRENT_TIMESTAMP
+                ''', sessions)
+            if ended:
+                cursor.executemany('DELETE FROM voice_sessions WHERE user_id = ?', [(user_id,) for user_id in ended])
+
+            result = {}
+            users = list(granted)
+            for i in range(0, len(users), 500):
+                chunk = users[i:i + 500]
+                cursor.execute(f'SELECT user_id, balance FROM user_balance WHERE user_id IN ({",".join("?" * len(chunk))})', chunk)
+                for user_id, balance in cursor.fetchall():
+                    result[user_id] = (granted[user_id], balance)
+            conn.commit()
+            return result
+
+    def get_voice_sessions(self) -> dict:
+        """Сохранённые голосовые сессии {user_id: {...}}"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE user_balance SET last_daily = CURRENT_TIMESTAMP, daily_streak = ? WHERE user_id = ?', (streak, user_id))
-            conn.commit()
+            cursor.execute('SELECT user_id, guild_id, channel_id, joined_at, carry_seconds FROM voice_sessions')
+            return {r[0]: {'guild_id': r[1], 'channel_id': r[2], 'joined_at': r[3], 'carry_seconds': r[4]}
+                    for r in cursor.fetchall()}
 
-    def get_daily_voice_earned(self, user_id: str) -> int:
+    def prune_voice_earnings(self, keep_days: int = 30) -> int:
+        """Удалить записи дневного учёта войса старше keep_days дней"""
+        before = (msk_today() - timedelta(days=keep_days)).isoformat()
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COALESCE(SUM(amount), 0) FROM economy_transactions WHERE user_id = ? AND action="earn" AND reason LIKE "%голосовом%" AND date(timestamp) = date("now")', (user_id,))
-            return cursor.fetchone()[0]
+            cursor.execute('DELETE FROM voice_earnings WHERE day < ?', (before,))
+            conn.commit()
+            return cursor.rowcount
 
     # ===== МАГАЗИН =====
 
@@ -2553,13 +2214,44 @@ class Database:
             conn.commit()
             return cursor.rowcount > 0
 
-    def purchase_item(self, user_id: str, item_id: int, price: int) -> bool:
+    def purchase(self, user_id: str, item_id: int) -> tuple:
+        """Покупка товара одной транзакцией: проверка остатка и баланса, списание, запись покупки
+
+        Возвращает (статус, товар, новый баланс), статус — 'ok', 'not_found',
+        'sold_out' или 'no_funds'. Условные UPDATE не дают продать больше
+        limited_quantity и уйти в минус даже при одновременных покупках.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE shop_items SET sold_count = sold_count + 1 WHERE id = ?', (item_id,))
-            cursor.execute('INSERT INTO user_purchases (user_id, item_id, price) VALUES (?, ?, ?)', (user_id, item_id, price))
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT id, name, description, price, emoji, limited_quantity, sold_count, is_active FROM shop_items WHERE id = ?', (item_id,))
+            r = cursor.fetchone()
+            if not r or not r[7]:
+                conn.rollback()
+                return 'not_found', None, None
+            item = {'id': r[0], 'name': r[1], 'description': r[2], 'price': r[3], 'emoji': r[4], 'limited_quantity': r[5], 'sold_count': r[6], 'is_active': r[7]}
+
+            cursor.execute('''
+                UPDATE shop_items SET sold_count = sold_count + 1
+                WHERE id = ? AND is_active = 1 AND (limited_quantity <= 0 OR sold_count < limited_quantity)
+            ''', (item_id,))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return 'sold_out', item, None
+
+            cursor.execute('UPDATE user_balance SET balance = balance - ?, total_spent = total_spent + ? WHERE user_id = ? AND balance >= ?',
+                        (item['price'], item['price'], user_id, item['price']))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                return 'no_funds', item, None
+
+            cursor.execute('INSERT INTO user_purchases (user_id, item_id, price) VALUES (?, ?, ?)', (user_id, item_id, item['price']))
+            self._record_economy_transactions(cursor, [(user_id, item['price'], f"Покупка: {item['name']}", 'spend', None, 'shop')])
+            cursor.execute('SELECT balance FROM user_balance WHERE user_id = ?', (user_id,))
+            balance = cursor.fetchone()[0]
             conn.commit()
-            return True
+            item['sold_count'] += 1
+            return 'ok', item, balance
 
     def get_user_purchases(self, user_id: str, limit: int = 10) -> list:
         with self.get_connection() as conn:
@@ -2571,55 +2263,41 @@ class Database:
             ''', (user_id, limit))
             return [{'id': r[0], 'item_id': r[1], 'price': r[2], 'purchased_at': r[3], 'item_name': r[4], 'item_emoji': r[5]} for r in cursor.fetchall()]
 
-    def update_daily_voice_earned(self, user_id: str, amount: int):
-        """Обновить ежедневный лимит голосовых баллов"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            # Просто логируем, лимит проверяется через get_daily_voice_earned
-            pass  # или можно хранить в отдельной таблице
-
     # ===== РАСШИРЕННАЯ СТАТИСТИКА =====
 
-    def get_daily_new_members(self, date: str) -> int:
+    # Дневные счётчики: date — МСК-день, фильтр по полуоткрытому UTC-диапазону
+    # (timestamp >= start AND timestamp < end), чтобы работали индексы
+
+    def _count_in_day(self, query: str, date: str) -> int:
+        start, end = msk_day_bounds_utc(date)
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM audit_log WHERE action="MEMBER_JOIN" AND date(timestamp) = ?', (date,))
+            cursor.execute(query, (start, end))
             return cursor.fetchone()[0]
 
+    def get_daily_new_members(self, date: str) -> int:
+        return self._count_in_day('SELECT COUNT(*) FROM audit_log WHERE action="MEMBER_JOIN" AND timestamp >= ? AND timestamp < ?', date)
+
     def get_daily_left_members(self, date: str) -> int:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM audit_log WHERE action="MEMBER_LEAVE" AND date(timestamp) = ?', (date,))
-            return cursor.fetchone()[0]
+        return self._count_in_day('SELECT COUNT(*) FROM audit_log WHERE action="MEMBER_LEAVE" AND timestamp >= ? AND timestamp < ?', date)
 
     def get_daily_applications(self, date: str) -> int:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM applications WHERE date(created_at) = ?', (date,))
-            return cursor.fetchone()[0]
+        return self._count_in_day('SELECT COUNT(*) FROM applications WHERE created_at >= ? AND created_at < ?', date)
 
     def get_daily_accepted_applications(self, date: str) -> int:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM applications WHERE status="accepted" AND date(reviewed_at) = ?', (date,))
-            return cursor.fetchone()[0]
+        return self._count_in_day('SELECT COUNT(*) FROM applications WHERE status="accepted" AND reviewed_at >= ? AND reviewed_at < ?', date)
 
     def get_daily_capt_registrations(self, date: str) -> int:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM capt_registrations WHERE date(registered_at) = ?', (date,))
-            return cursor.fetchone()[0]
+        return self._count_in_day('SELECT COUNT(*) FROM capt_registrations WHERE registered_at >= ? AND registered_at < ?', date)
 
     def get_daily_mcl_registrations(self, date: str) -> int:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM mcl_registrations WHERE date(registered_at) = ?', (date,))
-            return cursor.fetchone()[0]
+        return self._count_in_day('SELECT COUNT(*) FROM mcl_registrations WHERE registered_at >= ? AND registered_at < ?', date)
 
     def get_daily_mp_takes(self, date: str) -> int:
+        # event_date уже хранится как МСК-дата 'YYYY-MM-DD' — сравниваем напрямую
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM event_takes WHERE date(event_date) = ?', (date,))
+            cursor.execute('SELECT COUNT(*) FROM event_takes WHERE event_date = ?', (date,))
             return cursor.fetchone()[0]
 
     def get_stats_for_last_days(self, days: int) -> list:
@@ -2822,18 +2500,60 @@ class Database:
                         target_id: str = None, details: str = None, 
                         before: str = None, after: str = None):
         """Сохранить лог действия"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO server_action_logs (guild_id, event_type, user_id, target_id, details, before, after)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (guild_id, event_type, user_id, target_id, details, before, after))
+        self.save_action_logs_batch([
+            (guild_id, event_type, user_id, target_id, details, before, after, to_db_timestamp(msk_now()))
+        ])
+
+    def save_action_logs_batch(self, rows: list):
+        """Сохранить пачку логов одной транзакцией вместе с дневными сводками
+
+        rows: кортежи (guild_id, event_type, user_id, target_id, details, before, after, timestamp)
+        """
+        if not rows:
+            return
+
+        # Сводки считаем по пачке в памяти: одна строка UPSERT на (сервер, день, событие)
+        counts = {}
+        last_seen = {}
+        days = {}
+        for guild_id, event_type, user_id, _, _, _, _, timestamp in rows:
+            hour = timestamp[:13]
+            day = days.get(hour)
+            if day is None:
+                day = days[hour] = msk_day_of(timestamp)
+            key = (guild_id, day, event_type)
+            counts[key] = counts.get(key, 0) + 1
+            if day > last_seen.get((guild_id, user_id), ''):
+                last_seen[(guild_id, user_id)] = day
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO server_action_logs (guild_id, event_type, user_id, target_id, details, before, after, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            cursor.executemany('''
+                INSERT INTO action_log_daily (guild_id, day, event_type, count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id, day, event_type) DO UPDATE SET count = count + excluded.count
+            ''', [key + (count,) for key, count in counts.items()])
+            cursor.executemany('''
+                INSERT INTO action_log_user_last_seen (guild_id, user_id, last_day)
+                VALUES (?, ?, ?)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET last_day = MAX(last_day, excluded.last_day)
+            ''', [key + (day,) for key, day in last_seen.items()])
             conn.commit()
 
     def get_action_logs(self, limit: int = 100, offset: int = 0, 
                         user_id: str = None, event_type: str = None, 
-                        guild_id: str = None, days: int = None) -> list:
-        """Получить логи с фильтрацией"""
+                        guild_id: str = None, days: int = None,
+                        before_id: int = None, after_id: int = None) -> list:
+        """Получить логи с фильтрацией, от новых к старым
+
+        Постраничный просмотр — курсором по id: before_id отдаёт записи старше
+        указанной, after_id — новее. В отличие от OFFSET стоимость страницы
+        не растёт с её номером (индекс guild_id, id).
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             query = 'SELECT id, guild_id, event_type, user_id, target_id, details, before, after, timestamp FROM server_action_logs WHERE 1=1'
@@ -2855,14 +2575,119 @@ class Database:
                 query += ' AND timestamp >= datetime("now", ?)'
                 params.append(f'-{days} days')
             
-            query += ' ORDER BY timestamp DESC LIMIT ? OFFSET ?'
-            params.extend([limit, offset])
+            if before_id is not None:
+                query += ' AND id < ?'
+                params.append(before_id)
+            
+            if after_id is not None:
+                # Берём ближайшие более новые записи и разворачиваем к общему порядку
+                query += ' AND id > ? ORDER BY id ASC LIMIT ?'
+                params.extend([after_id, limit])
+            else:
+                query += ' ORDER BY id DESC LIMIT ? OFFSET ?'
+                params.extend([limit, offset])
             
             cursor.execute(query, params)
             columns = [description[0] for description in cursor.description]
             rows = cursor.fetchall()
+            if after_id is not None:
+                rows.reverse()
             return [dict(zip(columns, row)) for row in rows]
 
+    def search_action_logs(self, match: str, guild_id: str = None, user_id: str = None,
+                           event_type: str = None, days: int = None, limit: int = 10,
+                           max_id: int = None, after_score: float = None, after_id: int = None) -> list:
+        """Полнотекстовый поиск по details/before/after
+
+        match — готовое выражение FTS5. Результаты упорядочены по релевантности
+        (bm25, меньше — лучше), затем по id. max_id — снимок MAX(id) на начало
+        поиска: записанные позже логи в выдачу не попадают. Следующая страница
+        запрашивается курсором (after_score, after_id) последней строки
+        предыдущей; оценку строки-курсора запрос пересчитывает заново, потому
+        что bm25 сдвигается вместе со статистикой индекса. after_score нужен,
+        только если саму строку-курсор успели удалить.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                WITH ranked AS (
+                    SELECT rowid AS id, bm25(server_action_logs_fts) AS score
+                    FROM server_action_logs_fts
+                    WHERE server_action_logs_fts MATCH ?
+            '''
+            params = [match]
+
+            if max_id is not None:
+                query += ' AND rowid <= ?'
+                params.append(max_id)
+            query += ')'
+
+            if after_id is not None:
+                query += '''
+                    , anchor AS (
+                        SELECT COALESCE((SELECT score FROM ranked WHERE id = ?), ?) AS score
+                    )
+                '''
+                params.extend([after_id, after_score])
+
+            query += '''
+                SELECT l.id, l.guild_id, l.event_type, l.user_id, l.target_id, l.timestamp, r.score
+                FROM ranked r
+                JOIN server_action_logs l ON l.id = r.id
+            '''
+            if after_id is not None:
+                query += '''
+                    CROSS JOIN anchor a
+                    WHERE (r.score > a.score OR (r.score = a.score AND r.id > ?))
+                '''
+                params.append(after_id)
+            else:
+                query += ' WHERE 1=1'
+
+            if guild_id:
+                query += ' AND l.guild_id = ?'
+                params.append(guild_id)
+
+            if user_id:
+                query += ' AND l.user_id = ?'
+                params.append(user_id)
+
+            if event_type:
+                query += ' AND l.event_type = ?'
+                params.append(event_type)
+
+            if days:
+                query += ' AND l.timestamp >= datetime("now", ?)'
+                params.append(f'-{days} days')
+
+            query += ' ORDER BY r.score, r.id LIMIT ?'
+            params.append(limit)
+
+            cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            logs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            if not logs:
+                return logs
+
+            # Сниппеты строим только для строк страницы, а не для всех совпадений
+            placeholders = ','.join('?' * len(logs))
+            cursor.execute(f'''
+                SELECT rowid, snippet(server_action_logs_fts, -1, '**', '**', '…', 16)
+                FROM server_action_logs_fts
+                WHERE server_action_logs_fts MATCH ? AND rowid IN ({placeholders})
+            ''', [match] + [log['id'] for log in logs])
+            snippets = dict(cursor.fetchall())
+            for log in logs:
+                log['snippet'] = snippets.get(log['id'], '')
+            return logs
+
+    def get_action_logs_max_id(self) -> int:
+        """Последний id логов — снимок, с которого начинается поиск"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MAX(id) FROM server_action_logs')
+            return cursor.fetchone()[0] or 0
+
     def get_unique_action_log_events(self, guild_id: str = None) -> list:
         """Получить уникальные типы событий"""
         with self.get_connection() as conn:
@@ -2874,36 +2699,34 @@ class Database:
             return [row[0] for row in cursor.fetchall()]
 
     def get_action_logs_stats(self, guild_id: str, days: int = 30) -> dict:
-        """Получить статистику по логам"""
+        """Получить статистику по логам за последние days МСК-дней (включая сегодня)
+
+        Считается по сводкам action_log_daily / action_log_user_last_seen,
+        поэтому не зависит от объёма server_action_logs.
+        """
+        since = (msk_today() - timedelta(days=days - 1)).isoformat()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
-                SELECT COUNT(*) FROM server_action_logs 
-                WHERE guild_id = ? AND timestamp >= datetime("now", ?)
-            ''', (guild_id, f'-{days} days'))
-            total = cursor.fetchone()[0]
+                SELECT event_type, SUM(count) as count 
+                FROM action_log_daily 
+                WHERE guild_id = ? AND day >= ?
+                GROUP BY event_type 
+                ORDER BY count DESC
+            ''', (guild_id, since))
+            events = cursor.fetchall()
             
             cursor.execute('''
-                SELECT COUNT(DISTINCT user_id) FROM server_action_logs 
-                WHERE guild_id = ? AND timestamp >= datetime("now", ?)
-            ''', (guild_id, f'-{days} days'))
+                SELECT COUNT(*) FROM action_log_user_last_seen 
+                WHERE guild_id = ? AND last_day >= ?
+            ''', (guild_id, since))
             unique_users = cursor.fetchone()[0]
             
-            cursor.execute('''
-                SELECT event_type, COUNT(*) as count 
-                FROM server_action_logs 
-                WHERE guild_id = ? AND timestamp >= datetime("now", ?)
-                GROUP BY event_type 
-                ORDER BY count DESC 
-                LIMIT 10
-            ''', (guild_id, f'-{days} days'))
-            top_events = cursor.fetchall()
-            
             return {
-                'total': total,
+                'total': sum(row[1] for row in events),
                 'unique_users': unique_users,
-                'top_events': [{'event_type': row[0], 'count': row[1]} for row in top_events]
+                'top_events': [{'event_type': row[0], 'count': row[1]} for row in events[:10]]
             }
 
     # ===== МЕТОДЫ ДЛЯ МЕРОПРИЯТИЙ (EVENTS) =====
@@ -0,0 +1,1050 @@
+"""Версионные миграции схемы bot_data.db
+
+Каждая миграция — функция, принимающая курсор, зарегистрированная через
+@migration(номер, описание). Номер применённой версии хранится в таблице
+schema_version, при старте выполняются только ещё не применённые шаги.
+Новые изменения схемы добавляются новой миграцией в конец файла.
+"""
+import sqlite3
+import time
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str, transactional: bool = True):
+    def decorator(func):
+        MIGRATIONS.append((version, description, transactional, func))
+        return func
+    return decorator
+
+
+def get_schema_version(conn) -> int:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def run_migrations(database) -> int:
+    """Применить все ожидающие миграции, вернуть количество применённых"""
+    conn = database.get_connection()
+    current = get_schema_version(conn)
+    pending = sorted((m for m in MIGRATIONS if m[0] > current), key=lambda m: m[0])
+
+    for version, description, transactional, func in pending:
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        if transactional:
+            with conn:
+                cursor.execute('BEGIN')
+                func(cursor)
+                cursor.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                               (version, description))
+        else:
+            func(cursor)
+            with conn:
+                cursor.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                               (version, description))
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🗄️ [DB] Миграция {version:03d} применена: {description} ({elapsed:.0f} мс)")
+
+    return len(pending)
+
+
+# ===== 001: БАЗОВАЯ СХЕМА =====
+
+@migration(1, "базовая схема")
+def _base_schema(cursor):
+    # Таблица для хранения состояния модулей
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS module_settings (
+            module_key TEXT PRIMARY KEY,
+            enabled TEXT DEFAULT '0'
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            discord_id TEXT PRIMARY KEY,
+            username TEXT,
+            added_by TEXT NOT NULL,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1,
+            note TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS admins (
+            discord_id TEXT PRIMARY KEY,
+            added_by TEXT NOT NULL,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_super BOOLEAN DEFAULT 0
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_by TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS command_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            command TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            success BOOLEAN,
+            recipients INTEGER,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Таблицы для системы мероприятий
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            weekday INTEGER NOT NULL,
+            event_time TEXT NOT NULL,
+            enabled BOOLEAN DEFAULT 1,
+            created_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(name, weekday, event_time)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_takes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            group_code TEXT NOT NULL,
+            meeting_place TEXT NOT NULL,
+            taken_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            event_date DATE NOT NULL,
+            is_cancelled BOOLEAN DEFAULT 0,
+            FOREIGN KEY (event_id) REFERENCES events (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            user_id TEXT,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events (id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            scheduled_date DATE NOT NULL,
+            reminder_sent BOOLEAN DEFAULT 0,
+            taken_by TEXT,
+            group_code TEXT,
+            meeting_place TEXT,
+            FOREIGN KEY (event_id) REFERENCES events (id),
+            UNIQUE(event_id, scheduled_date)
+        )
+    ''')
+
+    # Таблицы для авто-рекламы
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS auto_ad (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_text TEXT NOT NULL,
+            image_url TEXT,
+            channel_id TEXT NOT NULL,
+            interval_minutes INTEGER DEFAULT 65,
+            sleep_start TEXT DEFAULT '02:00',
+            sleep_end TEXT DEFAULT '06:30',
+            last_sent TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1,
+            created_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS auto_ad_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            success BOOLEAN,
+            error TEXT
+        )
+    ''')
+
+    # Таблицы для системы регистрации на CAPT
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS capt_registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL UNIQUE,
+            user_name TEXT NOT NULL,
+            list_type TEXT NOT NULL CHECK(list_type IN ('main', 'reserve')),
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS capt_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            is_active BOOLEAN DEFAULT 0,
+            started_by TEXT,
+            started_at TIMESTAMP,
+            ended_by TEXT,
+            ended_at TIMESTAMP,
+            main_message_id TEXT,
+            reserve_message_id TEXT,
+            main_channel_id TEXT,
+            reserve_channel_id TEXT
+        )
+    ''')
+
+    # Миграция: добавляем колонки для event_name, event_time, additional_info
+    try:
+        cursor.execute('ALTER TABLE capt_sessions ADD COLUMN event_name TEXT')
+    except sqlite3.OperationalError:
+        pass
+
+    try:
+        cursor.execute('ALTER TABLE capt_sessions ADD COLUMN event_time TEXT')
+    except sqlite3.OperationalError:
+        pass
+
+    try:
+        cursor.execute('ALTER TABLE capt_sessions ADD COLUMN additional_info TEXT')
+    except sqlite3.OperationalError:
+        pass
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ЗАЯВОК =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_by TEXT,
+            reviewed_at TIMESTAMP,
+            reject_reason TEXT,
+            answers TEXT
+        )
+    ''')
+
+    # ===== МИГРАЦИЯ: УДАЛЕНИЕ СТАРЫХ КОЛОНОК ИЗ applications =====
+    try:
+        # Проверяем, есть ли старые колонки
+        cursor.execute("PRAGMA table_info(applications)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        old_columns = ['nickname', 'static', 'previous_families', 'prime_time', 'hours_per_day']
+        existing_old = [col for col in old_columns if col in columns]
+
+        if existing_old:
+            print(f"🔧 Миграция: удаляю старые колонки {existing_old} из таблицы applications...")
+
+            # Создаём новую таблицу без старых колонок
+            cursor.execute('''
+                CREATE TABLE applications_new (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    user_name TEXT NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    reviewed_by TEXT,
+                    reviewed_at TIMESTAMP,
+                    reject_reason TEXT,
+                    answers TEXT
+                )
+            ''')
+
+            # Копируем данные
+            cursor.execute('''
+                INSERT INTO applications_new (id, user_id, user_name, status, created_at, reviewed_by, reviewed_at, reject_reason, answers)
+                SELECT id, user_id, user_name, status, created_at, reviewed_by, reviewed_at, reject_reason, answers
+                FROM applications
+            ''')
+
+            # Удаляем старую таблицу
+            cursor.execute('DROP TABLE applications')
+
+            # Переименовываем новую
+            cursor.execute('ALTER TABLE applications_new RENAME TO applications')
+
+            print("✅ Таблица applications успешно обновлена (старые колонки удалены)")
+    except Exception as e:
+        print(f"⚠️ Ошибка миграции: {e}")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Добавляем настройки по умолчанию для системы заявок
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('applications_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('applications_log_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('applications_recruit_role', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('applications_member_role', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('applications_settings_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO application_settings (key, value) VALUES (?, ?)', 
+                ('submit_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
+                ('applications_create_profiles', 'true'))
+
+    # ===== ТАБЛИЦА ДЛЯ ХРАНЕНИЯ СООБЩЕНИЙ С ЗАЯВКАМИ =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id INTEGER NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE,
+            UNIQUE(application_id)
+        )
+    ''')
+
+    # ===== ТАБЛИЦА ДЛЯ НАСТРОЙКИ ПОЛЕЙ ЗАЯВКИ =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_fields (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            field_name TEXT NOT NULL,
+            field_description TEXT,
+            placeholder TEXT,
+            required BOOLEAN DEFAULT 1,
+            field_order INTEGER DEFAULT 0,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ AFK =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS afk_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL UNIQUE,
+            user_name TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            hours INTEGER NOT NULL,
+            until_time TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS afk_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Добавляем настройки по умолчанию
+    cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
+                ('afk_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
+                ('afk_max_hours', '24'))
+    cursor.execute('INSERT OR IGNORE INTO afk_settings (key, value) VALUES (?, ?)', 
+                ('afk_settings_channel', 'null'))
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ TIER =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tier_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            nickname TEXT NOT NULL,
+            arena_link TEXT NOT NULL,
+            screenshots TEXT NOT NULL,
+            additional TEXT,
+            target_tier TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_by TEXT,
+            reviewed_at TIMESTAMP,
+            reject_reason TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tier_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tier_requirements (
+            tier TEXT PRIMARY KEY,
+            requirements TEXT
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tier_application_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id INTEGER NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            FOREIGN KEY (application_id) REFERENCES tier_applications (id) ON DELETE CASCADE,
+            UNIQUE(application_id)
+        )
+    ''')
+
+    # Таблица для ролей, выдаваемых при принятии заявки
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS application_reward_roles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            role_id TEXT NOT NULL,
+            added_by TEXT,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Добавляем настройки по умолчанию
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier_submit_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier_applications_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier_log_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier_info_channel', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier_checker_role', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier3_role', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier2_role', 'null'))
+    cursor.execute('INSERT OR IGNORE INTO tier_settings (key, value) VALUES (?, ?)', 
+                ('tier1_role', 'null'))
+
+    # Настройки по умолчанию
+    cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
+                ('tier3', '1. Активность в семье\n2. Участие в мероприятиях\n3. Положительная репутация'))
+    cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
+                ('tier2', '1. Выполнение требований Tier 3\n2. Регулярные отчёты\n3. Помощь новичкам'))
+    cursor.execute('INSERT OR IGNORE INTO tier_requirements (tier, requirements) VALUES (?, ?)', 
+                ('tier1', '1. Выполнение требований Tier 2\n2. Лидерские качества\n3. Вклад в развитие семьи'))
+    cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
+                ('tier_delete_profile', 'false'))
+    cursor.execute('INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)', 
+                ('tier_create_profile', 'false'))
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ СТАТИСТИКИ =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL UNIQUE,
+            new_members INTEGER DEFAULT 0,
+            left_members INTEGER DEFAULT 0,
+            new_applications INTEGER DEFAULT 0,
+            accepted_applications INTEGER DEFAULT 0,
+            max_voice_online INTEGER DEFAULT 0,
+            capt_registrations INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Добавляем настройки по умолчанию
+    cursor.execute('INSERT OR IGNORE INTO stats_settings (key, value) VALUES (?, ?)', 
+                ('stats_backup_enabled', 'true'))
+    cursor.execute('INSERT OR IGNORE INTO stats_settings (key, value) VALUES (?, ?)', 
+                ('stats_channel', 'null'))
+
+    # ===== Почасовая статистика =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hourly_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            messages INTEGER DEFAULT 0,
+            voice_users INTEGER DEFAULT 0,
+            UNIQUE(date, hour)
+        );
+    ''')
+
+    # ===== Статистика пользователей =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_activity (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            messages INTEGER DEFAULT 0,
+            voice_minutes INTEGER DEFAULT 0,
+            UNIQUE(user_id, date)
+        );
+    ''')
+
+    # ===== Бекапы сервера =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS server_backups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            backup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            backup_data TEXT NOT NULL,
+            backup_size INTEGER DEFAULT 0,
+            created_by TEXT
+        );
+    ''')
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ОТПУСКОВ =====
+
+    # Таблица заявок на отпуск
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vacation_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            days INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            saved_roles TEXT,
+            guild_id TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            until_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            reviewed_by TEXT,
+            reviewed_at TIMESTAMP,
+            reject_reason TEXT
+        )
+    ''')
+
+    # Таблица настроек
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vacation_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Таблица активных отпусков (куда переносятся одобренные заявки)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vacation_active (
+            user_id TEXT PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            until_date DATE NOT NULL,
+            saved_roles TEXT NOT NULL,
+            guild_id TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Таблица для хранения ID сообщений (для восстановления кнопок)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vacation_application_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id INTEGER NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            FOREIGN KEY (application_id) REFERENCES vacation_applications (id) ON DELETE CASCADE,
+            UNIQUE(application_id)
+        )
+    ''')
+
+    # Настройки по умолчанию
+    cursor.execute('INSERT OR IGNORE INTO vacation_settings (key, value) VALUES (?, ?)', 
+                ('vacation_max_days', '30'))
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ДНЕЙ РОЖДЕНИЯ =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS birthdays (
+            user_id TEXT PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            birthday_date TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ MCL =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mcl_registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL UNIQUE,
+            user_name TEXT NOT NULL,
+            list_type TEXT NOT NULL CHECK(list_type IN ('main', 'reserve')),
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mcl_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            is_active BOOLEAN DEFAULT 0,
+            started_by TEXT,
+            started_at TIMESTAMP,
+            ended_by TEXT,
+            ended_at TIMESTAMP,
+            main_message_id TEXT,
+            reserve_message_id TEXT,
+            main_channel_id TEXT,
+            reserve_channel_id TEXT,
+            event_name TEXT,
+            event_time TEXT,
+            additional_info TEXT
+        )
+    ''')
+
+    # Таблица для временных комнат
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS temp_voice_rooms (
+            channel_id TEXT PRIMARY KEY,
+            creator_id TEXT NOT NULL,
+            creator_name TEXT NOT NULL,
+            slots INTEGER DEFAULT 2,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Таблица для логов действий сервера
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS server_action_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            target_id TEXT,
+            details TEXT,
+            before TEXT,
+            after TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Индексы для ускорения поиска
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_user ON server_action_logs(user_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_event ON server_action_logs(event_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_time ON server_action_logs(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_guild ON server_action_logs(guild_id)')
+
+    # Таблицы для мероприятий
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            creator_id TEXT NOT NULL,
+            template_id INTEGER,
+            collect_time INTEGER DEFAULT 20,
+            event_time TEXT,
+            additional_info TEXT,
+            channel_id TEXT,
+            message_id TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_participants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES event_sessions(id) ON DELETE CASCADE,
+            UNIQUE(session_id, user_id)
+        )
+    ''')
+
+    # ===== МИГРАЦИЯ ДЛЯ EVENT_SESSIONS =====
+    try:
+        cursor.execute('ALTER TABLE event_sessions ADD COLUMN event_name TEXT')
+    except sqlite3.OperationalError:
+        pass
+
+    try:
+        cursor.execute('ALTER TABLE event_sessions ADD COLUMN meeting_place TEXT')
+    except sqlite3.OperationalError:
+        pass
+
+    try:
+        cursor.execute('ALTER TABLE event_sessions ADD COLUMN template_id INTEGER')
+    except sqlite3.OperationalError:
+        pass
+
+    # ===== ТАБЛИЦЫ ДЛЯ СИСТЕМЫ ИГР =====
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS active_games (
+            game_id TEXT PRIMARY KEY,
+            game_type TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            player1_id TEXT NOT NULL,
+            player2_id TEXT NOT NULL,
+            game_data TEXT NOT NULL,
+            current_turn TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_stats (
+            user_id TEXT PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            games_played INTEGER DEFAULT 0
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_settings (
+            game_type TEXT PRIMARY KEY,
+            enabled INTEGER DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_balance (
+            user_id TEXT PRIMARY KEY,
+            balance INTEGER DEFAULT 0,
+            total_earned INTEGER DEFAULT 0,
+            total_spent INTEGER DEFAULT 0,
+            daily_streak INTEGER DEFAULT 0,
+            last_daily TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS economy_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            reason TEXT,
+            action TEXT CHECK(action IN ('earn', 'spend')),
+            operator TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shop_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            price INTEGER NOT NULL,
+            emoji TEXT DEFAULT '🛒',
+            limited_quantity INTEGER DEFAULT 0,
+            sold_count INTEGER DEFAULT 0,
+            is_active BOOLEAN DEFAULT 1,
+            created_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_purchases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            purchased_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES shop_items(id)
+        );
+    ''')
+
+
+# ===== 002: ИНДЕКСЫ ДЛЯ ГОРЯЧИХ ЗАПРОСОВ =====
+
+@migration(2, "индексы для горячих запросов")
+def _hot_path_indexes(cursor):
+    # Экономика: дневной лимит войса (user_id + время), лента транзакций
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_economy_transactions_user_time ON economy_transactions(user_id, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_economy_transactions_time ON economy_transactions(timestamp)')
+
+    # Аудит: счётчики по действию за день, последние записи
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_action_time ON audit_log(action, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_time ON audit_log(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_command_stats_time ON command_stats(timestamp)')
+
+    # Мероприятия
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_takes_date ON event_takes(event_date, is_cancelled)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_takes_user_date ON event_takes(user_id, event_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_event ON event_logs(event_id)')
+
+    # Регистрации CAPT / MCL
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_capt_registrations_list ON capt_registrations(is_active, list_type, registered_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_capt_registrations_time ON capt_registrations(registered_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mcl_registrations_list ON mcl_registrations(is_active, list_type, registered_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mcl_registrations_time ON mcl_registrations(registered_at)')
+
+    # Активность пользователей: выборки по дате для всех пользователей
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_activity_date ON user_activity(date, user_id)')
+
+    # Заявки: статус + дата рассмотрения/создания, активная заявка пользователя.
+    # *_application_messages выбираются JOIN'ом по статусу заявки — его покрывают индексы по status
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_status_reviewed ON applications(status, reviewed_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_status_created ON applications(status, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_user_status ON applications(user_id, status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_applications_created ON applications(created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tier_applications_status ON tier_applications(status, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tier_applications_user_status ON tier_applications(user_id, status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_vacation_applications_status ON vacation_applications(status, created_at)')
+
+    # Покупки и транзакции пользователя
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_purchases_user_time ON user_purchases(user_id, purchased_at)')
+
+
+# ===== 003: ПОЛНОТЕКСТОВЫЙ ПОИСК ПО ЛОГАМ ДЕЙСТВИЙ =====
+
+@migration(3, "FTS5-индекс логов действий")
+def _action_logs_fts(cursor):
+    # Внешний контент: текст хранится только в server_action_logs, FTS держит индекс
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS server_action_logs_fts USING fts5(
+            details, before, after,
+            content='server_action_logs',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS server_action_logs_fts_ai AFTER INSERT ON server_action_logs BEGIN
+            INSERT INTO server_action_logs_fts (rowid, details, before, after)
+            VALUES (new.id, new.details, new.before, new.after);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS server_action_logs_fts_ad AFTER DELETE ON server_action_logs BEGIN
+            INSERT INTO server_action_logs_fts (server_action_logs_fts, rowid, details, before, after)
+            VALUES ('delete', old.id, old.details, old.before, old.after);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS server_action_logs_fts_au AFTER UPDATE OF details, before, after ON server_action_logs BEGIN
+            INSERT INTO server_action_logs_fts (server_action_logs_fts, rowid, details, before, after)
+            VALUES ('delete', old.id, old.details, old.before, old.after);
+            INSERT INTO server_action_logs_fts (rowid, details, before, after)
+            VALUES (new.id, new.details, new.before, new.after);
+        END
+    ''')
+
+    # Индексируем уже накопленные логи
+    cursor.execute("INSERT INTO server_action_logs_fts (server_action_logs_fts) VALUES ('rebuild')")
+
+
+# ===== 004: КУРСОРНАЯ ПАГИНАЦИЯ ЛОГОВ ДЕЙСТВИЙ =====
+
+@migration(4, "индекс (guild_id, id) для постраничного просмотра логов")
+def _action_logs_keyset_index(cursor):
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_server_action_logs_guild_id ON server_action_logs(guild_id, id)')
+    # Одиночный индекс по guild_id покрывается новым составным
+    cursor.execute('DROP INDEX IF EXISTS idx_server_action_logs_guild')
+
+
+# ===== 005: ДНЕВНЫЕ СВОДКИ ЛОГОВ ДЕЙСТВИЙ =====
+
+@migration(5, "дневные сводки логов действий")
+def _action_log_rollups(cursor):
+    # Количество событий по серверу, МСК-дню и типу события
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS action_log_daily (
+            guild_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, day, event_type)
+        ) WITHOUT ROWID
+    ''')
+
+    # Последний день активности пользователя: уникальные за «последние N дней»
+    # считаются точно одним диапазоном по индексу (guild_id, last_day)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS action_log_user_last_seen (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            last_day TEXT NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_action_log_user_last_seen_day ON action_log_user_last_seen(guild_id, last_day)')
+
+    # Заполняем по уже накопленным логам. Москва — UTC+3 без перехода на летнее время
+    cursor.execute('''
+        INSERT OR IGNORE INTO action_log_daily (guild_id, day, event_type, count)
+        SELECT guild_id, date(timestamp, '+3 hours'), event_type, COUNT(*)
+        FROM server_action_logs
+        GROUP BY guild_id, date(timestamp, '+3 hours'), event_type
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO action_log_user_last_seen (guild_id, user_id, last_day)
+        SELECT guild_id, user_id, date(MAX(timestamp), '+3 hours')
+        FROM server_action_logs
+        GROUP BY guild_id, user_id
+    ''')
+
+
+# ===== 006: ИНКРЕМЕНТАЛЬНЫЙ VACUUM ДЛЯ АРХИВАЦИИ =====
+
+@migration(6, "auto_vacuum=INCREMENTAL и индекс времени event_logs", transactional=False)
+def _incremental_vacuum(cursor):
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_time ON event_logs(timestamp)')
+    # Режим auto_vacuum меняется только полным VACUUM — разово при обновлении
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    cursor.execute('VACUUM')
+
+
+# ===== 007: ДНЕВНОЙ УЧЁТ БАЛЛОВ ЗА ВОЙС =====
+
+@migration(7, "дневной учёт баллов за голосовой онлайн")
+def _voice_earnings(cursor):
+    # Сколько баллов за войс пользователь получил за МСК-день — проверка лимита по ключу
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS voice_earnings (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            earned INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+    # Переносим начисления за текущие сутки, чтобы лимит не обнулился при обновлении
+    cursor.execute('''
+        INSERT OR IGNORE INTO voice_earnings (user_id, day, earned)
+        SELECT user_id, date(timestamp, '+3 hours'), SUM(amount)
+        FROM economy_transactions
+        WHERE timestamp >= datetime('now', '-1 day')
+          AND action = 'earn' AND reason LIKE '%голосовом%'
+        GROUP BY user_id, date(timestamp, '+3 hours')
+    ''')
+
+
+@migration(8, "контрольные точки голосовых сессий")
+def _voice_sessions(cursor):
+    # Кто сейчас в войсе и сколько секунд ещё не начислено — переживает перезапуск бота
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS voice_sessions (
+            user_id TEXT PRIMARY KEY,
+            guild_id TEXT,
+            channel_id TEXT,
+            joined_at TIMESTAMP NOT NULL,
+            carry_seconds INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    ''')
+
+
+@migration(9, "источник операций экономики и дневные итоги")
+def _economy_sources(cursor):
+    cursor.execute('PRAGMA table_info(economy_transactions)')
+    if 'source' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE economy_transactions ADD COLUMN source TEXT')
+
+    # Старые операции размечаем по тексту причины — один раз, дальше source пишется сразу
+    cursor.execute('''
+        UPDATE economy_transactions SET source = CASE
+            WHEN reason LIKE '%голосовом%' THEN 'voice'
+            WHEN reason LIKE 'Участие в CAPT%' THEN 'capt'
+            WHEN reason LIKE 'Участие в MCL%' THEN 'mcl'
+            WHEN reason = 'Взятие мероприятия' THEN 'event'
+            WHEN reason = 'Принятие заявки' THEN 'application'
+            WHEN reason LIKE 'Повышение до%' THEN 'tier'
+            WHEN reason LIKE 'Ежедневный бонус%' THEN 'daily'
+            WHEN reason LIKE 'Покупка:%' THEN 'shop'
+            WHEN operator IS NOT NULL THEN 'admin'
+            ELSE 'other'
+        END
+        WHERE source IS NULL
+    ''')
+
+    # Итоги по МСК-дню и источнику, обновляются при каждой записи операции
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS economy_daily (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            earn INTEGER NOT NULL DEFAULT 0,
+            spend INTEGER NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO economy_daily (day, source, earn, spend, tx_count)
+        SELECT date(timestamp, '+3 hours'), source,
+               SUM(CASE WHEN action = 'earn' THEN amount ELSE 0 END),
+               SUM(CASE WHEN action = 'spend' THEN amount ELSE 0 END),
+               COUNT(*)
+        FROM economy_transactions
+        GROUP BY date(timestamp, '+3 hours'), source
+    ''')
+
+
+@migration(10, "отметка таймаута напоминаний в event_schedule")
+def _event_schedule_timeouts(cursor):
+    cursor.execute('PRAGMA table_info(event_schedule)')
+    if 'timeout_sent' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute('ALTER TABLE event_schedule ADD COLUMN timeout_sent INTEGER NOT NULL DEFAULT 0')
+
+    # Ожидающие таймауты выбираются по диапазону дат одним запросом
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_schedule_pending
+        ON event_schedule(scheduled_date)
+        WHERE reminder_sent = 1 AND timeout_sent = 0 AND taken_by IS NULL
+    ''')
+
+
+@migration(11, "реестр панелей модулей")
+def _panels(cursor):
+    # Одна строка на панель: где лежит сообщение и чем оно было отрисовано
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS panels (
+            module TEXT NOT NULL,
+            panel_kind TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT NOT NULL,
+            content_hash TEXT,
+            edited_at TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (module, panel_kind, channel_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+@migration(12, "время мероприятий в формате HH:MM")
+def _pad_event_times(cursor):
+    # '9:30' не сравнивается со строками 'HH:MM' и даёт NULL в datetime()
+    cursor.execute('''
+        UPDATE OR IGNORE events SET event_time = '0' || event_time
+        WHERE event_time GLOB '[0-9]:[0-9][0-9]'
+    ''')
@@ -1,6 +1,11 @@
 """Менеджер модулей — централизованное управление всеми системами бота"""
+import asyncio
+import os
+import time
+
 import discord
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG, save_config
 
 
@@ -13,7 +18,8 @@ MODULES = {
         "settings_channels": ["capt_settings_channel"],
         "initializer": "capt_registration.manager",
         "initialize_method": "initialize_buttons",
-        "toggleable": True
+        "toggleable": True,
+        "depends_on": ["economy"]
     },
     "mcl": {
         "name": "🎯 MCL/ВЗМ Регистрация",
@@ -23,7 +29,8 @@ MODULES = {
         "settings_channels": ["mcl_settings_channel"],
         "initializer": "mcl_registration.manager",
         "initialize_method": "initialize_buttons",
-        "toggleable": True
+        "toggleable": True,
+        "depends_on": ["economy"]
     },
     "applications": {
         "name": "📝 Заявки в семью",
@@ -33,7 +40,8 @@ MODULES = {
         "settings_channels": ["applications_settings_channel"],
         "initializer": "applications.initializer",
         "initialize_method": "setup",
-        "toggleable": True
+        "toggleable": True,
+        "depends_on": ["economy"]
     },
     "event_scheduler": {  # ← ПЕРЕИМЕНОВАНО
         "name": "📅 Планировщик мероприятий",
@@ -176,11 +184,17 @@ MODULES = {
     },
 }
 
+# depends_on — модули, которые должны быть подняты раньше (capt/mcl/заявки начисляют баллы
+# через экономику). Сколько модулей инициализируются одновременно при старте:
+INIT_CONCURRENCY = int(os.getenv('MODULE_INIT_CONCURRENCY', '4'))
+
 
 class ModuleManager:
     def __init__(self, bot):
         self.bot = bot
         self.settings_channel_id = None
+        # module_key → время инициализации при старте, мс
+        self.init_timings = {}
         self.load_modules_state()
 
     def load_modules_state(self):
@@ -298,32 +312,33 @@ class ModuleManager:
                 economy_manager.set_bot(self.bot)
                 setup_integration(self.bot)
                 set_bot_for_views(self.bot)
+                await economy_manager.load_leaderboard()
+                
+                # Сессии войса восстанавливаются по текущему составу голосовых каналов
+                await economy_manager.voice.restore(self.bot)
+                economy_manager.voice.start()
                 
                 channel_id = CONFIG.get("economy_channel")
                 if channel_id and channel_id != "null":
                     channel = self.bot.get_channel(int(channel_id))
                     if channel:
-                        async for msg in channel.history(limit=50):
-                            if msg.author == self.bot.user:
-                                await msg.delete()
                         view = EconomyPanelView()
                         embed = await view.get_shop_embed()
-                        await channel.send(embed=embed, view=view)
+                        await panel_registry.publish(self.bot, 'economy', 'shop', channel,
+                                                     embed=embed, view=view, replace=True)
                         print(f"✅ [MODULE] {module['name']} панель магазина отправлена в #{channel.name}")
                 
                 admin_channel_id = CONFIG.get("economy_admin_channel")
                 if admin_channel_id and admin_channel_id != "null":
                     channel = self.bot.get_channel(int(admin_channel_id))
                     if channel:
-                        async for msg in channel.history(limit=50):
-                            if msg.author == self.bot.user:
-                                await msg.delete()
                         embed = discord.Embed(
                             title="⚙️ АДМИН-ПАНЕЛЬ ЭКОНОМИКИ",
                             description="Управление баллами и магазином",
                             color=0x7289da
                         )
-                        await channel.send(embed=embed, view=AdminEconomyView())
+                        await panel_registry.publish(self.bot, 'economy', 'admin', channel,
+                                                     embed=embed, view=AdminEconomyView(), replace=True)
                         print(f"✅ [MODULE] {module['name']} админ-панель отправлена в #{channel.name}")
                 
                 print(f"✅ [MODULE] {module['name']} инициализирован")
@@ -502,6 +517,15 @@ class ModuleManager:
         module = MODULES[module_key]
         all_keys = module.get("channels", []) + module.get("settings_channels", [])
         
+        embed = discord.Embed(
+            title=f"⛔ {module['name']}",
+            description="**Система отключена администратором**\nОбратитесь к администрации для включения.",
+            color=0x808080
+        )
+        
+        # Панели из реестра правятся по id, историю смотрим только в остальных каналах
+        handled = await panel_registry.show_disabled(self.bot, module_key, embed)
+        
         for channel_key in all_keys:
             channel_id = db.get_setting(channel_key)
             
@@ -514,7 +538,7 @@ class ModuleManager:
                 except:
                     pass
             
-            if not channel_id or channel_id == 'null' or channel_id == '[]':
+            if not channel_id or channel_id == 'null' or channel_id == '[]' or str(channel_id) in handled:
                 continue
             
             try:
@@ -528,11 +552,6 @@ class ModuleManager:
             try:
                 async for msg in channel.history(limit=50):
                     if msg.author == self.bot.user and msg.embeds:
-                        embed = discord.Embed(
-                            title=f"⛔ {module['name']}",
-                            description="**Система отключена администратором**\nОбратитесь к администрации для включения.",
-                            color=0x808080
-                        )
                         await msg.edit(embed=embed, view=None)
                         print(f"✅ [MODULE] Отключён embed в #{channel.name} ({channel_key})")
                         break
@@ -570,15 +589,70 @@ class ModuleManager:
                 return True
         return False
 
+    def _dependencies(self, keys: list) -> dict:
+        """Граф зависимостей среди keys; циклы разрываются с предупреждением"""
+        graph = {key: [dep for dep in MODULES[key].get("depends_on", []) if dep in keys] for key in keys}
+        
+        # Топологическая сортировка: если отсортировать больше нечего, а модули
+        # остались — они на цикле или за ним; снимаем зависимости первого и продолжаем
+        pending = {key: len(deps) for key, deps in graph.items()}
+        ready = [key for key, count in pending.items() if count == 0]
+        while pending:
+            if not ready:
+                key = next(iter(pending))
+                print(f"⚠️ [MODULE] Циклическая зависимость у {MODULES[key]['name']}, запускаю без ожидания")
+                graph[key] = []
+                ready.append(key)
+            key = ready.pop()
+            del pending[key]
+            for other, deps in graph.items():
+                if key in deps and other in pending:
+                    pending[other] -= 1
+                    if pending[other] == 0:
+                        ready.append(other)
+        return graph
+
     async def initialize_all_enabled_modules(self):
+        """Параллельная инициализация включённых модулей
+        
+        Модуль ждёт только свои зависимости (depends_on), независимые поднимаются
+        одновременно, но не больше INIT_CONCURRENCY сразу. Время каждого
+        модуля сохраняется в init_timings.
+        """
         print("📋 [MODULE] Инициализация включённых модулей...")
+        enabled = []
         for module_key, module in MODULES.items():
             if module["enabled"]:
-                print(f"🔍 [MODULE] Пытаюсь инициализировать {module['name']}...")
-                await self._enable_module(module_key)
+                enabled.append(module_key)
             else:
                 print(f"⏭️ [MODULE] {module['name']} выключен, пропускаем")
-        print("📋 [MODULE] Инициализация завершена")
+        
+        graph = self._dependencies(enabled)
+        finished = {key: asyncio.Event() for key in enabled}
+        limit = asyncio.Semaphore(INIT_CONCURRENCY)
+        self.init_timings = {}
+        
+        async def run(module_key: str):
+            try:
+                for dep in graph[module_key]:
+                    await finished[dep].wait()
+                async with limit:
+                    print(f"🔍 [MODULE] Пытаюсь инициализировать {MODULES[module_key]['name']}...")
+                    started = time.perf_counter()
+                    await self._enable_module(module_key)
+                    self.init_timings[module_key] = round((time.perf_counter() - started) * 1000)
+            finally:
+                # Зависимые модули не должны зависнуть, даже если этот упал
+                finished[module_key].set()
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(run(key) for key in enabled))
+        total = round((time.perf_counter() - started) * 1000)
+        
+        for module_key, elapsed in sorted(self.init_timings.items(), key=lambda item: -item[1]):
+            print(f"⏱️ [MODULE] {MODULES[module_key]['name']}: {elapsed} мс")
+        print(f"📋 [MODULE] Инициализация завершена за {total} мс "
+              f"(последовательно было бы {sum(self.init_timings.values())} мс)")
 
     async def update_settings_panel(self):
         channel_id = db.get_setting('global_settings_channel')
@@ -591,11 +665,6 @@ class ModuleManager:
         
         from core.settings_panel import GlobalSettingsPanel
         
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.components:
-                await msg.edit(view=GlobalSettingsPanel(self.bot))
-                return
-        
         embed = discord.Embed(
             title="⚙️ **ЦЕНТР УПРАВЛЕНИЯ СИСТЕМАМИ**",
             description="Настройка всех модулей бота.\n\n"
@@ -603,7 +672,9 @@ class ModuleManager:
                         "Чтобы включить/выключить модуль, используйте 🎛️ Управление модулями в !settings.",
             color=0x7289da
         )
-        await channel.send(embed=embed, view=GlobalSettingsPanel(self.bot))
+        await panel_registry.publish(self.bot, 'core', 'global_settings', channel,
+                                     embed=embed, view=GlobalSettingsPanel(self.bot),
+                                     match=lambda msg: bool(msg.components))
 
     async def restore_global_settings_panel(self):
         channel_id = db.get_setting('global_settings_channel_id')
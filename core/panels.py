@@ -0,0 +1,272 @@
+"""Реестр постоянных панелей модулей
+
+Панель — сообщение бота с embed и кнопками, которое модуль держит в канале
+(магазин, подача заявок, настройки). Для каждой тройки (module, panel_kind,
+channel_id) в таблице panels хранится id сообщения и хэш его содержимого,
+поэтому при старте панель не ищется по истории канала:
+
+    await panel_registry.publish(bot, 'stats', 'settings', channel,
+                                 embed=embed, view=StatsSettingsView())
+
+- сообщение известно и содержимое то же — одна проверка, что сообщение живо,
+  и bot.add_view(view, message_id=...) для кнопок;
+- содержимое изменилось — одно редактирование на месте; то же, если сообщение
+  правили в обход реестра (кнопки настроек, обновление списков): Discord
+  сообщает edited_at новее записанного;
+- сообщения нет (удалено вручную, новый канал, первый запуск) — как раньше,
+  просмотр истории: replace=True удаляет старые сообщения бота и отправляет
+  новое, иначе первое подходящее (match) сообщение редактируется.
+
+Для частых перерисовок (таймеры, списки по кликам) есть edit_if_changed:
+хэш каждого переданного поля (content/embed/view) запоминается по id
+сообщения, редактирование с тем же содержимым пропускается. volatile —
+ключи embed, которые не считаются изменением (timestamp, footer с часами).
+Пропущенные и выполненные правки считаются по модулям в get_stats().
+Удалённое вручную сообщение забывается по on_raw_message_delete
+(forget_rendered), поэтому следующая перерисовка его не пропустит.
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+
+import discord
+from discord.utils import MISSING
+
+from core.async_database import adb
+
+SCAN_LIMIT = 50
+# Сколько последних сообщений помнит edit_if_changed
+RENDERED_LIMIT = 1000
+
+
+def _stamp(message) -> str:
+    """Момент последнего изменения сообщения ботом (ISO, UTC)"""
+    return (message.edited_at or message.created_at).isoformat()
+
+
+def _render(name: str, value, volatile=()):
+    if value is None:
+        return None
+    if name == 'embed':
+        return {key: item for key, item in value.to_dict().items() if key not in volatile}
+    if name == 'view':
+        return value.to_components()
+    return value
+
+
+def _digest(data) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def payload_hash(content=None, embed=None, view=None, volatile=()) -> str:
+    """Хэш того, что увидит пользователь: текст, embed и раскладка кнопок"""
+    return _digest({
+        'content': _render('content', content),
+        'embed': _render('embed', embed, volatile),
+        'view': _render('view', view),
+    })
+
+
+def _field_hashes(fields: dict, volatile=()) -> dict:
+    return {name: _digest(_render(name, value, volatile)) for name, value in fields.items()}
+
+
+class PanelRegistry:
+
+    def __init__(self):
+        # (module, panel_kind, channel_id) → {'message_id', 'content_hash', 'edited_at'}
+        self._panels = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+        self.stats = {'unchanged': 0, 'edited': 0, 'sent': 0, 'scans': 0}
+
+        # message_id → {поле: хэш} последней отрисовки
+        self._rendered = {}
+        # module → число правок, пропущенных / выполненных edit_if_changed
+        self.skipped = {}
+        self.applied = {}
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            for row in await adb.get_panels():
+                key = (row['module'], row['panel_kind'], row['channel_id'])
+                self._panels[key] = {
+                    'message_id': row['message_id'],
+                    'content_hash': row['content_hash'],
+                    'edited_at': row['edited_at'],
+                }
+            self._loaded = True
+
+    async def _remember(self, key: tuple, message, content_hash: str):
+        edited_at = _stamp(message)
+        self._panels[key] = {'message_id': str(message.id), 'content_hash': content_hash, 'edited_at': edited_at}
+        await adb.save_panel(*key, str(message.id), content_hash, edited_at)
+
+    @staticmethod
+    def _edited_elsewhere(entry: dict, message) -> bool:
+        if message.edited_at is None:
+            return False
+        if not entry.get('edited_at'):
+            return True
+        return message.edited_at > datetime.fromisoformat(entry['edited_at'])
+
+    async def forget(self, module: str, panel_kind: str, channel_id):
+        await self._ensure_loaded()
+        key = (module, panel_kind, str(channel_id))
+        if self._panels.pop(key, None) is not None:
+            await adb.delete_panel(*key)
+
+    async def get_message_id(self, module: str, panel_kind: str, channel_id):
+        await self._ensure_loaded()
+        entry = self._panels.get((module, panel_kind, str(channel_id)))
+        return int(entry['message_id']) if entry else None
+
+    async def panels_of(self, module: str) -> list:
+        """[(panel_kind, channel_id, message_id)] зарегистрированных панелей модуля"""
+        await self._ensure_loaded()
+        return [
+            (kind, channel_id, int(entry['message_id']))
+            for (owner, kind, channel_id), entry in self._panels.items()
+            if owner == module
+        ]
+
+    async def show_disabled(self, bot, module: str, embed: discord.Embed) -> set:
+        """Заменить все панели модуля заглушкой, вернуть id обработанных каналов"""
+        await self._ensure_loaded()
+        content_hash = payload_hash(None, embed, None)
+        handled = set()
+        for kind, channel_id, message_id in await self.panels_of(module):
+            channel = bot.get_channel(int(channel_id))
+            if not channel:
+                continue
+            try:
+                message = await channel.get_partial_message(message_id).edit(content=None, embed=embed, view=None)
+                await self._remember((module, kind, channel_id), message, content_hash)
+                self._note_rendered(message_id, _field_hashes({'content': None, 'embed': embed, 'view': None}))
+                handled.add(channel_id)
+            except discord.NotFound:
+                self._panels.pop((module, kind, channel_id), None)
+                await adb.delete_panel(module, kind, channel_id)
+        return handled
+
+    def _note_rendered(self, message_id: int, hashes: dict):
+        rendered = self._rendered.pop(message_id, {})
+        rendered.update(hashes)
+        self._rendered[message_id] = rendered
+        if len(self._rendered) > RENDERED_LIMIT:
+            self._rendered.pop(next(iter(self._rendered)))
+
+    async def edit_if_changed(self, module: str, message, *, content=MISSING, embed=MISSING,
+                              view=MISSING, volatile=()) -> bool:
+        """Отредактировать message (Message или PartialMessage), только если поля изменились"""
+        fields = {
+            name: value
+            for name, value in (('content', content), ('embed', embed), ('view', view))
+            if value is not MISSING
+        }
+        hashes = _field_hashes(fields, volatile)
+        rendered = self._rendered.get(message.id, {})
+        if all(rendered.get(name) == digest for name, digest in hashes.items()):
+            self.skipped[module] = self.skipped.get(module, 0) + 1
+            return False
+
+        await message.edit(**fields)
+        self._note_rendered(message.id, hashes)
+        self.applied[module] = self.applied.get(module, 0) + 1
+        return True
+
+    def forget_rendered(self, message_id: int):
+        """Сообщение удалено: следующая правка не пропускается и получит NotFound"""
+        self._rendered.pop(message_id, None)
+
+    def _registered_in(self, channel_id: str) -> set:
+        return {
+            int(entry['message_id'])
+            for (_, _, owner_channel), entry in self._panels.items()
+            if owner_channel == channel_id
+        }
+
+    async def publish(self, bot, module: str, panel_kind: str, channel, *, content: str = None,
+                      embed: discord.Embed = None, view: discord.ui.View = None,
+                      match=None, replace: bool = False, scan_limit: int = SCAN_LIMIT,
+                      volatile=()) -> discord.Message:
+        """Показать панель в канале, по возможности не трогая историю
+
+        match(msg) — какое сообщение бота считать старой версией панели при
+        просмотре истории (по умолчанию любое незарегистрированное).
+        """
+        message = await self._publish(bot, module, panel_kind, channel, content, embed, view,
+                                      match, replace, scan_limit, volatile)
+        self._note_rendered(message.id, _field_hashes(
+            {'content': content, 'embed': embed, 'view': view}, volatile
+        ))
+        return message
+
+    async def _publish(self, bot, module, panel_kind, channel, content, embed, view,
+                       match, replace, scan_limit, volatile) -> discord.Message:
+        await self._ensure_loaded()
+        key = (module, panel_kind, str(channel.id))
+        content_hash = payload_hash(content, embed, view, volatile)
+        entry = self._panels.get(key)
+
+        if entry:
+            message_id = int(entry['message_id'])
+            try:
+                if entry['content_hash'] == content_hash:
+                    message = await channel.fetch_message(message_id)
+                    if not self._edited_elsewhere(entry, message):
+                        if view is not None and view.is_persistent():
+                            bot.add_view(view, message_id=message_id)
+                        self.stats['unchanged'] += 1
+                        return message
+
+                message = await channel.get_partial_message(message_id).edit(
+                    content=content, embed=embed, view=view
+                )
+                await self._remember(key, message, content_hash)
+                self.stats['edited'] += 1
+                return message
+            except discord.NotFound:
+                print(f"⚠️ [PANELS] Панель {module}/{panel_kind} в #{channel} удалена, ищу по истории")
+                self._panels.pop(key, None)
+
+        # Запасной путь: просмотр истории канала
+        self.stats['scans'] += 1
+        registered = self._registered_in(key[2])
+        found = []
+        async for msg in channel.history(limit=scan_limit):
+            if msg.author == bot.user and msg.id not in registered and (match is None or match(msg)):
+                found.append(msg)
+
+        message = None
+        if replace:
+            for msg in found:
+                await msg.delete()
+        elif found:
+            message = await found[0].edit(content=content, embed=embed, view=view)
+            self.stats['edited'] += 1
+
+        if message is None:
+            message = await channel.send(content=content, embed=embed, view=view)
+            self.stats['sent'] += 1
+
+        await self._remember(key, message, content_hash)
+        return message
+
+    def get_stats(self) -> dict:
+        return {
+            'panels': len(self._panels),
+            **self.stats,
+            'edits_skipped': dict(self.skipped),
+            'edits_applied': dict(self.applied),
+        }
+
+
+panel_registry = PanelRegistry()
@@ -0,0 +1,351 @@
+"""Хранение и архивация растущих таблиц bot_data.db
+
+Для каждой таблицы задаётся колонка времени и срок хранения в основной
+базе (RETENTION_<ТАБЛИЦА>_DAYS). Старые строки переносятся в архивные
+SQLite-файлы по месяцам (archive/bot_archive_YYYY_MM.db) небольшими
+пачками: каждая пачка — отдельная короткая транзакция в потоке записи,
+между пачками БД доступна остальному боту. После переноса освободившиеся
+страницы возвращаются incremental_vacuum'ом.
+
+Закрытый месяц — тот, куда уже не попадёт ни одна строка даже при самом
+долгом сроке хранения, — сжимается: VACUUM INTO + gzip в
+bot_archive_YYYY_MM.db.gz. Если срок хранения потом увеличат и строки
+снова придут в сжатый месяц, архив распаковывается перед переносом.
+
+Архивы читаются через read-only соединение:
+    conn = retention_manager.open_archive_reader()
+    conn.execute('SELECT COUNT(*) FROM all_audit_log WHERE action = ?', ('MEMBER_JOIN',))
+"""
+import asyncio
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from core.async_database import adb
+from core.database import db
+from core.scheduler import scheduler
+from core.timeutils import msk_now, to_db_timestamp
+
+# Таблица → (колонка времени, сколько дней хранить в основной БД)
+DEFAULT_POLICIES = {
+    'audit_log': ('timestamp', 180),
+    'command_stats': ('timestamp', 90),
+    'server_action_logs': ('timestamp', 90),
+    'economy_transactions': ('timestamp', 365),
+    'event_logs': ('timestamp', 180),
+    'server_backups': ('backup_date', 30),
+}
+
+ARCHIVE_NAME_RE = re.compile(r'^bot_archive_(\d{4}_\d{2})\.db(\.gz)?$')
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(moment: datetime) -> datetime:
+    return (moment.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+class RetentionManager:
+
+    def __init__(self, database, archive_dir: str = None, batch_size: int = None,
+                 pause_ms: int = None, vacuum_pages: int = None):
+        self._db = database
+        self.archive_dir = archive_dir or os.getenv('DB_ARCHIVE_DIR') or os.path.join(
+            os.path.dirname(os.path.abspath(database.db_path)), 'archive')
+        self.batch_size = batch_size or int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+        self.pause = (pause_ms or int(os.getenv('RETENTION_PAUSE_MS', '50'))) / 1000
+        self.vacuum_pages = vacuum_pages or int(os.getenv('RETENTION_VACUUM_PAGES', '2000'))
+        self.run_time = os.getenv('RETENTION_TIME', '04:30')
+
+        self.policies = {
+            table: (column, int(os.getenv(f'RETENTION_{table.upper()}_DAYS', str(days))))
+            for table, (column, days) in DEFAULT_POLICIES.items()
+        }
+
+        self.job = None
+        self.running = False
+        self.last_run = None
+
+    # ===== АРХИВНЫЕ ФАЙЛЫ =====
+
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f'bot_archive_{month}.db')
+
+    def packed_path(self, month: str) -> str:
+        return self.archive_path(month) + '.gz'
+
+    def list_archives(self) -> list:
+        """Месяцы ('YYYY_MM'), для которых есть архив (сжатый или нет), по возрастанию"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        months = set()
+        for name in os.listdir(self.archive_dir):
+            match = ARCHIVE_NAME_RE.match(name)
+            if match:
+                months.add(match.group(1))
+        return sorted(months)
+
+    # ===== СЖАТИЕ ЗАКРЫТЫХ МЕСЯЦЕВ =====
+
+    def _closed_before(self) -> str:
+        """Месяцы, закончившиеся раньше этого момента, больше не пополняются"""
+        longest = max(days for _, days in self.policies.values())
+        return to_db_timestamp(msk_now() - timedelta(days=longest))
+
+    def _pack(self, month: str):
+        """VACUUM INTO + gzip: bot_archive_M.db → bot_archive_M.db.gz"""
+        path = self.archive_path(month)
+        compact = path + '.vacuum'
+        if os.path.exists(compact):
+            os.remove(compact)
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute('VACUUM INTO ?', (compact,))
+        finally:
+            conn.close()
+        with open(compact, 'rb') as src, gzip.open(self.packed_path(month) + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(self.packed_path(month) + '.tmp', self.packed_path(month))
+        os.remove(compact)
+        os.remove(path)
+
+    def _unpack(self, month: str, target: str):
+        with gzip.open(self.packed_path(month), 'rb') as src, open(target + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(target + '.tmp', target)
+
+    def _pack_closed(self) -> list:
+        """Сжать несжатые архивы закрытых месяцев, вернуть их список"""
+        closed_before = self._closed_before()
+        packed = []
+        for month in self.list_archives():
+            if not os.path.exists(self.archive_path(month)):
+                continue
+            month_end = _next_month(datetime.strptime(month, '%Y_%m')).strftime('%Y-%m-%d %H:%M:%S')
+            if month_end <= closed_before:
+                self._pack(month)
+                packed.append(month)
+        return packed
+
+    def _readable_path(self, month: str) -> str:
+        """Путь к несжатому архиву; сжатый распаковывается в archive/.unpacked и переиспользуется"""
+        path = self.archive_path(month)
+        if os.path.exists(path):
+            return path
+        unpacked = os.path.join(self.archive_dir, '.unpacked', os.path.basename(path))
+        if not os.path.exists(unpacked) or os.path.getmtime(unpacked) < os.path.getmtime(self.packed_path(month)):
+            os.makedirs(os.path.dirname(unpacked), exist_ok=True)
+            self._unpack(month, unpacked)
+        return unpacked
+
+    @staticmethod
+    def _columns(conn, schema: str, table: str) -> list:
+        return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info({table})')]
+
+    def _ensure_archive_table(self, conn, table: str, column: str) -> list:
+        """Создать/дополнить таблицу в архиве по схеме основной БД, вернуть список колонок"""
+        main_columns = self._columns(conn, 'main', table)
+        arch_columns = self._columns(conn, 'arch', table)
+
+        if not arch_columns:
+            sql = conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()[0]
+            sql = re.sub(r'^CREATE TABLE\s+(IF NOT EXISTS\s+)?["`\[]?\w+["`\]]?',
+                         f'CREATE TABLE IF NOT EXISTS arch.{table}', sql, count=1)
+            conn.execute(sql)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS arch.idx_{table}_{column} ON {table}({column})')
+        else:
+            # В основной таблице могли появиться новые колонки после создания архива
+            for name in main_columns:
+                if name not in arch_columns:
+                    conn.execute(f'ALTER TABLE arch.{table} ADD COLUMN {name}')
+
+        return main_columns
+
+    # ===== ПЕРЕНОС (выполняется в потоке записи) =====
+
+    def _pending_range(self, table: str, column: str, start: str, cutoff: str):
+        """Самая старая строка в [start, cutoff), подлежащая переносу, или None"""
+        conn = self._db.get_connection()
+        return conn.execute(
+            f'SELECT MIN({column}) FROM {table} WHERE {column} >= ? AND {column} < ?', (start, cutoff)
+        ).fetchone()[0]
+
+    def _move_batch(self, table: str, column: str, start: str, end: str, month: str) -> int:
+        """Перенести одну пачку строк [start, end) в архив месяца, вернуть количество"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        if not os.path.exists(self.archive_path(month)) and os.path.exists(self.packed_path(month)):
+            # Срок хранения увеличили — сжатый месяц снова пополняется
+            self._unpack(month, self.archive_path(month))
+            os.remove(self.packed_path(month))
+        conn = self._db.get_connection()
+        conn.execute('ATTACH DATABASE ? AS arch', (self.archive_path(month),))
+        try:
+            columns = ', '.join(self._ensure_archive_table(conn, table, column))
+            with conn:
+                ids = [row[0] for row in conn.execute(
+                    f'SELECT id FROM main.{table} WHERE {column} >= ? AND {column} < ? ORDER BY id LIMIT ?',
+                    (start, end, self.batch_size)
+                )]
+                if ids:
+                    placeholders = ','.join('?' * len(ids))
+                    # OR IGNORE: повтор после сбоя между архивом и основной БД не задвоит строки
+                    conn.execute(
+                        f'INSERT OR IGNORE INTO arch.{table} ({columns}) '
+                        f'SELECT {columns} FROM main.{table} WHERE id IN ({placeholders})', ids
+                    )
+                    conn.execute(f'DELETE FROM main.{table} WHERE id IN ({placeholders})', ids)
+            return len(ids)
+        finally:
+            conn.execute('DETACH DATABASE arch')
+
+    def _incremental_vacuum(self) -> int:
+        """Вернуть ОС до vacuum_pages свободных страниц, вернуть сколько осталось"""
+        conn = self._db.get_connection()
+        # execute() делает у PRAGMA без строк результата только один шаг (одну страницу),
+        # executescript() выполняет её до конца
+        conn.executescript(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)})')
+        return conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    async def archive_table(self, table: str) -> int:
+        column, days = self.policies[table]
+        cutoff = to_db_timestamp(msk_now() - timedelta(days=days))
+        moved = 0
+
+        # Идём только по месяцам, где есть строки: пустые архивы не создаются
+        start = ''
+        while True:
+            oldest = await adb.run(self._pending_range, table, column, start, cutoff, read=True)
+            if oldest is None:
+                return moved
+
+            month = _month_start(datetime.strptime(oldest[:10], '%Y-%m-%d'))
+            start = month.strftime('%Y-%m-%d %H:%M:%S')
+            end = min(_next_month(month).strftime('%Y-%m-%d %H:%M:%S'), cutoff)
+            while True:
+                count = await adb.run(self._move_batch, table, column, start, end, month.strftime('%Y_%m'))
+                moved += count
+                if count < self.batch_size:
+                    break
+                # Отдаём блокировку записи остальным операциям бота
+                await asyncio.sleep(self.pause)
+            start = end
+
+    async def run_once(self) -> dict:
+        """Один проход по всем таблицам + incremental vacuum"""
+        if self.running:
+            return self.last_run or {}
+        self.running = True
+        started = time.perf_counter()
+        moved = {}
+        try:
+            for table in self.policies:
+                try:
+                    count = await self.archive_table(table)
+                except Exception as e:
+                    print(f"❌ [RETENTION] Ошибка архивации {table}: {e}")
+                    continue
+                if count:
+                    moved[table] = count
+                    print(f"🗄️ [RETENTION] {table}: перенесено в архив {count} строк")
+
+            # Дневной учёт войса нужен только для лимита текущих суток
+            await adb.prune_voice_earnings(int(os.getenv('RETENTION_VOICE_EARNINGS_DAYS', '30')))
+
+            try:
+                packed = await asyncio.to_thread(self._pack_closed)
+                if packed:
+                    print(f"🗜️ [RETENTION] Сжаты закрытые месяцы: {', '.join(packed)}")
+            except Exception as e:
+                print(f"❌ [RETENTION] Ошибка сжатия архивов: {e}")
+
+            freed_left = await adb.run(self._incremental_vacuum)
+            while freed_left:
+                await asyncio.sleep(self.pause)
+                left = await adb.run(self._incremental_vacuum)
+                if left >= freed_left:
+                    break
+                freed_left = left
+        finally:
+            self.running = False
+
+        self.last_run = {
+            'finished_at': msk_now().strftime('%d.%m.%Y %H:%M'),
+            'moved': moved,
+            'duration_ms': round((time.perf_counter() - started) * 1000),
+        }
+        print(f"🗄️ [RETENTION] Проход завершён за {self.last_run['duration_ms']} мс")
+        return self.last_run
+
+    # ===== ЧТЕНИЕ АРХИВОВ =====
+
+    def _archive_is_empty(self, month: str) -> bool:
+        if not os.path.exists(self.archive_path(month)):
+            # Сжимаются только архивы с перенесёнными строками
+            return False
+        conn = sqlite3.connect(f'file:{self.archive_path(month)}?mode=ro', uri=True)
+        try:
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            return not any(conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone() for table in tables)
+        finally:
+            conn.close()
+
+    def open_archive_reader(self, months: list = None) -> sqlite3.Connection:
+        """Read-only соединение с основной БД и подключёнными архивами
+
+        Для каждой таблицы с политикой создаётся временное представление
+        all_<таблица> = основная таблица + её архивы. Пустые архивы не
+        подключаются, сжатые читаются из распакованной копии в
+        archive/.unpacked. Если архивов больше лимита SQLite на ATTACH, берутся
+        самые свежие и печатается предупреждение со списком пропущенных
+        месяцев — их можно прочитать отдельным вызовом с months.
+        """
+        conn = sqlite3.connect(f'file:{os.path.abspath(self._db.db_path)}?mode=ro', uri=True)
+        available = [m for m in self.list_archives() if not self._archive_is_empty(m)]
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if hasattr(conn, 'getlimit') else 10
+        wanted = [m for m in (months or available) if m in available]
+        chosen = wanted[-limit:]
+        if len(wanted) > limit:
+            skipped = wanted[:-limit]
+            print(f"⚠️ [RETENTION] SQLite подключает не больше {limit} архивов, без данных за: "
+                  f"{', '.join(skipped)} — передайте months, чтобы прочитать их отдельно")
+
+        for month in chosen:
+            conn.execute(f'ATTACH DATABASE ? AS arch_{month}', (f'file:{self._readable_path(month)}?mode=ro',))
+
+        for table in self.policies:
+            main_columns = self._columns(conn, 'main', table)
+            if not main_columns:
+                continue
+            column_list = ', '.join(main_columns)
+            parts = [f'SELECT {column_list} FROM main.{table}']
+            for month in chosen:
+                arch_columns = self._columns(conn, f'arch_{month}', table)
+                if not arch_columns:
+                    continue
+                select = ', '.join(c if c in arch_columns else f'NULL AS {c}' for c in main_columns)
+                parts.append(f'SELECT {select} FROM arch_{month}.{table}')
+            conn.execute(f'CREATE TEMP VIEW all_{table} AS ' + ' UNION ALL '.join(parts))
+
+        return conn
+
+    # ===== ЕЖЕДНЕВНЫЙ ЗАПУСК =====
+
+    def start(self):
+        self.job = scheduler.daily('retention', self.run_time, self.run_once)
+        print(f"🗄️ [RETENTION] Архивация запланирована на {self.run_time} МСК")
+
+    async def stop(self):
+        if self.job:
+            self.job.cancel()
+            self.job = None
+
+
+retention_manager = RetentionManager(db)
@@ -0,0 +1,251 @@
+"""Общий планировщик фоновых задач
+
+Вместо собственного цикла «while True: sleep» модуль регистрирует задачу:
+    scheduler.every('afk_expiry', 60, check_expired)      — каждые N секунд
+    scheduler.once('temp_room_42', when, delete_room)      — один раз в момент when
+    scheduler.cron('events_weekly', send_report, hour=23, minute=59, weekdays=[6])
+    scheduler.midnight('birthday_greetings', send_greetings)  — в 00:00 МСК
+
+Сроки хранятся в min-куче, единственная фоновая задача спит ровно до
+ближайшего срока (или до регистрации более ранней задачи). Время для
+cron/midnight — по МСК. Повторная регистрация с тем же именем заменяет
+задачу, поэтому переинициализация модуля не плодит дубликаты. Каждая
+задача возвращает хэндл с cancel(); get_jobs() показывает следующий
+запуск, длительность прошлого и число ошибок.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from core.timeutils import MSK_TZ
+
+# Даже без задач планировщик сверяется с часами не реже, чем раз в MAX_SLEEP секунд
+MAX_SLEEP = 3600
+
+
+class Job:
+
+    def __init__(self, scheduler, name: str, func, kind: str, interval: float = None,
+                 hour: int = None, minute: int = None, weekdays=None):
+        self._scheduler = scheduler
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.interval = interval
+        self.hour = hour
+        self.minute = minute
+        self.weekdays = set(weekdays) if weekdays is not None else None
+
+        self.next_run = None
+        self.cancelled = False
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration_ms = None
+        self.last_error = None
+
+    def cancel(self):
+        self._scheduler.cancel(self.name, job=self)
+
+    def _next_cron(self, after: float) -> float:
+        """Ближайший момент hour:minute МСК (в разрешённый день недели) позже after"""
+        moment = datetime.fromtimestamp(after, MSK_TZ)
+        candidate = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if candidate.timestamp() <= after:
+            candidate += timedelta(days=1)
+        for _ in range(8):
+            if self.weekdays is None or candidate.weekday() in self.weekdays:
+                break
+            candidate += timedelta(days=1)
+        # Пересчёт через localize — корректное смещение для новой даты
+        naive = candidate.replace(tzinfo=None)
+        return MSK_TZ.localize(naive).timestamp()
+
+    def compute_next(self, now: float):
+        if self.kind == 'interval':
+            return now + self.interval
+        if self.kind == 'cron':
+            return self._next_cron(now)
+        return None
+
+    def info(self) -> dict:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'next_run': datetime.fromtimestamp(self.next_run, MSK_TZ).strftime('%d.%m %H:%M:%S') if self.next_run else None,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': datetime.fromtimestamp(self.last_run, MSK_TZ).strftime('%d.%m %H:%M:%S') if self.last_run else None,
+            'last_duration_ms': self.last_duration_ms,
+            'last_error': self.last_error,
+        }
+
+
+class Scheduler:
+
+    def __init__(self):
+        self._heap = []
+        self._jobs = {}
+        self._seq = itertools.count()
+        self._wake = None
+        self._task = None
+        self._running_tasks = set()
+
+    # ===== РЕГИСТРАЦИЯ =====
+
+    def _add(self, job: Job, first_run: float) -> Job:
+        old = self._jobs.get(job.name)
+        if old is not None:
+            old.cancelled = True
+        self._jobs[job.name] = job
+        self._push(job, first_run)
+        self._ensure_started()
+        return job
+
+    def _push(self, job: Job, when: float):
+        job.next_run = when
+        heapq.heappush(self._heap, (when, next(self._seq), job))
+        if self._wake is not None and self._heap[0][2] is job:
+            self._wake.set()
+
+    def every(self, name: str, seconds: float, func, first_delay: float = None) -> Job:
+        """Каждые seconds секунд; первый запуск через first_delay (по умолчанию через seconds)"""
+        job = Job(self, name, func, 'interval', interval=seconds)
+        delay = seconds if first_delay is None else first_delay
+        return self._add(job, time.time() + delay)
+
+    def once(self, name: str, when, func) -> Job:
+        """Один раз: when — aware datetime или задержка в секундах"""
+        job = Job(self, name, func, 'once')
+        moment = when.timestamp() if isinstance(when, datetime) else time.time() + when
+        return self._add(job, moment)
+
+    def cron(self, name: str, func, hour: int, minute: int = 0, weekdays=None) -> Job:
+        """Каждый день (или в weekdays, 0 = понедельник) в hour:minute по МСК"""
+        job = Job(self, name, func, 'cron', hour=hour, minute=minute, weekdays=weekdays)
+        return self._add(job, job._next_cron(time.time()))
+
+    def daily(self, name: str, at: str, func, weekdays=None) -> Job:
+        """cron по строке 'HH:MM' (МСК)"""
+        parsed = datetime.strptime(at, '%H:%M')
+        return self.cron(name, func, parsed.hour, parsed.minute, weekdays)
+
+    def midnight(self, name: str, func) -> Job:
+        """В начале каждых МСК-суток"""
+        return self.cron(name, func, 0, 0)
+
+    def cancel(self, name: str, job: Job = None):
+        """Отменить задачу по имени (или конкретный экземпляр job)"""
+        current = self._jobs.get(name)
+        if job is not None:
+            job.cancelled = True
+        if current is not None and (job is None or current is job):
+            current.cancelled = True
+            del self._jobs[name]
+
+    def get(self, name: str):
+        return self._jobs.get(name)
+
+    def get_jobs(self) -> list:
+        return sorted((job.info() for job in self._jobs.values()),
+                      key=lambda info: info['next_run'] or '')
+
+    # ===== ВЫПОЛНЕНИЕ =====
+
+    def _ensure_started(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Задачи, зарегистрированные до запуска цикла событий, подхватит start()
+            return
+        self.start()
+
+    def start(self):
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            print(f"⏱️ [SCHEDULER] Планировщик запущен, задач: {len(self._jobs)}")
+
+    async def _run(self):
+        while True:
+            # Отменённые и заменённые задачи просто выбрасываются с вершины кучи
+            while self._heap and (self._heap[0][2].cancelled or self._heap[0][2].next_run != self._heap[0][0]):
+                heapq.heappop(self._heap)
+
+            delay = MAX_SLEEP
+            if self._heap:
+                delay = min(self._heap[0][0] - time.time(), MAX_SLEEP)
+
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            when, _, job = heapq.heappop(self._heap)
+            self._launch(job)
+
+    def _launch(self, job: Job):
+        if job.running:
+            # Прошлый запуск ещё идёт — не накладываем запуски друг на друга
+            next_run = job.compute_next(time.time())
+            if next_run is not None:
+                self._push(job, next_run)
+            return
+        task = asyncio.create_task(self._execute(job))
+        self._running_tasks.add(task)
+        task.add_done_callback(self._running_tasks.discard)
+
+    async def _execute(self, job: Job):
+        job.running = True
+        started = time.perf_counter()
+        job.last_run = time.time()
+        try:
+            await job.func()
+            job.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)[:200]
+            print(f"❌ [SCHEDULER] Ошибка задачи {job.name}: {e}")
+            traceback.print_exc()
+        finally:
+            job.running = False
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if job.cancelled:
+            return
+        next_run = job.compute_next(time.time())
+        if next_run is None:
+            # Под тем же именем могли уже зарегистрировать замену — её не трогаем
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+            job.next_run = None
+        else:
+            self._push(job, next_run)
+
+    async def stop(self):
+        """Остановить планировщик и прервать выполняющиеся задачи"""
+        tasks = [t for t in [self._task, *self._running_tasks] if t is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        self._running_tasks.clear()
+
+
+scheduler = Scheduler()
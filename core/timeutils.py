@@ -0,0 +1,47 @@
+"""Границы суток по МСК для запросов к БД
+
+CURRENT_TIMESTAMP в SQLite пишет время в UTC ('YYYY-MM-DD HH:MM:SS'),
+а «день» для статистики и лимитов — это календарные сутки по Москве.
+Функции здесь переводят МСК-день в полуоткрытый UTC-диапазон [start, end),
+чтобы фильтры вида timestamp >= ? AND timestamp < ? использовали индексы.
+"""
+from datetime import date, datetime, time, timedelta
+import pytz
+
+MSK_TZ = pytz.timezone('Europe/Moscow')
+DB_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def msk_now() -> datetime:
+    return datetime.now(MSK_TZ)
+
+
+def msk_today() -> date:
+    return msk_now().date()
+
+
+def _as_date(day) -> date:
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return date.fromisoformat(str(day)[:10])
+
+
+def to_db_timestamp(moment: datetime) -> str:
+    """Aware datetime → строка UTC в формате CURRENT_TIMESTAMP"""
+    return moment.astimezone(pytz.utc).strftime(DB_TIMESTAMP_FORMAT)
+
+
+def msk_day_bounds_utc(day) -> tuple:
+    """МСК-день (date или 'YYYY-MM-DD') → (start, end) в UTC для timestamp-колонок"""
+    day = _as_date(day)
+    start = MSK_TZ.localize(datetime.combine(day, time.min))
+    end = MSK_TZ.localize(datetime.combine(day + timedelta(days=1), time.min))
+    return to_db_timestamp(start), to_db_timestamp(end)
+
+
+def msk_day_of(db_timestamp: str) -> str:
+    """UTC-строка из БД ('YYYY-MM-DD HH:MM:SS') → МСК-дата 'YYYY-MM-DD'"""
+    moment = pytz.utc.localize(datetime.strptime(db_timestamp[:19], DB_TIMESTAMP_FORMAT))
+    return moment.astimezone(MSK_TZ).date().isoformat()
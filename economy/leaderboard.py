@@ -0,0 +1,129 @@
+"""Рейтинг по балансу в памяти
+
+Пользователи хранятся в отсортированных корзинах по ключу (-баланс, user_id):
+поиск корзины и позиции внутри — бинарный, корзины держатся около
+LOAD элементов и делятся пополам при переполнении. Изменение баланса —
+удаление старого ключа и вставка нового; топ, место пользователя и
+соседи по рейтингу считаются без запросов к БД.
+"""
+from bisect import bisect_left, insort
+
+LOAD = 512
+
+
+class Leaderboard:
+
+    def __init__(self, load: int = LOAD):
+        self.load = load
+        self._buckets = [[]]
+        # Последний ключ каждой корзины — для бинарного поиска по корзинам
+        self._maxes = []
+        self._balances = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._balances)
+
+    def seed(self, rows):
+        """Заполнить рейтинг парами (user_id, balance)"""
+        self._balances = {str(user_id): balance for user_id, balance in rows}
+        keys = sorted((-balance, user_id) for user_id, balance in self._balances.items())
+        self._buckets = [keys[i:i + self.load] for i in range(0, len(keys), self.load)] or [[]]
+        self._maxes = [bucket[-1] for bucket in self._buckets if bucket]
+        self.loaded = True
+
+    # ===== КОРЗИНЫ =====
+
+    def _locate(self, key) -> int:
+        index = bisect_left(self._maxes, key)
+        return min(index, len(self._buckets) - 1)
+
+    def _insert(self, key):
+        index = self._locate(key)
+        bucket = self._buckets[index]
+        insort(bucket, key)
+        if index < len(self._maxes):
+            self._maxes[index] = bucket[-1]
+        else:
+            self._maxes.append(bucket[-1])
+        if len(bucket) > self.load * 2:
+            half = len(bucket) // 2
+            self._buckets[index:index + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[index:index + 1] = [bucket[half - 1], bucket[-1]]
+
+    def _remove(self, key):
+        index = self._locate(key)
+        bucket = self._buckets[index]
+        position = bisect_left(bucket, key)
+        if position >= len(bucket) or bucket[position] != key:
+            return
+        del bucket[position]
+        if bucket:
+            self._maxes[index] = bucket[-1]
+        elif len(self._buckets) > 1:
+            del self._buckets[index]
+            del self._maxes[index]
+        else:
+            self._maxes.clear()
+
+    # ===== ИЗМЕНЕНИЯ =====
+
+    def update(self, user_id, balance: int):
+        user_id = str(user_id)
+        old = self._balances.get(user_id)
+        if old == balance:
+            return
+        if old is not None:
+            self._remove((-old, user_id))
+        self._balances[user_id] = balance
+        self._insert((-balance, user_id))
+
+    def update_many(self, balances: dict):
+        for user_id, balance in balances.items():
+            self.update(user_id, balance)
+
+    # ===== ЗАПРОСЫ =====
+
+    def top(self, limit: int = 10) -> list:
+        """[(user_id, balance)] по убыванию баланса"""
+        result = []
+        for bucket in self._buckets:
+            for negative, user_id in bucket:
+                if len(result) >= limit:
+                    return result
+                result.append((user_id, -negative))
+        return result
+
+    def _index(self, user_id: str):
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return None
+        key = (-balance, user_id)
+        index = self._locate(key)
+        before = sum(len(bucket) for bucket in self._buckets[:index])
+        return before + bisect_left(self._buckets[index], key)
+
+    def rank(self, user_id) -> int:
+        """Место пользователя (с 1) или None"""
+        index = self._index(str(user_id))
+        return None if index is None else index + 1
+
+    def _at(self, index: int):
+        for bucket in self._buckets:
+            if index < len(bucket):
+                negative, user_id = bucket[index]
+                return user_id, -negative
+            index -= len(bucket)
+        return None
+
+    def around(self, user_id, radius: int = 2) -> list:
+        """Соседи по рейтингу: [(место, user_id, balance)]"""
+        index = self._index(str(user_id))
+        if index is None:
+            return []
+        result = []
+        for i in range(max(0, index - radius), min(len(self._balances), index + radius + 1)):
+            entry = self._at(i)
+            if entry:
+                result.append((i + 1, entry[0], entry[1]))
+        return result
@@ -1,20 +1,92 @@
 """Менеджер экономической системы"""
+import os
 import discord
+from collections import OrderedDict
 from datetime import datetime
 from core.database import db
+from core.async_database import adb
 from core.config import CONFIG
+from economy.leaderboard import Leaderboard
+from economy.voice import VoiceAccrual
+
+# Источники операций — по ним строится дневная свёртка economy_daily
+ECONOMY_SOURCES = {
+    'voice': '🎙️ Голосовой онлайн',
+    'capt': '🎯 CAPT',
+    'mcl': '🎯 MCL/ВЗМ',
+    'event': '📅 Мероприятия',
+    'application': '📝 Заявки',
+    'tier': '🌟 Повышение Tier',
+    'daily': '🎁 Ежедневный бонус',
+    'shop': '🛒 Магазин',
+    'admin': '👮 Админы',
+    'other': '📦 Прочее',
+}
+
+
+class BalanceCache:
+    """Балансы последних активных пользователей (LRU на maxsize записей)
+
+    Срока жизни у записей нет: все изменения баланса проходят через
+    EconomyManager и сразу пишутся сюда (write-through), а если запись в БД
+    не прошла, ключ сбрасывается и перечитывается при следующем запросе.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str):
+        balance = self._data.get(user_id)
+        if balance is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        return balance
+
+    def update(self, balances: dict):
+        for user_id, balance in balances.items():
+            self._data[user_id] = balance
+            self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str):
+        self._data.pop(user_id, None)
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            'evictions': self.evictions,
+        }
 
 
 class EconomyManager:
     def __init__(self):
         self.bot = None
         self._load_settings()
-        self._balance_cache = {}
-        self._voice_tracker = {}
+        # Все изменения баланса проходят через менеджер и сразу пишутся в кэш
+        self._balance_cache = BalanceCache(int(os.getenv('ECO_BALANCE_CACHE_SIZE', '5000')))
+        self.leaderboard = Leaderboard()
+        self.voice = VoiceAccrual(self)
     
     def set_bot(self, bot):
         self.bot = bot
     
+    async def stop(self):
+        """Остановка модуля: дописать накопленные баллы за войс"""
+        await self.voice.stop()
+    
     def _load_settings(self):
         """Загрузка настроек из БД"""
         self.settings = {
@@ -38,30 +110,41 @@ class EconomyManager:
     
     async def get_balance(self, user_id: int) -> int:
         user_id_str = str(user_id)
-        if user_id_str in self._balance_cache:
-            return self._balance_cache[user_id_str]
+        balance = self._balance_cache.get(user_id_str)
+        if balance is not None:
+            return balance
         
-        balance = db.get_user_balance(user_id_str)
+        balance = await adb.get_user_balance(user_id_str)
         if balance is None:
             balance = 0
-            db.init_user_balance(user_id_str)
+            await adb.init_user_balance(user_id_str)
         
-        self._balance_cache[user_id_str] = balance
+        self._balance_cache.update({user_id_str: balance})
         return balance
     
-    async def add_points(self, user_id: int, amount: int, reason: str, awarded_by: str = None) -> bool:
+    def _remember_balances(self, balances: dict):
+        """Новые балансы после записи в БД — в кэш и рейтинг"""
+        self._balance_cache.update(balances)
+        if self.leaderboard.loaded:
+            self.leaderboard.update_many(balances)
+    
+    def get_cache_stats(self) -> dict:
+        return self._balance_cache.get_stats()
+    
+    async def add_points(self, user_id: int, amount: int, reason: str, awarded_by: str = None, source: str = None) -> bool:
         if amount <= 0:
             return False
         
         user_id_str = str(user_id)
-        new_balance = db.add_user_balance(user_id_str, amount, reason, awarded_by)
+        source = source or ('admin' if awarded_by else 'other')
+        new_balance = await adb.add_user_balance(user_id_str, amount, reason, awarded_by, source)
         
         if new_balance is not None:
-            self._balance_cache[user_id_str] = new_balance
+            self._remember_balances({user_id_str: new_balance})
             return True
         return False
     
-    async def remove_points(self, user_id: int, amount: int, reason: str, removed_by: str = None) -> bool:
+    async def remove_points(self, user_id: int, amount: int, reason: str, removed_by: str = None, source: str = None) -> bool:
         if amount <= 0:
             return False
         
@@ -70,71 +153,80 @@ class EconomyManager:
             return False
         
         user_id_str = str(user_id)
-        new_balance = db.remove_user_balance(user_id_str, amount, reason, removed_by)
+        source = source or ('admin' if removed_by else 'other')
+        new_balance = await adb.remove_user_balance(user_id_str, amount, reason, removed_by, source)
         
         if new_balance is not None:
-            self._balance_cache[user_id_str] = new_balance
+            self._remember_balances({user_id_str: new_balance})
             return True
+        # Баланс в БД меньше закэшированного — перечитаем при следующем запросе
+        self._balance_cache.invalidate(user_id_str)
         return False
     
+    async def _apply_awards(self, awards: list, awarded_by: str = None, source: str = 'other') -> int:
+        """[(user_id, amount, reason)] → одна транзакция в БД и одно обновление кэша"""
+        awards = [a for a in awards if a[1] > 0]
+        if not awards:
+            return 0
+        balances = await adb.award_many(awards, awarded_by, source)
+        self._remember_balances(balances)
+        return len(awards)
+    
     # ==================== ЕЖЕДНЕВНЫЙ БОНУС ====================
     
     async def claim_daily_bonus(self, user_id: int) -> tuple:
         user_id_str = str(user_id)
-        last_claim = db.get_last_daily_claim(user_id_str)
-        
-        now = datetime.now()
-        today = now.date()
-        
-        if last_claim:
-            last_date = datetime.fromisoformat(last_claim).date()
-            if last_date == today:
-                return False, "❌ Вы уже получили бонус сегодня", 0
-            
-            if (today - last_date).days == 1:
-                streak = db.get_daily_streak(user_id_str) + 1
-                if streak > self.settings['daily_bonus_limit']:
-                    streak = self.settings['daily_bonus_limit']
-                bonus = self.settings['daily_bonus_base'] + (streak // 2) * self.settings['daily_bonus_increment']
-            else:
-                streak = 1
-                bonus = self.settings['daily_bonus_base']
-        else:
-            streak = 1
-            bonus = self.settings['daily_bonus_base']
-        
-        await self.add_points(user_id, bonus, f"Ежедневный бонус (день {streak})")
-        db.update_daily_claim(user_id_str, streak)
+        claimed, streak, bonus, balance = await adb.claim_daily_bonus(
+            user_id_str,
+            self.settings['daily_bonus_base'],
+            self.settings['daily_bonus_increment'],
+            self.settings['daily_bonus_limit']
+        )
+        self._remember_balances({user_id_str: balance})
         
+        if not claimed:
+            return False, "❌ Вы уже получили бонус сегодня", 0
         return True, f"✅ +{bonus} баллов! День {streak}", bonus
     
     # ==================== НАЧИСЛЕНИЯ ЗА ДЕЙСТВИЯ ====================
     
     async def award_capt(self, user_id: int, is_main: bool):
-        points = self.settings['capt_main_points'] if is_main else self.settings['capt_reserve_points']
-        if points > 0:
-            await self.add_points(user_id, points, f"Участие в CAPT ({'основной' if is_main else 'резерв'})")
+        await self.award_capt_session([user_id] if is_main else [], [] if is_main else [user_id])
+    
+    async def award_capt_session(self, main_ids: list, reserve_ids: list) -> int:
+        """Начисление всем участникам CAPT одной транзакцией"""
+        return await self._apply_awards(
+            [(str(uid), self.settings['capt_main_points'], "Участие в CAPT (основной)") for uid in main_ids] +
+            [(str(uid), self.settings['capt_reserve_points'], "Участие в CAPT (резерв)") for uid in reserve_ids],
+            source='capt'
+        )
     
     async def award_mcl(self, user_id: int, is_main: bool):
-        points = self.settings['mcl_main_points'] if is_main else self.settings['mcl_reserve_points']
-        if points > 0:
-            await self.add_points(user_id, points, f"Участие в MCL/ВЗМ ({'основной' if is_main else 'резерв'})")
+        await self.award_mcl_session([user_id] if is_main else [], [] if is_main else [user_id])
+    
+    async def award_mcl_session(self, main_ids: list, reserve_ids: list) -> int:
+        """Начисление всем участникам MCL/ВЗМ одной транзакцией"""
+        return await self._apply_awards(
+            [(str(uid), self.settings['mcl_main_points'], "Участие в MCL/ВЗМ (основной)") for uid in main_ids] +
+            [(str(uid), self.settings['mcl_reserve_points'], "Участие в MCL/ВЗМ (резерв)") for uid in reserve_ids],
+            source='mcl'
+        )
     
     async def award_event(self, user_id: int):
         points = self.settings['event_points']
         if points > 0:
-            await self.add_points(user_id, points, "Взятие мероприятия")
+            await self.add_points(user_id, points, "Взятие мероприятия", source='event')
     
     async def award_application(self, user_id: int):
         points = self.settings['application_points']
         if points > 0:
-            await self.add_points(user_id, points, "Принятие заявки")
+            await self.add_points(user_id, points, "Принятие заявки", source='application')
     
     async def award_tier(self, user_id: int, tier: str):
         points = self.settings.get(f'{tier}_points', 0)
         if points > 0:
             tier_names = {'tier3': 'Tier 3 🟤', 'tier2': 'Tier 2 ⚪', 'tier1': 'Tier 1 🔴'}
-            await self.add_points(user_id, points, f"Повышение до {tier_names.get(tier, tier)}")
+            await self.add_points(user_id, points, f"Повышение до {tier_names.get(tier, tier)}", source='tier')
     
     # ==================== МАГАЗИН ====================
     
@@ -158,19 +250,19 @@ class EconomyManager:
         return False, f"❌ Товар ID {item_id} не найден"
     
     async def buy_item(self, user_id: int, item_id: int) -> tuple:
-        item = self.get_shop_item(item_id)
-        if not item or not item.get('is_active'):
-            return False, "❌ Товар не найден"
+        # Остаток, баланс, списание и запись покупки — одна транзакция в БД
+        status, item, new_balance = await adb.purchase(str(user_id), item_id)
         
-        if item['limited_quantity'] > 0 and item['sold_count'] >= item['limited_quantity']:
+        if status == 'not_found':
+            return False, "❌ Товар не найден"
+        if status == 'sold_out':
             return False, "❌ Товар закончился"
-        
-        balance = await self.get_balance(user_id)
-        if balance < item['price']:
+        if status == 'no_funds':
+            self._balance_cache.invalidate(str(user_id))
             return False, f"❌ Недостаточно баллов! Нужно: {item['price']}"
         
-        if db.purchase_item(str(user_id), item_id, item['price']):
-            await self.remove_points(user_id, item['price'], f"Покупка: {item['name']}")
+        if status == 'ok':
+            self._remember_balances({str(user_id): new_balance})
             
             # ========== ЛОГ ПОКУПКИ В ОТДЕЛЬНЫЙ КАНАЛ ==========
             logs_channel_id = CONFIG.get("economy_logs_channel")
@@ -185,59 +277,46 @@ class EconomyManager:
                     embed.add_field(name="👤 Покупатель", value=f"<@{user_id}>", inline=True)
                     embed.add_field(name="🛍️ Товар", value=f"{item['emoji']} **{item['name']}**", inline=True)
                     embed.add_field(name="💰 Цена", value=f"{item['price']} баллов", inline=True)
-                    embed.add_field(name="📦 Осталось", value=f"{item['limited_quantity'] - (item['sold_count'] + 1)}" if item['limited_quantity'] > 0 else "∞", inline=True)
+                    embed.add_field(name="📦 Осталось", value=f"{item['limited_quantity'] - item['sold_count']}" if item['limited_quantity'] > 0 else "∞", inline=True)
                     embed.set_footer(text=f"ID товара: {item_id}")
                     await channel.send(embed=embed)
             
             return True, f"✅ Вы купили {item['emoji']} **{item['name']}** за {item['price']} баллов!"
         return False, "❌ Ошибка при покупке"
     
+    def get_report(self, days: int = 7) -> dict:
+        return db.get_economy_report(days)
+    
     def get_user_purchases(self, user_id: int, limit: int = 10):
         return db.get_user_purchases(str(user_id), limit)
     
+    # ==================== РЕЙТИНГ ====================
+    
+    async def load_leaderboard(self):
+        self.leaderboard.seed(await adb.get_all_balances())
+        print(f"🏆 [ECONOMY] Рейтинг загружен: {len(self.leaderboard)} пользователей")
+    
+    def _ensure_leaderboard(self):
+        if not self.leaderboard.loaded:
+            self.leaderboard.seed(db.get_all_balances())
+    
     def get_top_users(self, limit: int = 10):
-        return db.get_top_balance_users(limit)
+        self._ensure_leaderboard()
+        return self.leaderboard.top(limit)
+    
+    def get_rank(self, user_id: int):
+        self._ensure_leaderboard()
+        return self.leaderboard.rank(user_id)
+    
+    def get_neighbours(self, user_id: int, radius: int = 2):
+        self._ensure_leaderboard()
+        return self.leaderboard.around(user_id, radius)
 
     # ==================== ГОЛОСОВОЙ ОНЛАЙН ====================
 
     async def process_voice_update(self, member: discord.Member, before, after):
-        """Обработка изменения голосового статуса"""
-        user_id_str = str(member.id)
-        
-        # Пользователь зашёл в голосовой канал
-        if after.channel and (not before.channel or before.channel != after.channel):
-            self._voice_tracker[user_id_str] = {
-                'joined_at': datetime.now(),
-                'channel_id': str(after.channel.id)
-            }
-            print(f"🎙️ [VOICE] {member.name} зашёл в войс, начат отсчёт")
-        
-        # Пользователь вышел из голосового канала
-        elif before.channel and not after.channel:
-            if user_id_str in self._voice_tracker:
-                joined = self._voice_tracker[user_id_str]['joined_at']
-                now = datetime.now()
-                minutes = int((now - joined).total_seconds() / 60)
-                
-                if minutes > 0:
-                    # Проверка лимита за день
-                    today_earned = db.get_daily_voice_earned(user_id_str)
-                    max_per_day = self.settings['voice_max_per_day']
-                    
-                    points_to_add = minutes * self.settings['voice_points_per_minute']
-                    if today_earned + points_to_add > max_per_day:
-                        points_to_add = max(0, max_per_day - today_earned)
-                        print(f"⚠️ [VOICE] {member.name} достиг лимита {max_per_day} баллов в день")
-                    
-                    if points_to_add > 0:
-                        await self.add_points(member.id, points_to_add, f"{minutes} мин в голосовом канале")
-                        db.update_daily_voice_earned(user_id_str, points_to_add)
-                        print(f"💰 [VOICE] {member.name} +{points_to_add} баллов за {minutes} мин")
-                    else:
-                        print(f"⚠️ [VOICE] {member.name} лимит исчерпан, баллы не начислены")
-                
-                del self._voice_tracker[user_id_str]
-                print(f"🎙️ [VOICE] {member.name} вышел из войса, начислено {points_to_add if minutes > 0 else 0} баллов")
+        """Обработка изменения голосового статуса — баллы начисляются тиками VoiceAccrual"""
+        self.voice.on_voice_update(member, before, after)
 
 
-economy_manager = EconomyManager()
\ No newline at end of file
+economy_manager = EconomyManager()
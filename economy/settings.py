@@ -2,6 +2,7 @@
 import discord
 from core.admin_views import AdminOnlyView
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG
 from core.utils import is_admin
 from economy.manager import economy_manager
@@ -177,7 +178,7 @@ class SetEconomyChannelModal(discord.ui.Modal, title="📡 НАСТРОЙКА К
                 from economy.views import EconomyPanelView
                 view = EconomyPanelView()
                 embed = await view.get_shop_embed()
-                await channel.send(embed=embed, view=view)
+                await panel_registry.publish(interaction.client, 'economy', 'shop', channel, embed=embed, view=view)
             
             elif self.setting_key == "economy_admin_channel":
                 from economy.views import AdminEconomyView
@@ -186,7 +187,8 @@ class SetEconomyChannelModal(discord.ui.Modal, title="📡 НАСТРОЙКА К
                     description="Управление баллами и магазином",
                     color=0x7289da
                 )
-                await channel.send(embed=embed, view=AdminEconomyView())
+                await panel_registry.publish(interaction.client, 'economy', 'admin', channel,
+                                             embed=embed, view=AdminEconomyView())
             
             elif self.setting_key == "economy_logs_channel":
                 embed = discord.Embed(
@@ -2,8 +2,9 @@
 import discord
 from datetime import datetime
 from economy.base import PermanentView, ConfirmView
-from economy.manager import economy_manager
+from economy.manager import economy_manager, ECONOMY_SOURCES
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG
 from core.utils import is_admin
 
@@ -96,10 +97,20 @@ class EconomyPanelView(PermanentView):
         
         if top:
             desc = ""
-            for i, (user_id, balance, _) in enumerate(top, 1):
+            for i, (user_id, balance) in enumerate(top, 1):
                 medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
                 desc += f"{medal} <@{user_id}> — **{balance}**\n"
             embed.description = desc
+            
+            # Место нажавшего и его соседи, если он не в топе
+            rank = economy_manager.get_rank(interaction.user.id)
+            if rank and rank > len(top):
+                around = economy_manager.get_neighbours(interaction.user.id, 2)
+                lines = []
+                for place, user_id, balance in around:
+                    marker = "➡️ " if user_id == str(interaction.user.id) else ""
+                    lines.append(f"{marker}{place}. <@{user_id}> — **{balance}**")
+                embed.add_field(name=f"📍 Ваше место: {rank}", value="\n".join(lines), inline=False)
         else:
             embed.description = "Нет данных"
         
@@ -171,6 +182,14 @@ class AdminEconomyView(PermanentView):
         embed.add_field(name="🌟 Повышение Tier", value=f"T3: `{settings['tier3_points']}` | T2: `{settings['tier2_points']}` | T1: `{settings['tier1_points']}`", inline=False)
         embed.add_field(name="📅 Ежедневный бонус", value=f"База: `{settings['daily_bonus_base']}` | +`{settings['daily_bonus_increment']}`/2дня | Лимит: `{settings['daily_bonus_limit']}`", inline=False)
         
+        cache = economy_manager.get_cache_stats()
+        embed.add_field(
+            name="🧠 Кэш балансов",
+            value=f"Записей: `{cache['size']}/{cache['maxsize']}` | Попаданий: `{cache['hit_rate']}%` "
+                  f"(`{cache['hits']}`/`{cache['misses']}`) | Вытеснено: `{cache['evictions']}`",
+            inline=False
+        )
+        
         await interaction.response.send_message(embed=embed, ephemeral=True)
     
     @discord.ui.button(label="📊 Баланс пользователя", style=discord.ButtonStyle.secondary, row=2, custom_id="eco_admin_balance")
@@ -199,6 +218,33 @@ class AdminEconomyView(PermanentView):
             embed.description = "Нет операций"
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @discord.ui.button(label="📈 Отчёт по источникам", style=discord.ButtonStyle.secondary, row=3, custom_id="eco_admin_report")
+    async def show_report(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Начисления и списания по источникам за сегодня и 7 дней (из дневной свёртки)"""
+        if not await is_admin(str(interaction.user.id)):
+            await interaction.response.send_message("❌ Только администраторы!", ephemeral=True)
+            return
+        
+        report = economy_manager.get_report(7)
+        embed = discord.Embed(title="📈 ОТЧЁТ ЭКОНОМИКИ", color=0x7289da)
+        
+        for title, key in (("📅 Сегодня", 'today'), (f"🗓️ За {report['days']} дней", 'period')):
+            totals = report[key]
+            if not totals:
+                embed.add_field(name=title, value="Нет операций", inline=False)
+                continue
+            lines = []
+            for source, label in ECONOMY_SOURCES.items():
+                row = totals.get(source)
+                if row:
+                    lines.append(f"{label}: ➕ `{row['earn']}` | ➖ `{row['spend']}` | операций: `{row['tx_count']}`")
+            earn = sum(row['earn'] for row in totals.values())
+            spend = sum(row['spend'] for row in totals.values())
+            lines.append(f"**Итого:** ➕ `{earn}` | ➖ `{spend}`")
+            embed.add_field(name=title, value="\n".join(lines)[:1024], inline=False)
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
 class ShopManageView(PermanentView):
@@ -303,12 +349,10 @@ class AddItemModal(discord.ui.Modal, title="➕ ДОБАВИТЬ ТОВАР"):
         if channel_id and channel_id != "null":
             channel = interaction.client.get_channel(int(channel_id))
             if channel:
-                async for msg in channel.history(limit=10):
-                    if msg.author == interaction.client.user and msg.embeds:
-                        view = EconomyPanelView()
-                        embed = await view.get_shop_embed()
-                        await msg.edit(embed=embed)
-                        break
+                view = EconomyPanelView()
+                embed = await view.get_shop_embed()
+                await panel_registry.publish(interaction.client, 'economy', 'shop', channel, embed=embed, view=view,
+                                             match=lambda msg: bool(msg.embeds), scan_limit=10)
 
 
 class RemoveItemModal(discord.ui.Modal, title="🗑️ УДАЛИТЬ ТОВАР"):
@@ -332,12 +376,10 @@ class RemoveItemModal(discord.ui.Modal, title="🗑️ УДАЛИТЬ ТОВАР
         if channel_id and channel_id != "null":
             channel = interaction.client.get_channel(int(channel_id))
             if channel:
-                async for msg in channel.history(limit=10):
-                    if msg.author == interaction.client.user and msg.embeds:
-                        view = EconomyPanelView()
-                        embed = await view.get_shop_embed()
-                        await msg.edit(embed=embed)
-                        break
+                view = EconomyPanelView()
+                embed = await view.get_shop_embed()
+                await panel_registry.publish(interaction.client, 'economy', 'shop', channel, embed=embed, view=view,
+                                             match=lambda msg: bool(msg.embeds), scan_limit=10)
 
 
 class AdminGiveModal(discord.ui.Modal, title="➕ ВЫДАТЬ БАЛЛЫ"):
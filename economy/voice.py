@@ -0,0 +1,174 @@
+"""Начисление баллов за голосовой онлайн по тикам
+
+Каждые ECO_VOICE_TICK_SECONDS секунд всем, кто сидит в войсе, начисляются
+полные минуты, накопленные с прошлого тика; остаток секунд переносится
+на следующий тик. Все начисления тика, контрольные точки сессий и
+завершённые сессии пишутся одной транзакцией. Переход между каналами
+не сбрасывает отсчёт. После перезапуска сессии восстанавливаются по
+участникам guild.voice_channels, недоначисленный остаток берётся из БД;
+время, пока бот был выключен, не начисляется.
+"""
+import asyncio
+import os
+import time
+
+from core.async_database import adb
+from core.scheduler import scheduler
+from core.timeutils import msk_now, to_db_timestamp
+
+
+class VoiceAccrual:
+
+    def __init__(self, manager, tick_seconds: int = None):
+        self.manager = manager
+        self.tick_seconds = tick_seconds or int(os.getenv('ECO_VOICE_TICK_SECONDS', '300'))
+
+        # user_id → {'guild_id', 'channel_id', 'joined_at', 'checkpoint', 'carry'}
+        self.sessions = {}
+        # Вышедшие с прошлого тика: user_id → недоначисленные секунды
+        self._ended = {}
+        self._lock = asyncio.Lock()
+        self.job = None
+
+        self.ticks = 0
+        self.last_tick_ms = 0.0
+        self.last_credited = 0
+
+    @staticmethod
+    def _counts(member) -> bool:
+        return not member.bot
+
+    def _open(self, member, channel, carry: float = 0.0, joined_at: str = None):
+        self.sessions[str(member.id)] = {
+            'guild_id': str(member.guild.id),
+            'channel_id': str(channel.id),
+            'joined_at': joined_at or to_db_timestamp(msk_now()),
+            'checkpoint': time.monotonic(),
+            'carry': carry,
+        }
+
+    # ===== СОБЫТИЯ ВОЙСА =====
+
+    def on_voice_update(self, member, before, after):
+        if not self._counts(member):
+            return
+        user_id = str(member.id)
+        session = self.sessions.get(user_id)
+
+        if after.channel:
+            if session is None:
+                # Вернулся до тика — недоначисленные секунды переходят в новую сессию
+                self._open(member, after.channel, carry=self._ended.pop(user_id, 0.0))
+                print(f"🎙️ [VOICE] {member.name} зашёл в войс, начат отсчёт")
+            elif session['channel_id'] != str(after.channel.id):
+                # Переход между каналами — отсчёт продолжается
+                session['channel_id'] = str(after.channel.id)
+        elif before.channel and session is not None:
+            del self.sessions[user_id]
+            seconds = session['carry'] + time.monotonic() - session['checkpoint']
+            self._ended[user_id] = self._ended.get(user_id, 0.0) + seconds
+            print(f"🎙️ [VOICE] {member.name} вышел из войса, {int(seconds // 60)} мин будут начислены в ближайший тик")
+
+    async def restore(self, bot):
+        """Восстановить сессии по текущему составу голосовых каналов"""
+        saved = await adb.get_voice_sessions()
+        self.sessions.clear()
+
+        for guild in bot.guilds:
+            for channel in guild.voice_channels:
+                for member in channel.members:
+                    if not self._counts(member):
+                        continue
+                    previous = saved.pop(str(member.id), None)
+                    if previous:
+                        self._open(member, channel, float(previous['carry_seconds'] or 0), previous['joined_at'])
+                    else:
+                        self._open(member, channel)
+
+        # Сессии тех, кто вышел, пока бот был выключен, закрываем без начисления
+        await adb.voice_accrual_tick([], 0, sessions=self._checkpoints(), ended=list(saved))
+        print(f"🎙️ [VOICE] Восстановлено голосовых сессий: {len(self.sessions)}, закрыто: {len(saved)}")
+
+    # ===== ТИК =====
+
+    def _checkpoints(self) -> list:
+        return [
+            (user_id, s['guild_id'], s['channel_id'], s['joined_at'], int(s['carry']))
+            for user_id, s in self.sessions.items()
+        ]
+
+    async def tick(self) -> int:
+        """Начислить накопленные минуты всем, вернуть сумму начисленных баллов"""
+        async with self._lock:
+            started = time.perf_counter()
+            now = time.monotonic()
+            per_minute = self.manager.settings['voice_points_per_minute']
+
+            credits = []
+            # Секунды, списанные с сессий в этом тике, — вернуть, если запись не удалась
+            consumed = {}
+            for user_id, session in self.sessions.items():
+                seconds = session['carry'] + now - session['checkpoint']
+                minutes = int(seconds // 60)
+                session['checkpoint'] = now
+                session['carry'] = seconds - minutes * 60
+                if minutes > 0:
+                    consumed[user_id] = minutes * 60
+                    credits.append((user_id, minutes * per_minute, f"{minutes} мин в голосовом канале"))
+
+            ended, self._ended = self._ended, {}
+            for user_id, seconds in ended.items():
+                minutes = int(seconds // 60)
+                if minutes > 0:
+                    credits.append((user_id, minutes * per_minute, f"{minutes} мин в голосовом канале"))
+
+            try:
+                # Запись не прерывается остановкой бота посреди тика
+                granted = await asyncio.shield(adb.voice_accrual_tick(
+                    credits, self.manager.settings['voice_max_per_day'],
+                    sessions=self._checkpoints(), ended=list(ended)
+                ))
+            except Exception as e:
+                # Не теряем секунды: попробуем в следующий тик
+                for user_id, seconds in ended.items():
+                    self._ended[user_id] = self._ended.get(user_id, 0.0) + seconds
+                for user_id, seconds in consumed.items():
+                    session = self.sessions.get(user_id)
+                    if session is not None:
+                        session['carry'] += seconds
+                    else:
+                        # Вышел, пока шла запись
+                        self._ended[user_id] = self._ended.get(user_id, 0.0) + seconds
+                print(f"❌ [VOICE] Ошибка тика начисления: {e}")
+                return 0
+
+            self.manager._remember_balances({user_id: balance for user_id, (_, balance) in granted.items()})
+
+            self.ticks += 1
+            self.last_credited = sum(amount for amount, _ in granted.values())
+            self.last_tick_ms = (time.perf_counter() - started) * 1000
+            if granted:
+                print(f"💰 [VOICE] Тик: {len(granted)} участникам начислено {self.last_credited} баллов "
+                      f"за {self.last_tick_ms:.1f} мс")
+            return self.last_credited
+
+    # ===== ФОНОВАЯ ЗАДАЧА =====
+
+    def start(self):
+        self.job = scheduler.every('economy_voice_tick', self.tick_seconds, self.tick)
+        print(f"🎙️ [VOICE] Начисление за войс каждые {self.tick_seconds} сек")
+
+    async def stop(self):
+        """Остановить тики и сохранить накопленное"""
+        if self.job:
+            self.job.cancel()
+            self.job = None
+            await self.tick()
+
+    def get_stats(self) -> dict:
+        return {
+            'in_voice': len(self.sessions),
+            'ticks': self.ticks,
+            'last_tick_ms': round(self.last_tick_ms, 2),
+            'last_credited': self.last_credited,
+        }
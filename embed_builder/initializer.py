@@ -2,6 +2,7 @@
 import logging
 import discord
 from core.database import db
+from core.panels import panel_registry
 from embed_builder.settings_view import EmbedBuilderSettingsView
 from embed_builder.manager import embed_builder_manager
 
@@ -38,17 +39,14 @@ class EmbedBuilderInitializer:
             logger.error(f"❌ Неверный ID канала настроек: {self.settings_channel_id}")
             return
         
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user:
-                await msg.delete()
-        
         embed = discord.Embed(
             title="📦 **СОЗДАНИЕ EMBED**",
             description="Настройка системы создания embed сообщений",
             color=0x00ff00
         )
-        await channel.send(embed=embed, view=EmbedBuilderSettingsView())
-        print(f"📦 [EMBED_BUILDER] Создана панель настроек в #{channel.name}")
+        await panel_registry.publish(self.bot, 'embed_builder', 'settings', channel,
+                                     embed=embed, view=EmbedBuilderSettingsView(), replace=True)
+        print(f"📦 [EMBED_BUILDER] Панель настроек в #{channel.name} актуальна")
     
     async def stop(self):
         print("📦 [EMBED_BUILDER] Остановка системы")
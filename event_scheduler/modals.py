@@ -71,6 +71,8 @@ class ScheduleEventModal(discord.ui.Modal, title="📅 ЗАПЛАНИРОВАТ
         
         # Генерируем расписание на будущее
         db.generate_schedule(days_ahead=14)
+        from event_scheduler.scheduler import reschedule_events
+        await reschedule_events()
         
         db.log_event_action(new_event_id, "scheduled", str(interaction.user.id),
                            f"Разовое на {self.event_date.value} {self.event_time.value}")
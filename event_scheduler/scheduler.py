@@ -3,10 +3,13 @@ import asyncio
 import logging
 import traceback
 from datetime import datetime, timedelta
+from functools import partial
 import pytz
 import discord
 from core.database import db
+from core.async_database import adb
 from core.config import CONFIG
+from core.scheduler import scheduler as task_scheduler
 from event_scheduler.views import EventReminderView
 
 logger = logging.getLogger(__name__)
@@ -21,6 +24,12 @@ file_logger.addHandler(fh)
 
 MSK_TZ = pytz.timezone('Europe/Moscow')
 
+# Напоминание — за час до начала, кнопка «взять» отключается за 10 минут
+REMINDER_BEFORE = timedelta(hours=1)
+TIMEOUT_BEFORE = timedelta(minutes=10)
+# На сколько дней вперёд держится event_schedule
+SCHEDULE_DAYS = 14
+
 # Глобальный экземпляр для предотвращения дублирования
 _scheduler_instance = None
 
@@ -36,9 +45,11 @@ class EventScheduler:
         
         self.bot = bot
         self.running = False
-        self.check_interval = 60
-        self.task = None
-        self.reminder_sent_time = {}
+        self.job = None
+        # Имена взведённых таймеров напоминаний и таймаутов в core.scheduler
+        self.timers = set()
+        # Напоминания, рассылка которых идёт прямо сейчас
+        self.sending = set()
         
         # Сохраняем как глобальный экземпляр
         _scheduler_instance = self
@@ -62,173 +73,164 @@ class EventScheduler:
         file_logger.info("🕐 Event Scheduler запущен")
         logger.info("🕐 Event Scheduler запущен")
         
-        self.task = asyncio.create_task(self._run())
+        # Расписание дополняется за время простоя, дальше — по одному дню в полночь
+        try:
+            added = await adb.generate_schedule(days_ahead=SCHEDULE_DAYS)
+            file_logger.info(f"📅 Расписание дополнено: {added} записей")
+        except Exception as e:
+            file_logger.error(f"Ошибка генерации расписания: {e}")
+        
+        # Таймеры на сутки взводятся сразу и пересчитываются в полночь
+        self.job = task_scheduler.midnight('event_scheduler', self._midnight)
+        await self.plan()
     
-    async def check_events(self):
-        """Проверка предстоящих мероприятий"""
-        file_logger.debug("="*50)
-        file_logger.debug("check_events START")
+    async def stop(self):
+        """Остановка планировщика"""
+        self.running = False
+        if self.job:
+            self.job.cancel()
+            self.job = None
+        for name in self.timers:
+            task_scheduler.cancel(name)
+        self.timers.clear()
+        file_logger.info("🛑 Event Scheduler остановлен")
+    
+    # ===== ТАЙМЕРЫ =====
+    
+    @staticmethod
+    def _event_moment(event_date: str, event_time: str) -> datetime:
+        """Момент начала мероприятия (aware, МСК)"""
+        return MSK_TZ.localize(datetime.strptime(f"{event_date} {event_time}", "%Y-%m-%d %H:%M"))
+    
+    async def plan(self):
+        """Рассчитать моменты напоминаний и таймаутов и взвести таймер на каждый
+        
+        Берутся сегодняшние и завтрашние мероприятия: напоминание за час до
+        мероприятия в 00:30 приходится на 23:30 предыдущих суток. Пропущенное
+        (бот был выключен) напоминание отправляется сразу после готовности
+        бота, если до таймаута ещё есть время. Вызывается при старте, в полночь и после изменения
+        мероприятий — в остальное время БД не опрашивается.
+        """
+        now = datetime.now(MSK_TZ)
+        today = now.date()
+        dates = [today.isoformat(), (today + timedelta(days=1)).isoformat()]
         
         try:
-            now = datetime.now(MSK_TZ)
-            current_time_str = now.strftime("%H:%M")
-            current_date = now.date()
-            
-            file_logger.debug(f"Текущее время: {now}")
-            file_logger.debug(f"current_time_str: {current_time_str}")
-            file_logger.debug(f"current_date: {current_date}")
+            occurrences = await adb.get_event_occurrences(dates)
+        except Exception as e:
+            file_logger.error(f"Ошибка планирования напоминаний: {e}")
+            file_logger.error(traceback.format_exc())
+            return
+        
+        armed = set()
+        
+        for event in occurrences:
+            if event['taken_by']:
+                continue
+            
+            key = f"{event['id']}_{event['scheduled_date']}"
+            event_at = self._event_moment(event['scheduled_date'], event['event_time'])
+            reminder_at = event_at - REMINDER_BEFORE
+            timeout_at = event_at - TIMEOUT_BEFORE
+            
+            if not event['reminder_sent'] and now < timeout_at:
+                name = f"event_reminder_{key}"
+                task_scheduler.once(name, max(reminder_at, now),
+                                    partial(self._fire_reminder, event['id'], event['scheduled_date']))
+                armed.add(name)
+            
+            if now < event_at:
+                name = f"event_timeout_{key}"
+                task_scheduler.once(name, max(timeout_at, now), self.check_timeouts)
+                armed.add(name)
+        
+        # Таймеры удалённых, выключенных и перенесённых мероприятий
+        for name in self.timers - armed:
+            task_scheduler.cancel(name)
+        self.timers = armed
+        
+        file_logger.info(f"🕐 Взведено таймеров: {len(armed)} (мероприятий на {', '.join(dates)}: {len(occurrences)})")
+    
+    async def _midnight(self):
+        """Новые сутки: сдвинуть окно расписания на день и перевзвести таймеры"""
+        try:
+            added = await adb.extend_schedule(days_ahead=SCHEDULE_DAYS)
+            file_logger.info(f"📅 Расписание продлено на день: {added} записей")
+        except Exception as e:
+            file_logger.error(f"Ошибка продления расписания: {e}")
+        await self.plan()
+    
+    async def _fire_reminder(self, event_id: int, event_date: str):
+        """Таймер напоминания: проверить актуальный статус и разослать"""
+        self.timers.discard(f"event_reminder_{event_id}_{event_date}")
+        # Пропущенное напоминание взводится на момент старта — до готовности кэша
+        # get_channel() вернёт None и рассылка уйдёт в никуда
+        await self.bot.wait_until_ready()
+        
+        try:
+            rows = await adb.get_event_occurrences([event_date], event_id=event_id)
+            if not rows:
+                file_logger.debug(f"Мероприятие {event_id} на {event_date} больше не запланировано")
+                return
             
-            today_events = db.get_today_events()
-            file_logger.debug(f"Найдено мероприятий на сегодня: {len(today_events)}")
+            event = rows[0]
+            if event['taken_by'] or event['reminder_sent']:
+                file_logger.debug(f"Мероприятие {event_id} уже взято или напоминание отправлено")
+                return
             
-            for event in today_events:
-                try:
-                    file_logger.debug(f"--- Обработка события ID: {event['id']} ---")
-                    
-                    if event['taken_by']:
-                        file_logger.debug("Мероприятие уже взято, пропускаем")
-                        continue
-                    
-                    event_time = event['event_time']
-                    
-                    # Вычисляем время напоминания (за 1 час ДО)
-                    event_hour, event_min = map(int, event_time.split(':'))
-                    reminder_hour = event_hour - 1
-                    reminder_min = event_min
-                    
-                    # Обработка перехода через полночь
-                    if reminder_hour < 0:
-                        reminder_hour = 23
-                    
-                    reminder_time = f"{reminder_hour:02d}:{reminder_min:02d}"
-                    
-                    # Ключ для проверки отправки
-                    reminder_key = f"{event['id']}_{current_date}"
-                    
-                    file_logger.debug(f"Время напоминания: {reminder_time}")
-                    file_logger.debug(f"reminder_sent: {event['reminder_sent']}")
-                    
-                    # Проверяем, что текущее время РАВНО времени напоминания
-                    # И напоминание ещё не отправлено
-                    # И мы не отправляли уже в этой сессии
-                    if current_time_str == reminder_time and not event['reminder_sent']:
-                        if reminder_key in self.reminder_sent_time:
-                            file_logger.debug(f"Уже отправлено в этой сессии, пропускаю")
-                            continue
-                        
-                        file_logger.info(f"✅ ПОРА отправлять напоминание для {event['name']} в {event_time}")
-                        self.reminder_sent_time[reminder_key] = datetime.now()
-                        await self.send_reminder(event, now)
-                    else:
-                        file_logger.debug("Условия не выполнены")
-                        
-                except Exception as e:
-                    file_logger.error(f"Ошибка обработки события {event.get('id')}: {e}")
-                    file_logger.error(traceback.format_exc())
-                    continue
-                    
+            file_logger.info(f"✅ ПОРА отправлять напоминание для {event['name']} в {event['event_time']}")
+            await self.send_reminder(event, event_date)
         except Exception as e:
-            file_logger.error(f"Ошибка в check_events: {e}")
+            file_logger.error(f"Ошибка обработки события {event_id}: {e}")
             file_logger.error(traceback.format_exc())
     
     async def check_timeouts(self):
-        """Проверка таймаутов (за 10 минут до начала)"""
+        """Таймауты всех разосланных и не взятых мероприятий (за 10 минут до начала)
+        
+        Отслеживаемые напоминания хранятся в event_schedule (reminder_sent /
+        timeout_sent), поэтому переживают перезапуск; все наступившие таймауты
+        выбираются одним запросом.
+        """
         file_logger.debug("="*50)
         file_logger.debug("check_timeouts START")
+        # Без готового кэша каналы не найдутся, а таймаут всё равно будет отмечен
+        await self.bot.wait_until_ready()
         
         try:
             now = datetime.now(MSK_TZ)
-            current_time_str = now.strftime("%H:%M")
-            current_date = now.date()
+            due = await adb.get_due_event_timeouts(now)
+            file_logger.debug(f"Наступивших таймаутов: {len(due)}")
             
-            file_logger.debug(f"Текущее время для таймаутов: {current_time_str}")
-            file_logger.debug(f"Отслеживается напоминаний: {len(self.reminder_sent_time)}")
-            
-            for key, sent_time in list(self.reminder_sent_time.items()):
+            sent = []
+            for row in due:
                 try:
-                    # Ключ имеет формат "eventId_YYYY-MM-DD"
-                    parts = key.split('_')
-                    if len(parts) != 2:
-                        continue
-                    
-                    event_id = int(parts[0])
-                    event_date = parts[1]
-                    
-                    # Проверяем, не устарела ли запись
-                    if event_date != str(current_date):
-                        del self.reminder_sent_time[key]
-                        continue
-                    
-                    file_logger.debug(f"Проверка таймаута для event_id={event_id}, date={event_date}")
-                    
-                    with db.get_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            SELECT e.event_time, s.taken_by 
-                            FROM events e
-                            LEFT JOIN event_schedule s ON e.id = s.event_id AND s.scheduled_date = ?
-                            WHERE e.id = ?
-                        ''', (event_date, event_id))
-                        result = cursor.fetchone()
-                        
-                        if not result:
-                            file_logger.debug(f"Мероприятие {event_id} не найдено, удаляем из отслеживания")
-                            del self.reminder_sent_time[key]
-                            continue
-                        
-                        event_time_str, taken_by = result
-                        
-                        # Если уже взяли - удаляем из отслеживания
-                        if taken_by:
-                            file_logger.debug(f"Мероприятие уже взято, удаляем из отслеживания")
-                            del self.reminder_sent_time[key]
-                            continue
-                        
-                        # Время отключения кнопки (за 10 минут до)
-                        event_hour, event_min = map(int, event_time_str.split(':'))
-                        timeout_hour = event_hour
-                        timeout_min = event_min - 10
-                        
-                        if timeout_min < 0:
-                            timeout_hour -= 1
-                            timeout_min += 60
-                        
-                        if timeout_hour < 0:
-                            timeout_hour = 23
-                        
-                        timeout_time = f"{timeout_hour:02d}:{timeout_min:02d}"
-                        file_logger.debug(f"Время таймаута: {timeout_time}")
-                        
-                        # Если наступило время таймаута
-                        if current_time_str >= timeout_time:
-                            file_logger.info(f"⏰ ТАЙМАУТ для мероприятия {event_id} в {event_time_str}")
-                            await self.send_timeout_message(event_id, event_date, event_time_str)
-                            del self.reminder_sent_time[key]
-                            
+                    file_logger.info(f"⏰ ТАЙМАУТ для мероприятия {row['event_id']} в {row['event_time']}")
+                    await self.send_timeout_message(row['event_id'], row['scheduled_date'], row['event_time'])
                 except Exception as e:
-                    file_logger.error(f"Ошибка обработки таймаута для ключа {key}: {e}")
+                    file_logger.error(f"Ошибка отправки таймаута {row['event_id']}_{row['scheduled_date']}: {e}")
                     file_logger.error(traceback.format_exc())
-                    if key in self.reminder_sent_time:
-                        del self.reminder_sent_time[key]
+                # Повторно не шлём даже при ошибке — как и прежде, запись снимается с отслеживания
+                sent.append((row['event_id'], row['scheduled_date']))
+            
+            await adb.mark_timeouts_sent(sent)
                         
         except Exception as e:
             file_logger.error(f"Ошибка в check_timeouts: {e}")
             file_logger.error(traceback.format_exc())
     
-    async def send_reminder(self, event, now):
+    async def send_reminder(self, event, event_date: str):
         """Отправка напоминания во все настроенные каналы"""
         file_logger.debug("="*50)
         file_logger.debug("send_reminder START")
         
-        today = now.date().isoformat()
-        reminder_key = f"{event['id']}_{today}"
+        reminder_key = f"{event['id']}_{event_date}"
         
-        # Дополнительная проверка — чтобы точно не отправить дважды
-        if reminder_key in self.reminder_sent_time:
+        # Дополнительная проверка — чтобы точно не отправить дважды, пока отметка не записана в БД
+        if reminder_key in self.sending:
             file_logger.warning(f"Повторная попытка отправки {reminder_key}, игнорирую")
             return
         
-        self.reminder_sent_time[reminder_key] = datetime.now()
+        self.sending.add(reminder_key)
         
         try:
             channel_ids = CONFIG.get('alarm_channels', [])
@@ -240,18 +242,7 @@ class EventScheduler:
             event_time = event['event_time']
             
             # Время сбора (за 20 минут)
-            event_hour, event_min = map(int, event_time.split(':'))
-            meeting_hour = event_hour
-            meeting_min = event_min - 20
-            
-            if meeting_min < 0:
-                meeting_hour -= 1
-                meeting_min += 60
-            
-            if meeting_hour < 0:
-                meeting_hour = 23
-            
-            meeting_time = f"{meeting_hour:02d}:{meeting_min:02d}"
+            meeting_time = (self._event_moment(event_date, event_time) - timedelta(minutes=20)).strftime("%H:%M")
             
             # Создаём embed
             embed = discord.Embed(
@@ -337,8 +328,8 @@ class EventScheduler:
                     file_logger.error(f"Ошибка отправки в канал {channel_id}: {e}")
             
             if sent_count > 0:
-                db.mark_reminder_sent(event['id'], today)
-                db.log_event_action(event['id'], "reminder_sent")
+                await adb.mark_reminder_sent(event['id'], event_date)
+                await adb.log_event_action(event['id'], "reminder_sent")
                 file_logger.info(f"✅ Напоминание отправлено в {sent_count} каналов: {event['name']} в {event_time}")
                 logger.info(f"✅ Напоминание отправлено: {event['name']} в {event_time}")
             
@@ -346,6 +337,8 @@ class EventScheduler:
             file_logger.error(f"Ошибка отправки напоминания: {e}")
             file_logger.error(traceback.format_exc())
             logger.error(f"Ошибка отправки напоминания: {e}")
+        finally:
+            self.sending.discard(reminder_key)
     
     async def send_timeout_message(self, event_id: int, event_date: str, event_time: str):
         """Сообщение о таймауте во все каналы"""
@@ -391,42 +384,6 @@ class EventScheduler:
             
         except Exception as e:
             logger.error(f"Ошибка отправки таймаута: {e}")
-    
-    def cleanup_old_reminders(self):
-        """Очистка старых записей"""
-        file_logger.debug("cleanup_old_reminders START")
-        
-        try:
-            now = datetime.now(MSK_TZ)
-            file_logger.debug(f"Текущая дата: {now.date()}")
-            file_logger.debug(f"Записей до очистки: {len(self.reminder_sent_time)}")
-            
-            for key in list(self.reminder_sent_time.keys()):
-                try:
-                    # Ключ имеет формат "eventId_YYYY-MM-DD"
-                    parts = key.split('_')
-                    if len(parts) != 2:
-                        del self.reminder_sent_time[key]
-                        continue
-                    
-                    event_date = parts[1]
-                    date_obj = datetime.strptime(event_date, "%Y-%m-%d").date()
-                    days_diff = (now.date() - date_obj).days
-                    file_logger.debug(f"Ключ {key}: дней разницы {days_diff}")
-                    
-                    if days_diff > 7:
-                        file_logger.debug(f"Удаляем старую запись: {key}")
-                        del self.reminder_sent_time[key]
-                except Exception as e:
-                    file_logger.error(f"Ошибка обработки ключа {key}: {e}")
-                    if key in self.reminder_sent_time:
-                        del self.reminder_sent_time[key]
-            
-            file_logger.debug(f"Записей после очистки: {len(self.reminder_sent_time)}")
-            
-        except Exception as e:
-            file_logger.error(f"Ошибка в cleanup_old_reminders: {e}")
-            file_logger.error(traceback.format_exc())
 
 
 # Глобальный экземпляр для внешнего доступа
@@ -451,4 +408,10 @@ async def stop_scheduler():
     if scheduler:
         await scheduler.stop()
         scheduler = None
-    _scheduler_instance = None
\ No newline at end of file
+    _scheduler_instance = None
+
+
+async def reschedule_events():
+    """Перевзвести таймеры после добавления, изменения или удаления мероприятий"""
+    if scheduler and scheduler.running:
+        await scheduler.plan()
\ No newline at end of file
@@ -233,6 +233,8 @@ class EventManageView(AdminOnlyView):
         new_status = not self.enabled
         db.update_event(self.event_id, enabled=1 if new_status else 0)
         db.log_event_action(self.event_id, "toggled", str(interaction.user.id), f"Статус: {'включен' if new_status else 'отключен'}")
+        from event_scheduler.scheduler import reschedule_events
+        await reschedule_events()
         await interaction.response.send_message(f"✅ Мероприятие {'включено' if new_status else 'отключено'}", ephemeral=True)
         self.enabled = new_status
 
@@ -255,6 +257,8 @@ class ConfirmDeleteEventView(AdminOnlyView):
         success = db.delete_event(self.event_id, soft=False)
         if success:
             db.log_event_action(self.event_id, "deleted", str(interaction.user.id))
+            from event_scheduler.scheduler import reschedule_events
+            await reschedule_events()
             await interaction.response.edit_message(content=f"✅ Мероприятие **{self.event_name}** удалено", view=None)
         else:
             await interaction.response.edit_message(content="❌ Не удалось удалить мероприятие", view=None)
@@ -478,6 +482,8 @@ class AddEventSettingsModal(discord.ui.Modal, title="➕ ДОБАВИТЬ МЕР
             
             # Генерируем расписание
             db.generate_schedule(days_ahead=14)
+            from event_scheduler.scheduler import reschedule_events
+            await reschedule_events()
             
             days_str = ', '.join([days_names[d] for d in weekdays])
             times_str = ', '.join(times)
@@ -526,6 +532,8 @@ class EditEventSettingsModal(discord.ui.Modal, title="✏️ РЕДАКТИРО
             datetime.strptime(self.event_time.value, "%H:%M")
             db.update_event(self.event_id, name=self.event_name.value, weekday=day, event_time=self.event_time.value)
             db.log_event_action(self.event_id, "edited", str(interaction.user.id), f"Новое: {self.event_name.value} {self.event_time.value}")
+            from event_scheduler.scheduler import reschedule_events
+            await reschedule_events()
             days = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
             await interaction.response.send_message(f"✅ Мероприятие обновлено!\n📌 {self.event_name.value}\n📅 {days[day]} в {self.event_time.value}", ephemeral=True)
         except ValueError:
@@ -3,6 +3,7 @@ import discord
 import logging
 from datetime import datetime
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG
 from core.utils import is_admin
 from events.manager import events_manager
@@ -72,18 +73,11 @@ class EventsInitializer:
         
         view = ModerationMainView()
         
-        found = False
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                if msg.embeds and "ПАНЕЛЬ УПРАВЛЕНИЯ МЕРОПРИЯТИЯМИ" in msg.embeds[0].title:
-                    await msg.edit(embed=embed, view=view)
-                    found = True
-                    print(f"🎯 [EVENTS] Обновлена панель модерации в #{channel.name}")
-                    break
-        
-        if not found:
-            await channel.send(embed=embed, view=view)
-            print(f"🎯 [EVENTS] Создана панель модерации в #{channel.name}")
+        await panel_registry.publish(
+            self.bot, 'events', 'moderation', channel, embed=embed, view=view,
+            match=lambda msg: bool(msg.embeds) and "ПАНЕЛЬ УПРАВЛЕНИЯ МЕРОПРИЯТИЯМИ" in (msg.embeds[0].title or "")
+        )
+        print(f"🎯 [EVENTS] Панель модерации в #{channel.name} актуальна")
     
     async def _init_participant_channel(self):
         try:
@@ -117,18 +111,11 @@ class EventsInitializer:
         
         view = EventsSettingsView()
         
-        found = False
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                if msg.embeds and "НАСТРОЙКА МЕРОПРИЯТИЙ" in msg.embeds[0].title:
-                    await msg.edit(embed=embed, view=view)
-                    found = True
-                    print(f"🎯 [EVENTS] Обновлена панель настроек в #{channel.name}")
-                    break
-        
-        if not found:
-            await channel.send(embed=embed, view=view)
-            print(f"🎯 [EVENTS] Создана панель настроек в #{channel.name}")
+        await panel_registry.publish(
+            self.bot, 'events', 'settings', channel, embed=embed, view=view,
+            match=lambda msg: bool(msg.embeds) and "НАСТРОЙКА МЕРОПРИЯТИЙ" in (msg.embeds[0].title or "")
+        )
+        print(f"🎯 [EVENTS] Панель настроек в #{channel.name} актуальна")
     
     async def _restore_sessions(self):
         sessions = db.get_active_event_sessions()
@@ -1,40 +1,26 @@
 """Статистика мероприятий — еженедельные отчёты"""
-import asyncio
 import discord
-from datetime import datetime, timedelta
+from datetime import datetime
 from core.database import db
 from core.config import CONFIG
+from core.scheduler import scheduler
 
 
 class EventStats:
     
     def __init__(self, bot):
         self.bot = bot
-        self.task = None
+        self.job = None
     
     async def start(self):
-        self.task = asyncio.create_task(self._weekly_report_loop())
+        # Воскресенье 23:59 МСК
+        self.job = scheduler.cron('events_weekly_report', self._send_weekly_report, hour=23, minute=59, weekdays=[6])
         print("📊 [EVENTS] Еженедельная статистика запущена")
     
     async def stop(self):
-        if self.task:
-            self.task.cancel()
-    
-    async def _weekly_report_loop(self):
-        await self.bot.wait_until_ready()
-        
-        while not self.bot.is_closed():
-            now = datetime.now()
-            days_until_sunday = (6 - now.weekday()) % 7
-            next_sunday = now + timedelta(days=days_until_sunday)
-            next_sunday = next_sunday.replace(hour=23, minute=59, second=0)
-            
-            wait_seconds = (next_sunday - now).total_seconds()
-            if wait_seconds < 0:
-                wait_seconds += 7 * 24 * 60 * 60
-            
-            await asyncio.sleep(wait_seconds)
-            await self._send_weekly_report()
+        if self.job:
+            self.job.cancel()
+            self.job = None
     
     async def _send_weekly_report(self):
         settings = self.get_settings()
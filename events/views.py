@@ -4,6 +4,7 @@ import asyncio
 from datetime import datetime
 from core.database import db
 from core.utils import is_admin
+from core.panels import panel_registry
 from events.base import PermanentView
 from events.manager import events_manager
 
@@ -126,7 +127,7 @@ class EventsParticipantView(PermanentView):
             content += "└ *Пока никого нет*"
         
         try:
-            await self.message.edit(content=content)
+            await panel_registry.edit_if_changed('events', self.message, content=content)
         except Exception as e:
             print(f"⚠️ [EVENTS] Ошибка обновления сообщения: {e}")
     
@@ -149,6 +150,7 @@ class EventsParticipantView(PermanentView):
                     new_view.add_item(child)
             
             await self.message.edit(view=new_view)
+            panel_registry.forget_rendered(self.message.id)
             print(f"✅ [EVENTS] Кнопки сессии {self.session_id} отключены")
         except discord.NotFound:
             print(f"⚠️ [EVENTS] Сообщение сессии {self.session_id} не найдено")
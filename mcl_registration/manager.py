@@ -2,6 +2,7 @@
 import discord
 from datetime import datetime
 from core.database import db
+from core.panels import panel_registry
 from core.config import CONFIG, save_config
 
 
@@ -119,42 +120,14 @@ class MCLRegistrationManager:
         pub_view = PublicView()
         pub_view.set_registration_active(active)  # если active=True, кнопки присоединения будут АКТИВНЫ
         
-        # 🔥 ИЩЕМ СУЩЕСТВУЮЩИЕ СООБЩЕНИЯ (НЕ УДАЛЯЕМ!)
-        main_msg = None
-        reserve_msg = None
-        
-        async for msg in main_channel.history(limit=50):
-            if msg.author == bot.user and msg.embeds:
-                main_msg = msg
-                break
-        
-        async for msg in reserve_channel.history(limit=50):
-            if msg.author == bot.user and msg.embeds:
-                reserve_msg = msg
-                break
-        
-        if main_msg and reserve_msg:
-            # ✅ ОБНОВЛЯЕМ существующие сообщения
-            await main_msg.edit(embed=embed, view=mod_view)
-            await reserve_msg.edit(embed=embed, view=pub_view)
-            print(f"🎯 [MCL] Обновлены существующие сообщения, active={active}")
-            
-            self.main_message_id = str(main_msg.id)
-            self.reserve_message_id = str(reserve_msg.id)
-        else:
-            # ✅ Удаляем старые сообщения ТОЛЬКО если нет существующих
-            async for msg in main_channel.history(limit=50):
-                if msg.author == bot.user:
-                    await msg.delete()
-            async for msg in reserve_channel.history(limit=50):
-                if msg.author == bot.user:
-                    await msg.delete()
-            
-            main_msg = await main_channel.send(embed=embed, view=mod_view)
-            reserve_msg = await reserve_channel.send(embed=embed, view=pub_view)
-            self.main_message_id = str(main_msg.id)
-            self.reserve_message_id = str(reserve_msg.id)
-            print(f"🎯 [MCL] Созданы новые сообщения, active={active}")
+        # 🔥 Сообщения известны реестру панелей — редактируем на месте, историю смотрим только если их нет
+        main_msg = await panel_registry.publish(bot, 'mcl', 'main', main_channel, embed=embed, view=mod_view,
+                                                match=lambda msg: bool(msg.embeds), volatile=('timestamp',))
+        reserve_msg = await panel_registry.publish(bot, 'mcl', 'reserve', reserve_channel, embed=embed, view=pub_view,
+                                                   match=lambda msg: bool(msg.embeds), volatile=('timestamp',))
+        self.main_message_id = str(main_msg.id)
+        self.reserve_message_id = str(reserve_msg.id)
+        print(f"🎯 [MCL] Сообщения регистрации актуальны, active={active}")
         
         if session:
             db.mcl_update_session_messages(session['id'], self.main_message_id, self.reserve_message_id)
@@ -207,15 +180,11 @@ class MCLRegistrationManager:
                 
                 main_list, reserve_list = self.get_lists()
                 
-                # Начисляем баллы участникам основного списка
-                for reg in main_list:
-                    _, uid, _ = reg
-                    await economy_manager.award_mcl(int(uid), is_main=True)
-                
-                # Начисляем баллы участникам резервного списка
-                for reg in reserve_list:
-                    _, uid, _ = reg
-                    await economy_manager.award_mcl(int(uid), is_main=False)
+                # Все участники — одной транзакцией
+                await economy_manager.award_mcl_session(
+                    [int(uid) for _, uid, _ in main_list],
+                    [int(uid) for _, uid, _ in reserve_list]
+                )
                 
                 print(f"💰 [MCL] Начислены баллы: основной={len(main_list)}, резерв={len(reserve_list)}")
             else:
@@ -330,7 +299,7 @@ class MCLRegistrationManager:
             try:
                 channel = self.bot.get_channel(int(self.main_channel_id))
                 if channel:
-                    msg = await channel.fetch_message(int(self.main_message_id))
+                    msg = channel.get_partial_message(int(self.main_message_id))
                     
                     # Создаём embed с актуальными списками
                     if session_active and self.session_info:
@@ -340,7 +309,7 @@ class MCLRegistrationManager:
                     
                     view = ModerationView()
                     view.update_buttons(session_active)
-                    await msg.edit(embed=embed, view=view)
+                    await panel_registry.edit_if_changed('mcl', msg, embed=embed, view=view, volatile=('timestamp',))
                     print(f"✅ [MCL] Обновлён main канал: основной={len(main_list)}, резерв={len(reserve_list)}")
             except Exception as e:
                 print(f"❌ [MCL] Ошибка обновления main канала: {e}")
@@ -349,7 +318,7 @@ class MCLRegistrationManager:
             try:
                 channel = self.bot.get_channel(int(self.reserve_channel_id))
                 if channel:
-                    msg = await channel.fetch_message(int(self.reserve_message_id))
+                    msg = channel.get_partial_message(int(self.reserve_message_id))
                     
                     # Создаём embed с актуальными списками
                     if session_active and self.session_info:
@@ -359,7 +328,7 @@ class MCLRegistrationManager:
                     
                     view = PublicView()
                     view.set_registration_active(session_active)
-                    await msg.edit(embed=embed, view=view)
+                    await panel_registry.edit_if_changed('mcl', msg, embed=embed, view=view, volatile=('timestamp',))
                     print(f"✅ [MCL] Обновлён reserve канал: основной={len(main_list)}, резерв={len(reserve_list)}")
             except Exception as e:
                 print(f"❌ [MCL] Ошибка обновления reserve канала: {e}")
@@ -2,6 +2,7 @@
 import discord
 import logging
 from core.database import db
+from core.panels import panel_registry
 from stats.views import StatsPanelView, BackupPanelView
 from stats.settings import StatsSettingsView
 
@@ -39,27 +40,24 @@ class StatsInitializer:
             logger.error(f"❌ Неверный ID канала статистики: {self.stats_channel_id}")
             return
         
-        # Удаляем старые сообщения
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user:
-                await msg.delete()
-        
-        # Отправляем новые панели
+        # Панели редактируются на месте; старые сообщения удаляются, только если панели потеряны
         embed = discord.Embed(
             title="📊 ПАНЕЛЬ СТАТИСТИКИ",
             description="Управление статистикой сервера",
             color=0x7289da
         )
-        await channel.send(embed=embed, view=StatsPanelView())
+        await panel_registry.publish(self.bot, 'stats', 'stats', channel,
+                                     embed=embed, view=StatsPanelView(), replace=True)
         
         embed2 = discord.Embed(
             title="💾 ПАНЕЛЬ БЕКАПА",
             description="Управление бекапами сервера (только для супер-админа)",
             color=0xffa500
         )
-        await channel.send(embed=embed2, view=BackupPanelView())
+        await panel_registry.publish(self.bot, 'stats', 'backup', channel,
+                                     embed=embed2, view=BackupPanelView(), replace=True)
         
-        print(f"📊 [STATS] Созданы панели в #{channel.name}")
+        print(f"📊 [STATS] Панели в #{channel.name} актуальны")
     
     async def _init_settings_channel(self):
         try:
@@ -71,17 +69,14 @@ class StatsInitializer:
             logger.error(f"❌ Неверный ID канала настроек: {self.settings_channel_id}")
             return
         
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user:
-                await msg.delete()
-        
         embed = discord.Embed(
             title="⚙️ **НАСТРОЙКА СТАТИСТИКИ**",
             description="Настройка системы статистики и бекапов",
             color=0x00ff00
         )
-        await channel.send(embed=embed, view=StatsSettingsView())
-        print(f"📊 [STATS] Создана панель настроек в #{channel.name}")
+        await panel_registry.publish(self.bot, 'stats', 'settings', channel,
+                                     embed=embed, view=StatsSettingsView(), replace=True)
+        print(f"📊 [STATS] Панель настроек в #{channel.name} актуальна")
 
 
 initializer = None
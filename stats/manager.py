@@ -2,11 +2,12 @@
 import discord
 import json
 import io
-import asyncio
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import datetime
 from core.database import db
+from core.timeutils import msk_now, msk_today
+from core.scheduler import scheduler
 from core.config import CONFIG
 from core.utils import is_super_admin
 
@@ -17,7 +18,7 @@ class StatsManager:
         self.stats_channel_id = None
         self.backup_enabled = True
         self.backup_time = "00:00"
-        self.backup_task = None
+        self.backup_job = None
         self.daily_stats = {}
         self.hourly_stats = {}
         self.user_stats = {}
@@ -48,7 +49,7 @@ class StatsManager:
     
     async def collect_daily_stats(self, guild: discord.Guild):
         """Сбор ежедневной статистики"""
-        today = datetime.now().date().isoformat()
+        today = msk_today().isoformat()
         
         # Получаем данные из БД
         new_members = db.get_daily_new_members(today)
@@ -88,7 +89,7 @@ class StatsManager:
     
     async def update_hourly_stats(self, guild: discord.Guild):
         """Обновить почасовую статистику"""
-        now = datetime.now()
+        now = msk_now()
         hour = now.hour
         today = now.date().isoformat()
         
@@ -108,7 +109,7 @@ class StatsManager:
     
     async def update_user_stats(self, user_id: int, field: str, delta: int = 1):
         """Обновить статистику пользователя"""
-        today = datetime.now().date().isoformat()
+        today = msk_today().isoformat()
         db.update_user_activity(str(user_id), today, field, delta)
     
     async def get_user_stats(self, user_id: int, days: int = 7) -> dict:
@@ -350,81 +351,59 @@ class StatsManager:
     # ==================== ЗАПУСК БЕКАПА ПО РАСПИСАНИЮ ====================
     
     async def start_backup_scheduler(self):
-        """Запуск планировщика бекапов"""
-        if self.backup_task:
-            self.backup_task.cancel()
-        
-        self.backup_task = asyncio.create_task(self._backup_loop())
-        print("📊 [STATS] Планировщик бекапов запущен")
+        """Регистрация ежедневного бекапа в общем планировщике (время — МСК)"""
+        self.backup_job = scheduler.daily('stats_backup', self.backup_time, self._run_backup)
+        print(f"📊 [STATS] Планировщик бекапов запущен, следующий бекап: {self.backup_job.info()['next_run']} МСК")
     
-    async def _backup_loop(self):
-        """Цикл ежедневного бекапа (только для основного сервера)"""
-        while True:
-            try:
-                now = datetime.now()
-                target_time = datetime.strptime(self.backup_time, "%H:%M").time()
-                target_datetime = datetime.combine(now.date(), target_time)
-                
-                if now.time() > target_time:
-                    target_datetime += timedelta(days=1)
-                
-                wait_seconds = (target_datetime - now).total_seconds()
-                print(f"📊 [STATS] Следующий бекап через {wait_seconds // 3600:.0f} часов")
-                await asyncio.sleep(wait_seconds)
-                
-                print("📊 [STATS] Время бекапа! Создаю бекап...")
-                
-                if self.bot and self.backup_enabled:
-                    # Бекапим ТОЛЬКО основной сервер (где настроен канал статистики)
-                    main_server_id = CONFIG.get('server_id')
-                    if main_server_id:
-                        guild = self.bot.get_guild(int(main_server_id))
-                        if guild:
-                            backup = await self.create_backup(guild, 'system')
-                            
-                            # Отправляем супер-админу в ЛС
-                            super_admin_id = CONFIG.get('super_admin_id')
-                            if super_admin_id:
-                                try:
-                                    user = await self.bot.fetch_user(int(super_admin_id))
-                                    if user:
-                                        # Создаём JSON файл бекапа
-                                        backup_json = json.dumps(backup, ensure_ascii=False, indent=2)
-                                        file = discord.File(
-                                            io.BytesIO(backup_json.encode('utf-8')),
-                                            filename=f"backup_discord_{guild.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                                        )
-                                        
-                                        # Бекап БД
-                                        db_backup_path = f"/tmp/backup_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                                        import shutil
-                                        shutil.copy('bot_data.db', db_backup_path)
-                                        db_file = discord.File(db_backup_path, filename=f"backup_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
-                                        
-                                        await user.send(
-                                            content=f"💾 **ЕЖЕДНЕВНЫЙ БЕКАП**\n📅 {datetime.now().strftime('%d.%m.%Y %H:%M')}\n📊 Сервер: {guild.name}",
-                                            files=[file, db_file]
-                                        )
-                                        
-                                        os.remove(db_backup_path)
-                                        print(f"📊 [STATS] Бекап отправлен супер-админу")
-                                except Exception as e:
-                                    print(f"❌ Ошибка отправки бекапа: {e}")
-                    else:
-                        print("⚠️ [STATS] Основной сервер не настроен (server_id)")
-                                    
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"❌ Ошибка в цикле бекапа: {e}")
-                await asyncio.sleep(60)
+    async def _run_backup(self):
+        """Ежедневный бекап (только для основного сервера)"""
+        print("📊 [STATS] Время бекапа! Создаю бекап...")
+        
+        if self.bot and self.backup_enabled:
+            # Бекапим ТОЛЬКО основной сервер (где настроен канал статистики)
+            main_server_id = CONFIG.get('server_id')
+            if main_server_id:
+                guild = self.bot.get_guild(int(main_server_id))
+                if guild:
+                    backup = await self.create_backup(guild, 'system')
+                    
+                    # Отправляем супер-админу в ЛС
+                    super_admin_id = CONFIG.get('super_admin_id')
+                    if super_admin_id:
+                        try:
+                            user = await self.bot.fetch_user(int(super_admin_id))
+                            if user:
+                                # Создаём JSON файл бекапа
+                                backup_json = json.dumps(backup, ensure_ascii=False, indent=2)
+                                file = discord.File(
+                                    io.BytesIO(backup_json.encode('utf-8')),
+                                    filename=f"backup_discord_{guild.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                                )
+                                
+                                # Бекап БД
+                                db_backup_path = f"/tmp/backup_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+                                db.backup_to(db_backup_path)
+                                db_file = discord.File(db_backup_path, filename=f"backup_db_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+                                
+                                await user.send(
+                                    content=f"💾 **ЕЖЕДНЕВНЫЙ БЕКАП**\n📅 {datetime.now().strftime('%d.%m.%Y %H:%M')}\n📊 Сервер: {guild.name}",
+                                    files=[file, db_file]
+                                )
+                                
+                                os.remove(db_backup_path)
+                                print(f"📊 [STATS] Бекап отправлен супер-админу")
+                        except Exception as e:
+                            print(f"❌ Ошибка отправки бекапа: {e}")
+            else:
+                print("⚠️ [STATS] Основной сервер не настроен (server_id)")
     
     # ==================== ОСТАНОВКА ====================
     
     async def stop(self):
         """Остановка модуля"""
-        if self.backup_task:
-            self.backup_task.cancel()
+        if self.backup_job:
+            self.backup_job.cancel()
+            self.backup_job = None
         print("📊 [STATS] Остановка системы статистики")
 
 
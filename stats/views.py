@@ -7,6 +7,7 @@ from stats.base import PermanentView, ConfirmView
 from stats.manager import stats_manager
 from core.utils import is_admin, is_super_admin
 from core.database import db
+from core.timeutils import msk_today
 from core.config import CONFIG
 
 
@@ -23,7 +24,7 @@ class StatsPanelView(PermanentView):
         print("📊 [STATS] today_stats нажата")
         await interaction.response.defer(ephemeral=True)
         
-        today = datetime.now().date().isoformat()
+        today = msk_today().isoformat()
         stats = db.get_stats_for_date(today)
         
         if not stats:
@@ -52,7 +53,10 @@ class StatsPanelView(PermanentView):
         print("📊 [STATS] top_users нажата")
         await interaction.response.defer(ephemeral=True)
         
-        top = db.get_top_balance_users(10)
+        # Порядок — из рейтинга в памяти, из БД только «заработано» по ключу
+        from economy.manager import economy_manager
+        top = economy_manager.get_top_users(10)
+        earned = db.get_users_total_earned([user_id for user_id, _ in top])
         
         if not top:
             await interaction.followup.send("🏆 Нет данных для топа", ephemeral=True)
@@ -65,11 +69,11 @@ class StatsPanelView(PermanentView):
         )
         
         medals = ["🥇", "🥈", "🥉"]
-        for i, (user_id, balance, earned) in enumerate(top, 1):
+        for i, (user_id, balance) in enumerate(top, 1):
             medal = medals[i-1] if i <= 3 else f"{i}."
             embed.add_field(
                 name=f"{medal} <@{user_id}>",
-                value=f"💰 Баланс: **{balance}**\n📈 Заработано: **{earned}**",
+                value=f"💰 Баланс: **{balance}**\n📈 Заработано: **{earned.get(user_id, 0)}**",
                 inline=False
             )
         
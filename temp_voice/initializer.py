@@ -2,6 +2,7 @@
 import discord
 import logging
 from core.database import db
+from core.panels import panel_registry
 from temp_voice.views import TempVoicePublicView
 from temp_voice.manager import temp_voice_manager
 
@@ -37,34 +38,29 @@ class TempVoiceInitializer:
             logger.error(f"❌ Публичный канал {self.public_channel_id} не найден")
             return
         
-        found = False
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.components:
-                await msg.edit(view=TempVoicePublicView())
-                found = True
-                print(f"🎤 [TEMP_VOICE] Обновлена панель в #{channel.name}")
-                break
-        
-        if not found:
-            embed = discord.Embed(
-                title="🎤 **ВРЕМЕННЫЕ ГОЛОСОВЫЕ КОМНАТЫ**",
-                description="Создайте свою временную комнату для общения с друзьями!\n\n"
-                            "**Как это работает:**\n"
-                            "└ Нажмите кнопку «СОЗДАТЬ КОМНАТУ» и введите название\n"
-                            "└ Комната появится в голосовом канале\n"
-                            "└ Приглашайте друзей — они смогут зайти\n"
-                            "└ Управляйте комнатой кнопками ниже\n\n"
-                            "**Возможности управления:**\n"
-                            "└ Расширить комнату (увеличить количество слотов)\n"
-                            "└ Уменьшить комнату (уменьшить количество слотов)\n"
-                            "└ Заблокировать/разблокировать вход в комнату\n"
-                            "└ Кикнуть нежелательного пользователя\n"
-                            "└ Удалить комнату\n\n"
-                            "**Важно:** Комната будет автоматически удалена через N секунд после того, как создатель покинет её.",
-                color=0x00bfff
-            )
-            await channel.send(embed=embed, view=TempVoicePublicView())
-            print(f"🎤 [TEMP_VOICE] Создана панель в #{channel.name}")
+        embed = discord.Embed(
+            title="🎤 **ВРЕМЕННЫЕ ГОЛОСОВЫЕ КОМНАТЫ**",
+            description="Создайте свою временную комнату для общения с друзьями!\n\n"
+                        "**Как это работает:**\n"
+                        "└ Нажмите кнопку «СОЗДАТЬ КОМНАТУ» и введите название\n"
+                        "└ Комната появится в голосовом канале\n"
+                        "└ Приглашайте друзей — они смогут зайти\n"
+                        "└ Управляйте комнатой кнопками ниже\n\n"
+                        "**Возможности управления:**\n"
+                        "└ Расширить комнату (увеличить количество слотов)\n"
+                        "└ Уменьшить комнату (уменьшить количество слотов)\n"
+                        "└ Заблокировать/разблокировать вход в комнату\n"
+                        "└ Кикнуть нежелательного пользователя\n"
+                        "└ Удалить комнату\n\n"
+                        "**Важно:** Комната будет автоматически удалена через N секунд после того, как создатель покинет её.",
+            color=0x00bfff
+        )
+        await panel_registry.publish(
+            self.bot, 'temp_voice', 'public', channel,
+            embed=embed, view=TempVoicePublicView(),
+            match=lambda msg: bool(msg.components)
+        )
+        print(f"🎤 [TEMP_VOICE] Панель в #{channel.name} актуальна")
     
     async def _restore_rooms(self):
         print("🎤 [TEMP_VOICE] Проверка комнат после перезапуска...")
@@ -0,0 +1,40 @@
+"""Общие фикстуры тестов: отдельная bot_data.db во временном каталоге"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    # Database открывает 'bot_data.db' относительно текущего каталога, поэтому
+    # модули core импортируются в тестах только после перехода в tmp_path
+    monkeypatch.chdir(tmp_path)
+    from core.database import Database
+
+    database = Database()
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def race():
+    """race(func, args_list, workers) — вызвать func(*args) из потоков одновременно"""
+    def run_all(func, args_list, workers=16):
+        barrier = threading.Barrier(workers)
+
+        def run(args):
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            return func(*args)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, args_list))
+
+    return run_all
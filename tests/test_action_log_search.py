@@ -0,0 +1,35 @@
+"""Поиск по логам: страницы по курсору не теряют и не повторяют строки"""
+
+
+def _log(database, details, count=1):
+    from core.timeutils import msk_now, to_db_timestamp
+
+    now = to_db_timestamp(msk_now())
+    database.save_action_logs_batch([
+        ('g', 'message_delete', '1', None, details, None, None, now) for _ in range(count)
+    ])
+
+
+def test_ranked_pages_stay_stable_while_logs_are_written(database):
+    # Разная длина details — разные оценки bm25, которые сдвигаются с каждой новой строкой
+    for words in range(25, 0, -1):
+        _log(database, 'spam ' + 'filler ' * words)
+
+    max_id = database.get_action_logs_max_id()
+    ranked = [log['id'] for log in database.search_action_logs('spam', 'g', limit=100, max_id=max_id)]
+    # Самая короткая запись — самая релевантная
+    assert ranked[0] == max_id
+
+    seen = []
+    after = (None, None)
+    while True:
+        page = database.search_action_logs('spam', 'g', limit=10, max_id=max_id,
+                                           after_score=after[0], after_id=after[1])
+        if not page:
+            break
+        seen.extend(log['id'] for log in page)
+        after = (page[-1]['score'], page[-1]['id'])
+        _log(database, 'spam spam spam', count=3)
+
+    assert seen == ranked
+    assert len(set(seen)) == 25
@@ -0,0 +1,30 @@
+"""Пакетная запись логов: одна плохая строка не уносит с собой весь пакет"""
+import asyncio
+
+
+class _SyncAdb:
+    def __init__(self, database):
+        self.database = database
+
+    async def save_action_logs_batch(self, rows):
+        self.database.save_action_logs_batch(rows)
+
+
+def test_failed_batch_falls_back_to_single_rows(database, monkeypatch):
+    from action_logs import writer as writer_module
+
+    monkeypatch.setattr(writer_module, 'adb', _SyncAdb(database))
+    writer = writer_module.ActionLogWriter(batch_size=10, flush_ms=10_000)
+
+    async def scenario():
+        for user_id in ('1', '2', None, '4'):
+            await writer.put('g', 'message_delete', user_id)
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    rows = database.get_connection().execute('SELECT user_id FROM server_action_logs ORDER BY id').fetchall()
+    assert [row[0] for row in rows] == ['1', '2', '4']
+    assert writer.errors == 1
+    assert writer.dropped_rows == 1
+    assert writer.flushed_rows == 3
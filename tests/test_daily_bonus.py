@@ -0,0 +1,33 @@
+"""Ежедневный бонус: двойное нажатие даёт один бонус и один шаг серии"""
+from datetime import timedelta
+
+
+def test_double_click_claims_once(database, race):
+    results = race(lambda user_id: database.claim_daily_bonus(user_id, 10, 5, 7), [('1',), ('1',)], workers=2)
+
+    assert sorted(claimed for claimed, _, _, _ in results) == [False, True]
+    assert database.get_user_balance('1') == 10
+
+    conn = database.get_connection()
+    assert conn.execute('SELECT daily_streak FROM user_balance WHERE user_id = ?', ('1',)).fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM economy_transactions WHERE user_id = '1'").fetchone()[0] == 1
+
+
+def test_streak_advances_once_under_race(database, race):
+    from core.timeutils import msk_now, to_db_timestamp
+
+    yesterday = to_db_timestamp(msk_now() - timedelta(days=1))
+    conn = database.get_connection()
+    conn.execute('INSERT INTO user_balance (user_id, balance, last_daily, daily_streak) VALUES (?, 0, ?, 3)',
+                 ('1', yesterday))
+    conn.commit()
+
+    results = race(lambda user_id: database.claim_daily_bonus(user_id, 10, 5, 7), [('1',)] * 16)
+    claimed = [result for result in results if result[0]]
+
+    assert len(claimed) == 1
+    _, streak, bonus, balance = claimed[0]
+    assert streak == 4
+    assert bonus == 10 + (4 // 2) * 5
+    assert database.get_user_balance('1') == balance == bonus
+    assert conn.execute('SELECT daily_streak FROM user_balance WHERE user_id = ?', ('1',)).fetchone()[0] == 4
@@ -0,0 +1,42 @@
+"""Перерисовка панелей: удалённое сообщение не прячется за пропуском правки"""
+import asyncio
+
+import discord
+
+
+class _DeletedMessage:
+    id = 42
+
+    def __init__(self):
+        self.deleted = False
+        self.edits = 0
+
+    async def edit(self, **fields):
+        if self.deleted:
+            raise discord.NotFound(type('Response', (), {'status': 404, 'reason': 'Not Found'})(), 'Unknown Message')
+        self.edits += 1
+        return self
+
+
+def test_deleted_panel_is_noticed_on_next_redraw(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from core.panels import PanelRegistry
+
+    registry = PanelRegistry()
+    message = _DeletedMessage()
+    embed = discord.Embed(title='AFK')
+
+    async def scenario():
+        assert await registry.edit_if_changed('afk', message, embed=embed)
+        assert not await registry.edit_if_changed('afk', message, embed=embed)
+
+        message.deleted = True
+        registry.forget_rendered(message.id)
+        try:
+            await registry.edit_if_changed('afk', message, embed=embed)
+        except discord.NotFound:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+    assert message.edits == 1
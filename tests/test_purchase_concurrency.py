@@ -0,0 +1,42 @@
+"""Одновременные покупки: остаток товара и балансы не уходят в минус"""
+
+
+def _set_balance(database, user_id: str, balance: int):
+    conn = database.get_connection()
+    conn.execute('INSERT OR REPLACE INTO user_balance (user_id, balance) VALUES (?, ?)', (user_id, balance))
+    conn.commit()
+
+
+def test_limited_stock_is_never_oversold(database, race):
+    item_id = database.add_shop_item('Роль', 'тест', 30, '🎁', 5)
+    buyers = [str(i) for i in range(40)]
+    for user_id in buyers:
+        _set_balance(database, user_id, 0 if int(user_id) % 4 == 0 else 100)
+
+    results = race(database.purchase, [(user_id, item_id) for user_id in buyers])
+    statuses = [status for status, _, _ in results]
+
+    assert statuses.count('ok') == 5
+    assert set(statuses) <= {'ok', 'sold_out', 'no_funds'}
+
+    item = database.get_shop_item(item_id)
+    assert item['sold_count'] == 5
+
+    conn = database.get_connection()
+    assert conn.execute('SELECT COUNT(*) FROM user_purchases WHERE item_id = ?', (item_id,)).fetchone()[0] == 5
+    assert conn.execute('SELECT MIN(balance) FROM user_balance').fetchone()[0] >= 0
+    spent = conn.execute('SELECT SUM(total_spent) FROM user_balance').fetchone()[0]
+    assert spent == 5 * 30
+
+
+def test_one_buyer_cannot_overspend(database, race):
+    item_id = database.add_shop_item('Безлимит', 'тест', 30, '🎁', 0)
+    _set_balance(database, '1', 100)
+
+    results = race(database.purchase, [('1', item_id)] * 32)
+    statuses = [status for status, _, _ in results]
+
+    assert statuses.count('ok') == 3
+    assert statuses.count('no_funds') == 29
+    assert database.get_user_balance('1') == 10
+    assert database.get_shop_item(item_id)['sold_count'] == 3
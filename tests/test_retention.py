@@ -0,0 +1,36 @@
+"""Архивы: закрытые месяцы сжимаются и остаются доступны для чтения"""
+import os
+
+
+def _old_rows(database, count):
+    conn = database.get_connection()
+    conn.executemany('INSERT INTO audit_log (user_id, action, timestamp) VALUES (?, ?, ?)',
+                     [('1', 'MEMBER_JOIN', '2020-01-15 12:00:00')] * count)
+    conn.commit()
+
+
+def test_closed_month_is_packed_and_still_readable(database, tmp_path):
+    from core.retention import RetentionManager
+
+    retention = RetentionManager(database, archive_dir=str(tmp_path / 'archive'))
+    january = ('audit_log', 'timestamp', '2020-01-01 00:00:00', '2020-02-01 00:00:00', '2020_01')
+
+    _old_rows(database, 3)
+    assert retention._move_batch(*january) == 3
+    assert retention._pack_closed() == ['2020_01']
+    assert os.path.exists(retention.packed_path('2020_01'))
+    assert not os.path.exists(retention.archive_path('2020_01'))
+
+    reader = retention.open_archive_reader()
+    assert reader.execute("SELECT COUNT(*) FROM all_audit_log WHERE timestamp < '2021-01-01 00:00:00'").fetchone()[0] == 3
+    reader.close()
+
+    # Строки снова пришли в сжатый месяц — архив распаковывается и дописывается
+    _old_rows(database, 2)
+    assert retention._move_batch(*january) == 2
+    assert not os.path.exists(retention.packed_path('2020_01'))
+    assert retention._pack_closed() == ['2020_01']
+
+    reader = retention.open_archive_reader()
+    assert reader.execute("SELECT COUNT(*) FROM all_audit_log WHERE timestamp < '2021-01-01 00:00:00'").fetchone()[0] == 5
+    reader.close()
@@ -0,0 +1,30 @@
+"""Планировщик: замена задачи из её же колбэка не теряется"""
+import asyncio
+
+
+def test_once_job_rearmed_from_its_callback_stays_registered(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from core.scheduler import Scheduler
+
+    scheduler = Scheduler()
+    fired = []
+
+    async def second():
+        fired.append('second')
+
+    async def first():
+        fired.append('first')
+        # Как EventScheduler.plan(): перевзвод под тем же именем, пока идёт запуск
+        scheduler.once('event_reminder_1', 0.05, second)
+
+    async def scenario():
+        scheduler.once('event_reminder_1', 0, first)
+        await asyncio.sleep(0.02)
+        replacement = scheduler.get('event_reminder_1')
+        assert replacement is not None and replacement.func is second
+        await asyncio.sleep(0.1)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert fired == ['first', 'second']
+    assert scheduler.get('event_reminder_1') is None
@@ -0,0 +1,53 @@
+"""Начисление за войс: неудачный тик не съедает накопленные минуты"""
+import asyncio
+from types import SimpleNamespace
+
+
+class _Manager:
+    settings = {'voice_points_per_minute': 1, 'voice_max_per_day': 1000}
+
+    def _remember_balances(self, balances):
+        pass
+
+
+class _FlakyAdb:
+    def __init__(self):
+        self.fail = True
+        self.credits = []
+
+    async def voice_accrual_tick(self, credits, max_per_day, sessions=None, ended=None):
+        if self.fail:
+            raise RuntimeError('database is locked')
+        self.credits.extend(credits)
+        return {user_id: (amount, amount) for user_id, amount, _ in credits}
+
+
+def _member(user_id):
+    return SimpleNamespace(id=user_id, bot=False, name=f'user{user_id}', guild=SimpleNamespace(id=1))
+
+
+def test_failed_tick_keeps_session_and_ended_minutes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from economy import voice
+
+    fake_adb = _FlakyAdb()
+    monkeypatch.setattr(voice, 'adb', fake_adb)
+    clock = [1000.0]
+    monkeypatch.setattr(voice.time, 'monotonic', lambda: clock[0])
+
+    accrual = voice.VoiceAccrual(_Manager(), tick_seconds=300)
+    channel = SimpleNamespace(id=10)
+    accrual.on_voice_update(_member(1), SimpleNamespace(channel=None), SimpleNamespace(channel=channel))
+    accrual.on_voice_update(_member(2), SimpleNamespace(channel=None), SimpleNamespace(channel=channel))
+
+    clock[0] += 5 * 60
+    accrual.on_voice_update(_member(2), SimpleNamespace(channel=channel), SimpleNamespace(channel=None))
+
+    async def scenario():
+        assert await accrual.tick() == 0
+        fake_adb.fail = False
+        clock[0] += 60
+        return await accrual.tick()
+
+    assert asyncio.run(scenario()) == 6 + 5
+    assert sorted((user_id, amount) for user_id, amount, _ in fake_adb.credits) == [('1', 6), ('2', 5)]
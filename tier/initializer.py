@@ -1,6 +1,7 @@
 """Инициализация каналов системы TIER"""
 import discord
 import logging
+from core.panels import panel_registry
 from datetime import datetime
 from tier.manager import tier_manager
 from tier.views import TierSubmitView, update_tier_embed
@@ -49,13 +50,6 @@ class TierInitializer:
             logger.error(f"❌ Канал информации TIER {channel_id} не найден")
             return
         
-        # Ищем существующее сообщение бота в канале
-        target_message = None
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                target_message = msg
-                break
-        
         # Получаем требования
         tier3_req = tier_manager.get_tier_requirements("tier3") or "Не установлены"
         tier2_req = tier_manager.get_tier_requirements("tier2") or "Не установлены"
@@ -95,12 +89,9 @@ class TierInitializer:
         
         embed.set_footer(text="Требования могут обновляться администрацией")
         
-        if target_message:
-            await target_message.edit(embed=embed)
-            logger.info(f"✅ Обновлён embed информации TIER в #{channel.name}")
-        else:
-            await channel.send(embed=embed)
-            logger.info(f"✅ Создан embed информации TIER в #{channel.name}")
+        await panel_registry.publish(self.bot, 'tier', 'info', channel, embed=embed,
+                                     match=lambda msg: bool(msg.embeds))
+        logger.info(f"✅ Embed информации TIER в #{channel.name} актуален")
     
     async def _init_submit_channel(self, settings):
         """Инициализация канала с кнопкой подачи заявок (одна кнопка)"""
@@ -116,36 +107,28 @@ class TierInitializer:
         
         from tier.views import TierSubmitView
         
-        # Ищем существующее сообщение
-        message_exists = False
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                if msg.embeds and "ПОДАЧА ЗАЯВОК НА TIER" in msg.embeds[0].title:
-                    await msg.edit(view=TierSubmitView())
-                    message_exists = True
-                    logger.info(f"✅ Обновлена панель подачи заявок TIER в #{channel.name}")
-                    break
+        # Ссылка на канал с информацией
+        info_channel_id = settings.get('tier_info_channel')
+        info_channel_mention = f"<#{info_channel_id}>" if info_channel_id else "#tier-info"
         
-        if not message_exists:
-            # Ссылка на канал с информацией
-            info_channel_id = settings.get('tier_info_channel')
-            info_channel_mention = f"<#{info_channel_id}>" if info_channel_id else "#tier-info"
-            
-            embed = discord.Embed(
-                title="🌟 **ПОДАЧА ЗАЯВОК НА TIER**",
-                description=f"Перед подачей заявки ознакомьтесь с требованиями в канале {info_channel_mention}\n\n"
-                            f"**Как это работает:**\n"
-                            f"└ Система автоматически определит ваш текущий уровень\n"
-                            f"└ Вы подаёте заявку на следующий уровень\n"
-                            f"└ Заявку рассмотрит Tier Checker\n\n"
-                            f"**Уровни:**\n"
-                            f"└ 🟤 **Tier 3** → начальный уровень\n"
-                            f"└ ⚪ **Tier 2** → средний уровень\n"
-                            f"└ 🔴 **Tier 1** → высший уровень",
-                color=0xffa500
-            )
-            await channel.send(embed=embed, view=TierSubmitView())
-            logger.info(f"✅ Создана панель подачи заявок TIER в #{channel.name}")
+        embed = discord.Embed(
+            title="🌟 **ПОДАЧА ЗАЯВОК НА TIER**",
+            description=f"Перед подачей заявки ознакомьтесь с требованиями в канале {info_channel_mention}\n\n"
+                        f"**Как это работает:**\n"
+                        f"└ Система автоматически определит ваш текущий уровень\n"
+                        f"└ Вы подаёте заявку на следующий уровень\n"
+                        f"└ Заявку рассмотрит Tier Checker\n\n"
+                        f"**Уровни:**\n"
+                        f"└ 🟤 **Tier 3** → начальный уровень\n"
+                        f"└ ⚪ **Tier 2** → средний уровень\n"
+                        f"└ 🔴 **Tier 1** → высший уровень",
+            color=0xffa500
+        )
+        await panel_registry.publish(
+            self.bot, 'tier', 'submit', channel, embed=embed, view=TierSubmitView(),
+            match=lambda msg: bool(msg.embeds) and "ПОДАЧА ЗАЯВОК НА TIER" in (msg.embeds[0].title or "")
+        )
+        logger.info(f"✅ Панель подачи заявок TIER в #{channel.name} актуальна")
     
     async def _restore_application_buttons(self):
         """Восстановить кнопки у всех активных заявок TIER"""
@@ -6,6 +6,7 @@ from tier.base import PermanentView
 from tier.modals import TierApplicationModal
 from tier.manager import tier_manager
 from core.config import CONFIG
+from core.panels import panel_registry
 
 
 async def update_tier_embed(bot, tier_info_channel_id: str):
@@ -14,13 +15,6 @@ async def update_tier_embed(bot, tier_info_channel_id: str):
     if not channel:
         return
     
-    # Ищем существующее сообщение
-    target_message = None
-    async for msg in channel.history(limit=50):
-        if msg.author == bot.user and msg.embeds:
-            target_message = msg
-            break
-    
     # Получаем требования
     tier3_req = tier_manager.get_tier_requirements("tier3") or "Не установлены"
     tier2_req = tier_manager.get_tier_requirements("tier2") or "Не установлены"
@@ -60,10 +54,8 @@ async def update_tier_embed(bot, tier_info_channel_id: str):
     
     embed.set_footer(text="Требования могут обновляться администрацией")
     
-    if target_message:
-        await target_message.edit(embed=embed)
-    else:
-        await channel.send(embed=embed)
+    await panel_registry.publish(bot, 'tier', 'info', channel, embed=embed,
+                                 match=lambda msg: bool(msg.embeds))
 
 
 class TierSubmitView(PermanentView):
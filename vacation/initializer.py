@@ -1,11 +1,12 @@
 """Инициализация каналов системы отпусков"""
-import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 import pytz
 import discord
 from core.database import db
+from core.panels import panel_registry
+from core.scheduler import scheduler
 from vacation.manager import vacation_manager
-from vacation.views import VacationPublicView, update_vacation_embed
+from vacation.views import update_vacation_embed
 from vacation.settings_view import VacationSettingsView
 
 MSK_TZ = pytz.timezone('Europe/Moscow')
@@ -94,28 +95,17 @@ class VacationInitializer:
                 await log_channel.send(embed=embed)
 
     async def _start_midnight_checker(self):
-        """Запуск фоновой проверки в 00:00 каждый день"""
-        self.bot.loop.create_task(self._midnight_checker())
+        """Зарегистрировать проверку в 00:00 МСК каждый день"""
+        scheduler.midnight('vacation_expired', self._return_expired)
 
-    async def _midnight_checker(self):
-        """Фоновая проверка раз в сутки в полночь"""
-        await self.bot.wait_until_ready()
-
-        while not self.bot.is_closed():
-            now = datetime.now(MSK_TZ)
-            tomorrow = now + timedelta(days=1)
-            next_midnight = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
-            next_midnight = MSK_TZ.localize(next_midnight)
-            seconds_to_wait = (next_midnight - now).total_seconds()
-
-            await asyncio.sleep(seconds_to_wait)
-
-            expired = db.get_expired_vacations()
-            for user_id, user_name, saved_roles, guild_id, reason, until_date in expired:
-                await self._return_user_from_vacation(user_id, user_name, saved_roles, guild_id, until_date)
+    async def _return_expired(self):
+        """Вернуть пользователей, у которых закончился отпуск"""
+        expired = db.get_expired_vacations()
+        for user_id, user_name, saved_roles, guild_id, reason, until_date in expired:
+            await self._return_user_from_vacation(user_id, user_name, saved_roles, guild_id, until_date)
 
-            if expired:
-                await self._refresh_public_embed()
+        if expired:
+            await self._refresh_public_embed()
 
     async def _refresh_public_embed(self):
         """Обновить embed в публичном канале"""
@@ -134,19 +124,7 @@ class VacationInitializer:
         if not channel:
             return
 
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.components:
-                await msg.edit(view=VacationPublicView())
-                break
-        else:
-            embed = discord.Embed(
-                title="🏖️ **СИСТЕМА ОТПУСКОВ**",
-                description="✨ Никого нет в отпуске",
-                color=0x00ff00
-            )
-            embed.set_footer(text="Нажмите кнопку, чтобы подать заявку")
-            await channel.send(embed=embed, view=VacationPublicView())
-
+        # Список отпускников и кнопки — одна панель, редактируется на месте
         await update_vacation_embed(self.bot, channel_id)
 
     async def _init_settings_channel(self):
@@ -160,18 +138,15 @@ class VacationInitializer:
         if not channel:
             return
 
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                if "НАСТРОЙКИ ОТПУСКОВ" in msg.embeds[0].title:
-                    await msg.edit(view=VacationSettingsView())
-                    break
-        else:
-            embed = discord.Embed(
-                title="⚙️ **НАСТРОЙКИ ОТПУСКОВ**",
-                description="Настройка системы отпусков",
-                color=0x00ff00
-            )
-            await channel.send(embed=embed, view=VacationSettingsView())
+        embed = discord.Embed(
+            title="⚙️ **НАСТРОЙКИ ОТПУСКОВ**",
+            description="Настройка системы отпусков",
+            color=0x00ff00
+        )
+        await panel_registry.publish(
+            self.bot, 'vacation', 'settings', channel, embed=embed, view=VacationSettingsView(),
+            match=lambda msg: bool(msg.embeds) and "НАСТРОЙКИ ОТПУСКОВ" in (msg.embeds[0].title or "")
+        )
 
     def get_all_application_messages(self):
         return db.get_all_vacation_application_messages()
@@ -221,8 +196,7 @@ class VacationInitializer:
         """Остановить систему отпусков"""
         print("🏖️ [VACATION] Остановка системы отпусков...")
         
-        if hasattr(self, 'task') and self.task:
-            self.task.cancel()
+        scheduler.cancel('vacation_expired')
         
         settings = vacation_manager.get_settings()
         channel_id = settings.get('vacation_public_channel')
@@ -7,6 +7,7 @@ from vacation.base import PermanentView
 from vacation.modals import VacationModal
 from vacation.manager import vacation_manager
 from core.config import CONFIG
+from core.panels import panel_registry
 
 MSK_TZ = pytz.timezone('Europe/Moscow')
 
@@ -19,17 +20,6 @@ async def update_vacation_embed(bot, channel_id: str):
     
     vacations = vacation_manager.get_all_vacations()
     
-    # Ищем существующее сообщение
-    target_message = None
-    async for msg in channel.history(limit=50):
-        if msg.author == bot.user and msg.embeds:
-            if msg.embeds and "🏖️ **СИСТЕМА ОТПУСКОВ**" in msg.embeds[0].title:
-                target_message = msg
-                break
-    
-    if not target_message:
-        return
-    
     if not vacations:
         embed = discord.Embed(
             title="🏖️ **СИСТЕМА ОТПУСКОВ**",
@@ -55,7 +45,10 @@ async def update_vacation_embed(bot, channel_id: str):
         )
     
     embed.set_footer(text="Нажмите кнопку, чтобы подать заявку")
-    await target_message.edit(embed=embed)
+    await panel_registry.publish(
+        bot, 'vacation', 'public', channel, embed=embed, view=VacationPublicView(),
+        match=lambda msg: bool(msg.components)
+    )
 
 
 class VacationPublicView(PermanentView):